@@ -1,12 +1,46 @@
+import concurrent.futures
+import contextlib
+import json
 import logging
+import multiprocessing
 import os
+import re
+import threading
+import time
 import typing
 
 import pedalboard
 
+from audio_chef.adapters import dsp, estimator
+from audio_chef.adapters.batch_planner import BatchPlan, BatchPlanner, RenderGroup
+from audio_chef.adapters.chain_tree import build_chain_tree, render_chain_tree
+from audio_chef.adapters.chunking import (
+    can_process_in_chunks,
+    get_chain_memory_s,
+    process_in_chunks,
+)
+from audio_chef.adapters.peak_store import PeakPyramidStore
+from audio_chef.adapters.pipeline import PipelineConfig, PipelinedExecutor
+from audio_chef.adapters.plugin_host import PluginHost, PluginHostError
+from audio_chef.adapters.repository import PluginRepository
+from audio_chef.adapters.silence import SilenceConfig, process_skipping_silence
+from audio_chef.adapters.worker_pool import WorkerPool
 from audio_chef.components.helper_classes import UnexecutableRecipeError
-from audio_chef.models.preset import Transformation
-from audio_chef.utils.audio_formats import AudioFile, SUPPORTED_AUDIO_FORMATS
+from audio_chef.models.catalog import FileCatalog
+from audio_chef.models.estimate import BatchEstimate, BatchProgress
+from audio_chef.models.plugin import PluginMetadata
+from audio_chef.models.preset import Preset, Transformation
+from audio_chef.models.report import BatchReport
+from audio_chef.utils.audio_formats import (
+    AudioData,
+    AudioFile,
+    SUPPORTED_AUDIO_FORMATS,
+)
+from audio_chef.utils.analysis import analyze
+from audio_chef.utils.functions import clone_file
+from audio_chef.utils.resampling import resample
+from audio_chef.utils.scratch import ScratchSpaceError, ScratchStorage
+from audio_chef.utils.shared_audio import SharedAudioBuffer
 from audio_chef.utils.transformations import TRANSFORMATIONS
 
 logger = logging.getLogger("audiochef")
@@ -20,22 +54,499 @@ class AudioClient:
         selected_files: list[AudioFile],
         transformations: list[Transformation],
     ) -> bool:
+        return cls.execute_batch(output_ext, selected_files, transformations).success
+
+    @classmethod
+    def execute_batch(
+        cls,
+        output_ext: str,
+        selected_files: list[AudioFile],
+        transformations: list[Transformation],
+        pipeline_config: PipelineConfig = PipelineConfig(),
+        additional_exts: list[str] | None = None,
+        encoder_settings: dict[str, dict] | None = None,
+        target_sample_rate: int | None = None,
+        analyze_outputs: bool = False,
+        silence_config: SilenceConfig | None = None,
+        worker_pool: WorkerPool | None = None,
+        progress: typing.Callable[[BatchProgress], None] | None = None,
+    ) -> BatchReport:
+        """Render the batch, returning a report of what was done.
+
+        With `target_sample_rate`, every output is converted to that rate and
+        processed at it too when the source's rate is higher.
+
+        With `silence_config`, long silent spans bypass chains whose memory is
+        bounded, and the time that saved is added to the report.
+
+        With `analyze_outputs`, level statistics of every render are computed
+        while it is still in memory, added to the report and written to a
+        `<output name>.analysis.json` sidecar.
+
+        Chains with external plugins run in the shared plugin host. A file
+        whose plugin fails or crashes its host is reported as failed, and the
+        rest of the batch carries on.
+
+        With `worker_pool`, DSP processes come from it and outlive the batch,
+        otherwise they are started for the batch and stopped after it.
+
+        The time every stage takes is added to the throughput history the
+        estimates are based on. With `progress`, it is called with the
+        estimated time left at the start and whenever a file is done.
+        """
+        additional_exts = additional_exts or []
+        encoder_settings = encoder_settings or {}
+        report = BatchReport()
+        report_lock = threading.Lock()
+
+        def record_decode(audio_file: AudioFile, audio_s: float, started: float):
+            ext = audio_file.source_ext
+            recorder.add(
+                estimator.decode_key(ext), audio_s, time.perf_counter() - started
+            )
+            recorder.add(
+                estimator.source_size_key(ext),
+                audio_s,
+                os.path.getsize(audio_file.filename),
+            )
+
+        def files_done(group: RenderGroup):
+            if tracker:
+                tracker.files_done(
+                    [
+                        audio_file.filename
+                        for audio_file in [group.primary, *group.duplicates]
+                    ]
+                )
+
+        def decode(group: RenderGroup):
+            started = time.perf_counter()
+            # Inputs decoded by an earlier batch are not decoded again
+            cached = group.primary.internal_file is not None
+            audio, sample_rate = group.primary.get_audio_data()
+            # Scratch would otherwise grow with every file of the session
+            group.primary.release_internal_file()
+            if not cached:
+                record_decode(group.primary, len(audio) / sample_rate, started)
+            PeakPyramidStore.store_if_missing(group.primary, audio, sample_rate)
+            return group, audio, sample_rate
+
+        def process(decoded):
+            group, audio, sample_rate = decoded
+            started = time.perf_counter()
+            board = cls.prepare_board(transformations, target_sample_rate)
+            skipped_s = 0.0
+            if silence_config and get_chain_memory_s(transformations) is not None:
+                # Independent spans between silences run on the chunk workers
+                res, skipped_s = cls.process_audio_skipping_silence(
+                    transformations,
+                    audio,
+                    sample_rate,
+                    target_sample_rate,
+                    silence_config,
+                    chunkers,
+                )
+            elif pipeline_config.chunk_workers > 1 and can_process_in_chunks(
+                transformations, len(audio), sample_rate
+            ):
+                res = cls.process_audio_in_chunks(
+                    transformations, audio, sample_rate, target_sample_rate, chunkers
+                )
+            else:
+                res = board(audio, sample_rate, group.primary.get_fingerprint())
+            recorder.add_chain(
+                transformations,
+                len(audio) / sample_rate - skipped_s,
+                time.perf_counter() - started,
+            )
+            with report_lock:
+                report.processed_audio_s += len(audio) / sample_rate
+                report.skipped_silence_s += skipped_s
+                report.processing_s += time.perf_counter() - started
+            return group, res, board.output_sample_rate(sample_rate)
+
+        def decode_shared(group: RenderGroup):
+            started = time.perf_counter()
+            cached = group.primary.internal_file is not None
+            source = group.primary.get_shared_audio_data()
+            group.primary.release_internal_file()
+            if not cached:
+                record_decode(
+                    group.primary,
+                    len(source.array) / source.handle.sample_rate,
+                    started,
+                )
+            PeakPyramidStore.store_if_missing(
+                group.primary, source.array, source.handle.sample_rate
+            )
+            return group, source
+
+        def process_shared(decoded):
+            group, source = decoded
+            audio_s = len(source.array) / source.handle.sample_rate
+            started = time.perf_counter()
+            try:
+                res_handle = dsp_processes.submit(
+                    dsp.process_shared_audio,
+                    source.handle,
+                    dsp.picklable(transformations),
+                    group.primary.get_fingerprint(),
+                    target_sample_rate,
+                ).result()
+            finally:
+                source.release()
+            recorder.add_chain(transformations, audio_s, time.perf_counter() - started)
+            return group, SharedAudioBuffer.adopt(res_handle)
+
+        def process_hosted(decoded):
+            group, source = decoded
+            audio_s = len(source.array) / source.handle.sample_rate
+            started = time.perf_counter()
+            try:
+                res_handle = plugin_host.process(
+                    source.handle,
+                    transformations,
+                    plugins,
+                    group.primary.get_fingerprint(),
+                    target_sample_rate,
+                )
+            except PluginHostError as e:
+                logger.error(f"Could not process {group.primary.filename}: {e}")
+                with report_lock:
+                    report.failed_files.append(group.primary.filename)
+                return group, None
+            finally:
+                source.release()
+            recorder.add_chain(transformations, audio_s, time.perf_counter() - started)
+            return group, SharedAudioBuffer.adopt(res_handle)
+
+        def encode(processed):
+            group, res, sample_rate = processed
+            render_file = group.primary.write_render_file(res, sample_rate)
+            exts = list(
+                dict.fromkeys([group.primary.destination_ext, *additional_exts])
+            )
+
+            def encode_format(ext: str) -> float:
+                started = time.perf_counter()
+                group.primary.encode_output_file(
+                    ext, encoder_settings.get(ext), internal_file=render_file
+                )
+                return time.perf_counter() - started
+
+            # Every format is encoded from the same render, in parallel
+            audio_s = len(res) / sample_rate
+            try:
+                for ext, future in [
+                    (ext, encoders.submit(encode_format, ext)) for ext in exts
+                ]:
+                    recorder.add(estimator.encode_key(ext), audio_s, future.result())
+                    recorder.add(
+                        estimator.output_size_key(ext),
+                        audio_s,
+                        os.path.getsize(group.primary.get_destination_filename(ext)),
+                    )
+            finally:
+                ScratchStorage.remove(render_file)
+            if analyze_outputs:
+                stats = analyze(res, sample_rate, full=True)
+                for audio_file in [group.primary, *group.duplicates]:
+                    cls.write_analysis_sidecar(audio_file, stats.to_dict())
+            with report_lock:
+                report.rendered_files += 1
+                report.encoded_files += len(exts)
+                cls.materialize_duplicates(group, exts, report)
+                if analyze_outputs:
+                    for audio_file in [group.primary, *group.duplicates]:
+                        report.output_stats[audio_file.destination_filename] = stats
+            files_done(group)
+
+        def encode_shared(processed):
+            group, res = processed
+            if res is None:
+                files_done(group)
+                return
+            with res:
+                encode((group, res.array, res.handle.sample_rate))
+
+        def discard_shared(item):
+            if item[1] is not None:
+                item[1].release()
+
         try:
             cls.check_input_file_formats(selected_files=selected_files)
-            cls.check_output_file_formats(output_ext)
+            for ext in [output_ext, *additional_exts]:
+                cls.check_output_file_formats(ext)
 
             cls.check_selected_transformation(transformations)
-            for audio_file in selected_files:
-                audio, sample_rate = audio_file.get_audio_data()
+            plugins = cls.get_plugins(transformations)
+            plan = BatchPlanner.plan(selected_files)
+            ScratchStorage.reserve(plan.scratch_bytes)
+            rates = estimator.Rates.load(
+                transformations, cls.get_batch_exts(plan, additional_exts)
+            )
+            recorder = estimator.ThroughputRecorder(rates)
+            tracker = None
+            if progress:
+                tracker = estimator.EtaTracker(
+                    estimator.estimate_batch(
+                        plan,
+                        transformations,
+                        additional_exts,
+                        pipeline_config,
+                        target_sample_rate,
+                        rates,
+                    ),
+                    progress,
+                )
+                tracker.start()
+            with contextlib.ExitStack() as stack:
+                if worker_pool:
+                    stack.enter_context(worker_pool.lease())
+                encoders = stack.enter_context(
+                    concurrent.futures.ThreadPoolExecutor(
+                        pipeline_config.encode_workers * (1 + len(additional_exts)),
+                        thread_name_prefix="audiochef-encoder",
+                    )
+                )
+                chunkers = stack.enter_context(
+                    concurrent.futures.ThreadPoolExecutor(
+                        pipeline_config.chunk_workers,
+                        thread_name_prefix="audiochef-chunk",
+                    )
+                )
+                if plugins:
+                    plugin_host = PluginHost.shared(pipeline_config.dsp_workers)
+                    executor = PipelinedExecutor(
+                        decode_shared,
+                        process_hosted,
+                        encode_shared,
+                        pipeline_config,
+                        discard=discard_shared,
+                    )
+                elif pipeline_config.dsp_processes:
+                    # Audio crosses the process boundary as shared memory handles
+                    if worker_pool:
+                        dsp_processes = worker_pool.get_dsp_processes(
+                            pipeline_config.dsp_workers
+                        )
+                    else:
+                        dsp_processes = stack.enter_context(
+                            # Forking a threaded process can deadlock its children
+                            concurrent.futures.ProcessPoolExecutor(
+                                pipeline_config.dsp_workers,
+                                mp_context=multiprocessing.get_context("spawn"),
+                            )
+                        )
+                    executor = PipelinedExecutor(
+                        decode_shared,
+                        process_shared,
+                        encode_shared,
+                        pipeline_config,
+                        discard=discard_shared,
+                    )
+                else:
+                    executor = PipelinedExecutor(
+                        decode, process, encode, pipeline_config
+                    )
+                try:
+                    executor.run(plan.groups)
+                finally:
+                    report.max_queue_depths = executor.max_queue_depths()
+                    recorder.save()
+            report.success = not report.failed_files
+        except (UnexecutableRecipeError, ScratchSpaceError) as e:
+            logger.error(repr(e))
+            report.success = False
+        logger.info(report.summary())
+        logger.debug(ScratchStorage.stats().summary())
+        return report
+
+    @classmethod
+    def estimate_batch(
+        cls,
+        catalog: FileCatalog,
+        transformations: list[Transformation],
+        pipeline_config: PipelineConfig = PipelineConfig(),
+        additional_exts: list[str] | None = None,
+        target_sample_rate: int | None = None,
+    ) -> BatchEstimate:
+        """What `execute_batch` would do and cost, without doing it.
 
-                board = cls.prepare_board(transformations)
-                res = board(audio, sample_rate)
+        Probed durations are kept in the catalog for the next estimate.
+        """
+        additional_exts = additional_exts or []
+        plan = BatchPlanner.plan(catalog.audio_files())
+        rates = estimator.Rates.load(
+            transformations, cls.get_batch_exts(plan, additional_exts)
+        )
+        return estimator.estimate_batch(
+            plan,
+            transformations,
+            additional_exts,
+            pipeline_config,
+            target_sample_rate,
+            rates,
+            catalog,
+        )
 
-                audio_file.write_output_file(res, sample_rate)
-        except UnexecutableRecipeError as e:
+    @staticmethod
+    def get_batch_exts(plan: BatchPlan, additional_exts: list[str]) -> list[str]:
+        """Every format the batch decodes or encodes."""
+        exts = [*additional_exts]
+        for group in plan.groups:
+            exts.extend([group.primary.source_ext, group.primary.destination_ext])
+        return list(dict.fromkeys(exts))
+
+    @classmethod
+    def execute_presets(
+        cls,
+        presets: dict[int, Preset],
+        selected_files: list[AudioFile],
+        pipeline_config: PipelineConfig = PipelineConfig(),
+        names: dict[int, str] | None = None,
+    ) -> BatchReport:
+        """Render every preset over the batch, decoding each file only once.
+
+        Leading transformations shared between presets are processed once and
+        their result is reused by every preset that starts with them. Outputs
+        get the preset's name, from `names` or its id, appended to theirs.
+
+        Presets are grouped by target sample rate, each group shares a single
+        early downsampling of the source, or upsamples every result late.
+        """
+        report = BatchReport()
+        report_lock = threading.Lock()
+        # Presets are told apart by their output suffix from here on
+        suffixes = cls._unique_suffixes(
+            {preset_id: (names or {}).get(preset_id, "") for preset_id in presets}
+        )
+        by_suffix = {
+            suffixes[preset_id]: preset for preset_id, preset in presets.items()
+        }
+
+        def decode(group: RenderGroup):
+            audio, sample_rate = group.primary.get_audio_data()
+            group.primary.release_internal_file()
+            PeakPyramidStore.store_if_missing(group.primary, audio, sample_rate)
+            return group, audio, sample_rate
+
+        def process(decoded):
+            group, audio, sample_rate = decoded
+            results = []
+            for target_sample_rate, tree in trees.items():
+                processing_rate = dsp.get_processing_sample_rate(
+                    sample_rate, target_sample_rate
+                )
+                source_key = group.primary.get_fingerprint()
+                source = audio
+                if processing_rate != sample_rate:
+                    source = resample(audio, sample_rate, processing_rate)
+                    source_key = f"{source_key}@{processing_rate}"
+
+                def process_node(node_transformations, audio, sample_rate, upstream):
+                    return cls.process_audio(
+                        node_transformations, audio, sample_rate, source_key, upstream
+                    )
+
+                output_rate = target_sample_rate or sample_rate
+                for label, res in render_chain_tree(
+                    tree, source, processing_rate, process_node
+                ):
+                    results.append(
+                        (
+                            label,
+                            resample(res, processing_rate, output_rate),
+                            output_rate,
+                        )
+                    )
+            return group, results
+
+        def encode(processed):
+            group, results = processed
+            for suffix, res, sample_rate in results:
+                preset = by_suffix[suffix]
+                render_file = group.primary.write_render_file(res, sample_rate, suffix)
+                try:
+                    for ext in preset.output_exts:
+                        group.primary.encode_output_file(
+                            ext, preset.encoder_settings.get(ext), suffix, render_file
+                        )
+                finally:
+                    ScratchStorage.remove(render_file)
+                with report_lock:
+                    report.encoded_files += len(preset.output_exts)
+                    cls.materialize_duplicates(
+                        group, preset.output_exts, report, suffix
+                    )
+            with report_lock:
+                report.rendered_files += 1
+
+        try:
+            cls.check_input_file_formats(selected_files=selected_files)
+            for preset in presets.values():
+                for ext in preset.output_exts:
+                    cls.check_output_file_formats(ext)
+                cls.check_selected_transformation(preset.transformations)
+                if cls.get_plugins(preset.transformations):
+                    raise UnexecutableRecipeError(
+                        "Comparing presets with external plugins is not supported"
+                    )
+
+            trees = {
+                target_sample_rate: build_chain_tree(
+                    {
+                        suffix: preset.transformations
+                        for suffix, preset in by_suffix.items()
+                        if preset.target_sample_rate == target_sample_rate
+                    }
+                )
+                for target_sample_rate in dict.fromkeys(
+                    preset.target_sample_rate for preset in presets.values()
+                )
+            }
+            plan = BatchPlanner.plan(selected_files)
+            ScratchStorage.reserve(plan.scratch_bytes)
+            executor = PipelinedExecutor(decode, process, encode, pipeline_config)
+            try:
+                executor.run(plan.groups)
+            finally:
+                report.max_queue_depths = executor.max_queue_depths()
+        except (UnexecutableRecipeError, ScratchSpaceError) as e:
             logger.error(repr(e))
-            return False
-        return True
+            report.success = False
+        logger.info(report.summary())
+        logger.debug(ScratchStorage.stats().summary())
+        return report
+
+    @staticmethod
+    def _unique_suffixes(names: dict[int, str]) -> dict[int, str]:
+        """Output suffixes from the presets' names, equal ones told apart by id."""
+        suffixes: dict[int, str] = {}
+        for preset_id, name in names.items():
+            suffix = "_" + re.sub(r"\W+", "_", name or str(preset_id))
+            while suffix in suffixes.values():
+                suffix = f"{suffix}_{preset_id}"
+            suffixes[preset_id] = suffix
+        return suffixes
+
+    @staticmethod
+    def materialize_duplicates(
+        group: RenderGroup, exts: list[str], report: BatchReport, suffix: str = ""
+    ) -> None:
+        for duplicate in group.duplicates:
+            for ext in exts:
+                rendered_output = group.primary.get_destination_filename(ext, suffix)
+                output = duplicate.get_destination_filename(ext, suffix)
+                if output != rendered_output:
+                    clone_file(rendered_output, output)
+            report.materialized_files += 1
+            report.saved_bytes += os.path.getsize(duplicate.filename)
+
+    @staticmethod
+    def write_analysis_sidecar(audio_file: AudioFile, stats: dict) -> None:
+        with open(f"{audio_file.destination_name}.analysis.json", "w") as f:
+            json.dump({"output": audio_file.destination_filename, **stats}, f, indent=2)
 
     @staticmethod
     def check_input_file_formats(selected_files: list[AudioFile]) -> None:
@@ -69,18 +580,90 @@ class AudioClient:
         ):
             raise UnexecutableRecipeError("You must choose a transformation to apply")
 
+    @staticmethod
+    def get_plugins(transformations: list[Transformation]) -> dict[str, PluginMetadata]:
+        """Metadata of the chain's external plugins, by name."""
+        plugins = {}
+        for transform in transformations:
+            if transform.name in TRANSFORMATIONS or transform.name in plugins:
+                continue
+            metadata = PluginRepository.get_metadata(transform.name)
+            if metadata is None:
+                raise UnexecutableRecipeError(f'"{transform.name}" is not installed')
+            plugins[transform.name] = metadata
+        return plugins
+
     @classmethod
-    def prepare_board(
-        cls, transformations: list[Transformation]
-    ) -> pedalboard.Pedalboard:
-        logger.debug(transformations)
-        return pedalboard.Pedalboard(
-            [
-                cls.get_transform_class(transform.name)(**transform.params)
-                for transform in transformations
-            ]
+    def process_audio(
+        cls,
+        transformations: list[Transformation],
+        audio: AudioData,
+        sample_rate: int,
+        source_key: str | None = None,
+        upstream: list[Transformation] | None = None,
+    ) -> AudioData:
+        board = cls.prepare_board(transformations)
+        return board(audio, sample_rate, source_key, upstream)
+
+    @classmethod
+    def process_audio_in_chunks(
+        cls,
+        transformations: list[Transformation],
+        audio: AudioData,
+        sample_rate: int,
+        target_sample_rate: int | None,
+        executor: concurrent.futures.Executor,
+    ) -> AudioData:
+        """Like a board with a target rate, but parallel over parts of the file."""
+        processing_rate = dsp.get_processing_sample_rate(
+            sample_rate, target_sample_rate
+        )
+        res = process_in_chunks(
+            lambda chunk: cls.process_audio(transformations, chunk, processing_rate),
+            resample(audio, sample_rate, processing_rate),
+            processing_rate,
+            get_chain_memory_s(transformations),
+            executor,
         )
+        return resample(res, processing_rate, target_sample_rate or sample_rate)
+
+    @classmethod
+    def process_audio_skipping_silence(
+        cls,
+        transformations: list[Transformation],
+        audio: AudioData,
+        sample_rate: int,
+        target_sample_rate: int | None,
+        silence_config: SilenceConfig,
+        executor: concurrent.futures.Executor,
+    ) -> tuple[AudioData, float]:
+        """Like a board with a target rate, returning the seconds bypassed too."""
+        processing_rate = dsp.get_processing_sample_rate(
+            sample_rate, target_sample_rate
+        )
+        res, skipped_frames = process_skipping_silence(
+            lambda span: cls.process_audio(transformations, span, processing_rate),
+            resample(audio, sample_rate, processing_rate),
+            processing_rate,
+            get_chain_memory_s(transformations),
+            silence_config,
+            executor,
+        )
+        return (
+            resample(res, processing_rate, target_sample_rate or sample_rate),
+            skipped_frames / processing_rate,
+        )
+
+    @classmethod
+    def prepare_board(
+        cls,
+        transformations: list[Transformation],
+        target_sample_rate: int | None = None,
+    ) -> dsp.ProcessingChain:
+        return dsp.prepare_board(transformations, target_sample_rate)
 
     @staticmethod
-    def get_transform_class(transform_name: str) -> typing.Type[pedalboard.Plugin]:
-        return TRANSFORMATIONS[transform_name].transform
+    def get_transform_class(
+        transform_name: str,
+    ) -> typing.Callable[..., dsp.ProcessingChain.Stage | pedalboard.Plugin]:
+        return dsp.get_transform_class(transform_name)
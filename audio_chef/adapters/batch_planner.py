@@ -0,0 +1,107 @@
+import collections
+import dataclasses
+import logging
+import os
+
+from audio_chef.utils.audio_formats import AudioFile
+from audio_chef.utils.fingerprint import full_fingerprint
+
+logger = logging.getLogger("audiochef")
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderGroup:
+    primary: AudioFile
+    duplicates: list[AudioFile] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchPlan:
+    groups: list[RenderGroup]
+
+    @property
+    def saved_renders(self) -> int:
+        return sum(len(group.duplicates) for group in self.groups)
+
+    @property
+    def saved_bytes(self) -> int:
+        return sum(
+            os.path.getsize(duplicate.filename)
+            for group in self.groups
+            for duplicate in group.duplicates
+        )
+
+    @property
+    def scratch_bytes(self) -> int:
+        """Least scratch space decoding the inputs takes, they only get larger."""
+        return sum(
+            os.path.getsize(group.primary.filename)
+            for group in self.groups
+            if group.primary.internal_file is None
+        )
+
+
+class BatchPlanner:
+    @classmethod
+    def plan(cls, selected_files: list[AudioFile]) -> BatchPlan:
+        """Group inputs with identical content so each one is rendered once.
+
+        Files are bucketed by size first, so only same-sized files are ever
+        read. Candidates are then matched by a sampled fingerprint, and only
+        those matches pay for a full hash.
+        """
+        by_size: dict[tuple, list[AudioFile]] = collections.defaultdict(list)
+        for audio_file in selected_files:
+            by_size[cls._group_key(audio_file)].append(audio_file)
+
+        groups_by_primary: dict[str, RenderGroup] = {}
+        for candidates in by_size.values():
+            if len(candidates) == 1:
+                groups_by_primary[candidates[0].filename] = RenderGroup(candidates[0])
+                continue
+
+            by_quick: dict[str, list[AudioFile]] = collections.defaultdict(list)
+            for audio_file in candidates:
+                by_quick[audio_file.get_fingerprint()].append(audio_file)
+
+            for quick_matches in by_quick.values():
+                by_full: dict[str, list[AudioFile]] = collections.defaultdict(list)
+                for audio_file in quick_matches:
+                    key = (
+                        full_fingerprint(audio_file.filename)
+                        if len(quick_matches) > 1
+                        else audio_file.filename
+                    )
+                    by_full[key].append(audio_file)
+
+                for primary, *duplicates in by_full.values():
+                    groups_by_primary[primary.filename] = RenderGroup(
+                        primary, duplicates
+                    )
+
+        # Keep the order the user added the files in
+        plan = BatchPlan(
+            [
+                groups_by_primary[filename]
+                for filename in dict.fromkeys(
+                    audio_file.filename for audio_file in selected_files
+                )
+                if filename in groups_by_primary
+            ]
+        )
+        if plan.saved_renders:
+            logger.info(
+                f"Found {plan.saved_renders} duplicate input(s), "
+                f"rendering {len(plan.groups)} unique file(s)"
+            )
+        return plan
+
+    @staticmethod
+    def _group_key(audio_file: AudioFile) -> tuple:
+        # Identical bytes decoded as a different format are not the same input,
+        # and a different output format means a different render
+        return (
+            os.path.getsize(audio_file.filename),
+            audio_file.source_ext,
+            audio_file.destination_ext,
+        )
@@ -0,0 +1,84 @@
+import dataclasses
+import hashlib
+import json
+import typing
+
+from audio_chef.models.preset import Transformation
+
+TransformationKey = tuple[str | None, str]
+
+
+def transformation_key(transformation: Transformation) -> TransformationKey:
+    return (
+        transformation.name,
+        json.dumps(transformation.params, sort_keys=True, default=str),
+    )
+
+
+def chain_hash(transformations: list[Transformation]) -> str:
+    """A stable id for a chain, equal for chains with the same stages and params."""
+    keys = [transformation_key(transformation) for transformation in transformations]
+    return hashlib.blake2b(json.dumps(keys).encode(), digest_size=16).hexdigest()
+
+
+@dataclasses.dataclass
+class ChainNode:
+    """A run of transformations shared by every preset below this node.
+
+    `labels` are the presets whose chain ends exactly here.
+    """
+
+    transformations: list[Transformation] = dataclasses.field(default_factory=list)
+    children: list["ChainNode"] = dataclasses.field(default_factory=list)
+    labels: list[str] = dataclasses.field(default_factory=list)
+
+
+def build_chain_tree(chains: dict[str, list[Transformation]]) -> ChainNode:
+    """Merge the chains into a prefix tree so shared leading stages run once."""
+    root: dict = {"children": {}, "labels": []}
+    for label, transformations in chains.items():
+        node = root
+        for transformation in transformations:
+            key = transformation_key(transformation)
+            node = node["children"].setdefault(
+                key, {"transformation": transformation, "children": {}, "labels": []}
+            )
+        node["labels"].append(label)
+
+    return _compress(ChainNode(labels=root["labels"]), root["children"])
+
+
+def _compress(node: ChainNode, children: dict) -> ChainNode:
+    # Single-child runs with no preset ending in between become one node, so
+    # they are processed by a single board
+    for child in children.values():
+        child_node = ChainNode([child["transformation"]], labels=child["labels"])
+        while len(child["children"]) == 1 and not child["labels"]:
+            (child,) = child["children"].values()
+            child_node.transformations.append(child["transformation"])
+            child_node.labels = child["labels"]
+        node.children.append(_compress(child_node, child["children"]))
+    return node
+
+
+def render_chain_tree(
+    node: ChainNode,
+    audio: typing.Any,
+    sample_rate: int,
+    process: typing.Callable[
+        [list[Transformation], typing.Any, int, list[Transformation]], typing.Any
+    ],
+    upstream: list[Transformation] | None = None,
+) -> typing.Iterator[tuple[str, typing.Any]]:
+    """Yield (label, result) for every preset, processing each node once.
+
+    `process` also gets the transformations already applied to its input.
+    """
+    upstream = upstream or []
+    if node.transformations:
+        audio = process(node.transformations, audio, sample_rate, upstream)
+        upstream = [*upstream, *node.transformations]
+    for label in node.labels:
+        yield label, audio
+    for child in node.children:
+        yield from render_chain_tree(child, audio, sample_rate, process, upstream)
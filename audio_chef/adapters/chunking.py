@@ -0,0 +1,86 @@
+"""Processing one long file over several cores.
+
+A chain whose output only depends on a bounded stretch of past input can be
+run over chunks of a file independently. Every chunk is processed together
+with enough input before it to warm the stages up, that pre-roll is dropped
+again, and neighbouring chunks are crossfaded over a short overlap.
+"""
+
+import concurrent.futures
+import math
+import typing
+
+import numpy
+
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.audio_formats import AudioData
+from audio_chef.utils.transformations import TRANSFORMATIONS
+
+CHUNK_S = 60.0
+CROSSFADE_S = 0.05
+
+
+def get_chain_memory_s(transformations: list[Transformation]) -> float | None:
+    """Seconds of input the chain's output depends on, None if unbounded.
+
+    Memories add up, a stage sees the tails of every stage before it.
+    """
+    total = 0.0
+    for transform in transformations:
+        wrapper = TRANSFORMATIONS.get(transform.name)
+        memory = wrapper.get_memory_s(transform.params) if wrapper else None
+        if memory is None:
+            return None
+        total += memory
+    return total
+
+
+def can_process_in_chunks(
+    transformations: list[Transformation], frames: int, sample_rate: int
+) -> bool:
+    memory_s = get_chain_memory_s(transformations)
+    # Short files gain nothing, and a huge pre-roll would process it all again
+    return (
+        memory_s is not None
+        and memory_s < CHUNK_S / 2
+        and frames > 2 * CHUNK_S * sample_rate
+    )
+
+
+def process_in_chunks(
+    process: typing.Callable[[AudioData], AudioData],
+    audio: AudioData,
+    sample_rate: int,
+    memory_s: float,
+    executor: concurrent.futures.Executor,
+    chunk_s: float = CHUNK_S,
+    crossfade_s: float = CROSSFADE_S,
+) -> AudioData:
+    """Run `process` over chunks of the audio in parallel and join the results.
+
+    `process` must keep the number of frames and be safe to call from several
+    threads at once, e.g. by building its own board per call.
+    """
+    chunk = int(chunk_s * sample_rate)
+    crossfade = int(crossfade_s * sample_rate)
+    lead_in = math.ceil(memory_s * sample_rate) + crossfade
+    assert chunk > crossfade, "chunks must be longer than their crossfade"
+
+    def process_chunk(start: int) -> AudioData:
+        lead = min(start, lead_in)
+        res = process(audio[start - lead : start + chunk])
+        # Keep the crossfade before the chunk, the rest of the lead is warm-up
+        return res[lead - min(start, crossfade) :]
+
+    results = executor.map(process_chunk, range(0, len(audio), chunk))
+    parts = [next(results)]
+    for res in results:
+        previous = parts.pop()
+        ramp = numpy.linspace(0, 1, crossfade, dtype=res.dtype)
+        if res.ndim > 1:
+            ramp = ramp[:, numpy.newaxis]
+        seam = (
+            previous[len(previous) - crossfade :] * (1 - ramp) + res[:crossfade] * ramp
+        )
+        parts.extend([previous[: len(previous) - crossfade], seam, res[crossfade:]])
+    return numpy.concatenate(parts)
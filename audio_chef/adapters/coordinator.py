@@ -0,0 +1,278 @@
+"""Serving a batch to render workers on other machines.
+
+The coordinator splits a batch into tasks and hands them out over HTTP with
+json bodies. Inputs and outputs are on storage every worker can reach, only
+filenames and reports go over the wire. A worker claims a task, sends a
+heartbeat while rendering it, and completes or fails it:
+
+    POST /claim                  {"worker"} -> 200 {"task"}, 204 wait, 410 done
+    POST /tasks/<id>/heartbeat   {"worker"} -> 200, 409 when reassigned
+    POST /tasks/<id>/complete    {"worker", "report"}
+    POST /tasks/<id>/fail        {"worker", "error"}
+    GET  /status
+
+A task whose worker stops sending heartbeats, or that failed, goes back to
+the queue for any worker, until it used up its attempts.
+"""
+
+import dataclasses
+import enum
+import http
+import http.server
+import json
+import logging
+import threading
+import time
+import uuid
+
+from audio_chef.adapters.batch_planner import BatchPlanner
+from audio_chef.adapters.repository import PresetRepository
+from audio_chef.models.report import BatchReport
+from audio_chef.models.task import RenderTask
+from audio_chef.utils.audio_formats import AudioFile
+
+logger = logging.getLogger("audiochef")
+
+HEARTBEAT_TIMEOUT_S = 30.0
+MAX_ATTEMPTS = 3
+
+
+class TaskStatus(enum.StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclasses.dataclass
+class _TaskState:
+    task: RenderTask
+    status: TaskStatus = TaskStatus.PENDING
+    worker: str | None = None
+    heartbeat: float = 0.0
+    attempts: int = 0
+    error: str | None = None
+
+
+class Coordinator:
+    def __init__(
+        self,
+        tasks: list[RenderTask],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        heartbeat_timeout_s: float = HEARTBEAT_TIMEOUT_S,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.heartbeat_timeout_s = heartbeat_timeout_s
+        self.max_attempts = max_attempts
+        self.report = BatchReport()
+        self._tasks = {task.id: _TaskState(task) for task in tasks}
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._server = http.server.ThreadingHTTPServer(
+            (host, port), self._make_handler()
+        )
+        self._threads: list[threading.Thread] = []
+        if not tasks:
+            self._finished.set()
+
+    @classmethod
+    def from_preset(
+        cls, preset_id: int, filenames: list[str], **kwargs
+    ) -> "Coordinator":
+        """One task per input, duplicates of an input go with it."""
+        preset = PresetRepository.get_by_id(preset_id)
+        plan = BatchPlanner.plan([AudioFile(filename) for filename in filenames])
+        tasks = [
+            RenderTask(
+                id=uuid.uuid4().hex,
+                filenames=[
+                    audio_file.filename
+                    for audio_file in [group.primary, *group.duplicates]
+                ],
+                preset=preset,
+            )
+            for group in plan.groups
+        ]
+        return cls(tasks, **kwargs)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def start(self) -> None:
+        self._threads = [
+            threading.Thread(
+                target=self._server.serve_forever,
+                name="audiochef-coordinator",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._reap, name="audiochef-coordinator-reaper", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Serving {len(self._tasks)} task(s) on {self.url}")
+
+    def wait(self, timeout: float | None = None) -> BatchReport:
+        """Block until every task is done or failed for good."""
+        self._finished.wait(timeout)
+        return self.report
+
+    def shutdown(self) -> None:
+        self._finished.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+    def status(self) -> dict[str, int]:
+        with self._lock:
+            counts = {status.value: 0 for status in TaskStatus}
+            for state in self._tasks.values():
+                counts[state.status] += 1
+            return counts
+
+    def claim(self, worker: str) -> RenderTask | None:
+        with self._lock:
+            for state in self._tasks.values():
+                if state.status == TaskStatus.PENDING:
+                    state.status = TaskStatus.RUNNING
+                    state.worker = worker
+                    state.heartbeat = time.monotonic()
+                    state.attempts += 1
+                    logger.info(f"Task {state.task.id} went to {worker}")
+                    return state.task
+        return None
+
+    def heartbeat(self, task_id: str, worker: str) -> bool:
+        """False when the task is no longer the worker's."""
+        with self._lock:
+            state = self._tasks.get(task_id)
+            if state is None or not self._owns(state, worker):
+                return False
+            state.heartbeat = time.monotonic()
+            return True
+
+    def complete(self, task_id: str, worker: str, report: BatchReport) -> bool:
+        with self._lock:
+            state = self._tasks.get(task_id)
+            if state is None or not self._owns(state, worker):
+                return False
+            state.status = TaskStatus.DONE
+            self.report.merge(report)
+            self._check_finished()
+            return True
+
+    def fail(self, task_id: str, worker: str, error: str) -> bool:
+        with self._lock:
+            state = self._tasks.get(task_id)
+            if state is None or not self._owns(state, worker):
+                return False
+            logger.error(f"Task {task_id} failed on {worker}: {error}")
+            state.error = error
+            self._retry(state)
+            return True
+
+    @staticmethod
+    def _owns(state: _TaskState, worker: str) -> bool:
+        return state.status == TaskStatus.RUNNING and state.worker == worker
+
+    def _retry(self, state: _TaskState) -> None:
+        state.worker = None
+        if state.attempts < self.max_attempts:
+            state.status = TaskStatus.PENDING
+            return
+        state.status = TaskStatus.FAILED
+        self.report.success = False
+        self.report.failed_files.extend(state.task.filenames)
+        self._check_finished()
+
+    def _check_finished(self) -> None:
+        if all(
+            state.status in (TaskStatus.DONE, TaskStatus.FAILED)
+            for state in self._tasks.values()
+        ):
+            logger.info(self.report.summary())
+            self._finished.set()
+
+    def _reap(self) -> None:
+        while not self._finished.wait(self.heartbeat_timeout_s / 4):
+            deadline = time.monotonic() - self.heartbeat_timeout_s
+            with self._lock:
+                for state in self._tasks.values():
+                    if (
+                        state.status == TaskStatus.RUNNING
+                        and state.heartbeat < deadline
+                    ):
+                        logger.warning(
+                            f"Worker {state.worker} stopped sending heartbeats, "
+                            f"reassigning task {state.task.id}"
+                        )
+                        self._retry(state)
+
+    def _make_handler(self) -> type[http.server.BaseHTTPRequestHandler]:
+        coordinator = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/status":
+                    self._reply(http.HTTPStatus.OK, coordinator.status())
+                else:
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+
+            def do_POST(self):
+                body = json.loads(
+                    self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}"
+                )
+                worker = body.get("worker", "")
+                parts = self.path.strip("/").split("/")
+                if parts == ["claim"]:
+                    self._claim(worker)
+                    return
+                if len(parts) != 3 or parts[0] != "tasks":
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+                    return
+                task_id, action = parts[1:]
+                if action == "heartbeat":
+                    owned = coordinator.heartbeat(task_id, worker)
+                elif action == "complete":
+                    owned = coordinator.complete(
+                        task_id, worker, BatchReport.from_dict(body["report"])
+                    )
+                elif action == "fail":
+                    owned = coordinator.fail(task_id, worker, body.get("error", ""))
+                else:
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+                    return
+                self._reply(http.HTTPStatus.OK if owned else http.HTTPStatus.CONFLICT)
+
+            def _claim(self, worker: str) -> None:
+                task = coordinator.claim(worker)
+                if task:
+                    self._reply(http.HTTPStatus.OK, {"task": task.to_dict()})
+                elif coordinator.finished:
+                    self._reply(http.HTTPStatus.GONE)
+                else:
+                    # Everything left is running, a task may still come back
+                    self._reply(http.HTTPStatus.NO_CONTENT)
+
+            def _reply(self, status: http.HTTPStatus, body: dict | None = None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+        return Handler
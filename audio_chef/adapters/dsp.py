@@ -0,0 +1,186 @@
+"""Board construction and processing that runs inside worker processes.
+
+Nothing here may import kivy, so spawning a worker stays cheap.
+"""
+
+import dataclasses
+import logging
+import typing
+
+import numpy
+import pedalboard
+
+from audio_chef.adapters.chain_tree import chain_hash
+from audio_chef.adapters.measurement_cache import MeasurementCache
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.audio_formats import AudioData
+from audio_chef.utils.resampling import resample
+from audio_chef.utils.shared_audio import SharedAudioBuffer, SharedAudioHandle
+from audio_chef.utils.transformations import (
+    TRANSFORMATIONS,
+    AnalysisTransform,
+    Measure,
+    NativeTransform,
+)
+
+logger = logging.getLogger("audiochef")
+
+# load_plugin(name, params) returns an external plugin set to the params
+LoadPlugin = typing.Callable[[str, dict], pedalboard.Plugin]
+
+
+class ProcessingChain:
+    """Runs a chain the way a single board would.
+
+    Consecutive plugins share one board, analysis and native transforms run
+    between them. An analysis transform's measurement is cached under the
+    source and every transformation before it, so only a change of the source
+    or of an earlier stage measures again.
+
+    Native transforms that work in place only get buffers the chain owns, so
+    the caller's audio is copied at most once, and not at all after a board.
+
+    With a target sample rate, audio is downsampled before the first stage and
+    upsampled after the last, so the stages run at the cheaper of both rates.
+
+    Transformations that are not in TRANSFORMATIONS are external plugins,
+    they are created by `load_plugin`, which only the plugin host provides.
+    """
+
+    Stage = pedalboard.Pedalboard | AnalysisTransform | NativeTransform
+
+    def __init__(
+        self,
+        transformations: list[Transformation],
+        target_sample_rate: int | None = None,
+        load_plugin: LoadPlugin | None = None,
+    ):
+        self.target_sample_rate = target_sample_rate
+        self.stages: list[tuple[list[Transformation], ProcessingChain.Stage]] = []
+        plugins: list[pedalboard.Plugin] = []
+        for index, transform in enumerate(transformations):
+            if transform.name in TRANSFORMATIONS:
+                stage = get_transform_class(transform.name)(**transform.params)
+            elif load_plugin is not None:
+                stage = load_plugin(transform.name, transform.params)
+            else:
+                raise ValueError(
+                    f"{transform.name} is an external plugin, run it in the plugin host"
+                )
+            if isinstance(stage, (AnalysisTransform, NativeTransform)):
+                if plugins:
+                    self.stages.append(
+                        (transformations[:index], pedalboard.Pedalboard(plugins))
+                    )
+                    plugins = []
+                self.stages.append((transformations[:index], stage))
+            else:
+                plugins.append(stage)
+        if plugins or not self.stages:
+            self.stages.append((transformations, pedalboard.Pedalboard(plugins)))
+
+    def __call__(
+        self,
+        audio: AudioData,
+        sample_rate: int,
+        source_key: str | None = None,
+        upstream: list[Transformation] | None = None,
+    ) -> AudioData:
+        """Process the audio, which is left untouched.
+
+        `source_key` identifies the audio given before `upstream` was applied
+        to it, usually the source file's fingerprint. Without it measurements
+        are not cached.
+        """
+        owned = False
+        processing_rate = get_processing_sample_rate(
+            sample_rate, self.target_sample_rate
+        )
+        if processing_rate != sample_rate:
+            audio, owned = resample(audio, sample_rate, processing_rate), True
+            sample_rate = processing_rate
+            source_key = source_key and f"{source_key}@{processing_rate}"
+        for prefix, stage in self.stages:
+            if isinstance(stage, NativeTransform):
+                if stage.in_place and not owned:
+                    audio, owned = audio.copy(), True
+                res = stage.process(audio, sample_rate)
+            elif isinstance(stage, AnalysisTransform):
+                measure = self._measure(source_key, [*(upstream or []), *prefix])
+                res = stage.process(audio, sample_rate, measure)
+            else:
+                res = stage(audio, sample_rate)
+            # Views such as a trim stay owned by whoever owned their base
+            owned = owned or not numpy.may_share_memory(res, audio)
+            audio = res
+        if self.output_sample_rate(sample_rate) != sample_rate:
+            audio = resample(audio, sample_rate, self.output_sample_rate(sample_rate))
+        return audio
+
+    def output_sample_rate(self, sample_rate: int) -> int:
+        return self.target_sample_rate or sample_rate
+
+    @staticmethod
+    def _measure(source_key: str | None, prefix: list[Transformation]) -> Measure:
+        def measure(name: str, compute: typing.Callable[[], float]) -> float:
+            if source_key is None:
+                return compute()
+            measurement_key = f"{chain_hash(prefix)}:{name}"
+            value = MeasurementCache.get(source_key, measurement_key)
+            if value is None:
+                value = compute()
+                MeasurementCache.put(source_key, measurement_key, value)
+            return value
+
+        return measure
+
+
+def prepare_board(
+    transformations: list[Transformation],
+    target_sample_rate: int | None = None,
+    load_plugin: LoadPlugin | None = None,
+) -> ProcessingChain:
+    logger.debug(transformations)
+    return ProcessingChain(transformations, target_sample_rate, load_plugin)
+
+
+def uses_external_plugins(transformations: list[Transformation]) -> bool:
+    return any(transform.name not in TRANSFORMATIONS for transform in transformations)
+
+
+def get_processing_sample_rate(sample_rate: int, target_sample_rate: int | None) -> int:
+    """Stages run at the target rate when downsampling, else at the source's."""
+    if target_sample_rate is None:
+        return sample_rate
+    return min(sample_rate, target_sample_rate)
+
+
+def get_transform_class(
+    transform_name: str,
+) -> typing.Callable[..., ProcessingChain.Stage | pedalboard.Plugin]:
+    return TRANSFORMATIONS[transform_name].transform
+
+
+def picklable(transformations: list[Transformation]) -> list[Transformation]:
+    # show_editor is a closure over a db row and only matters in the GUI
+    return [dataclasses.replace(t, show_editor=None) for t in transformations]
+
+
+def process_shared_audio(
+    handle: SharedAudioHandle,
+    transformations: list[Transformation],
+    source_key: str | None = None,
+    target_sample_rate: int | None = None,
+    load_plugin: LoadPlugin | None = None,
+) -> SharedAudioHandle:
+    """Run the board over a shared buffer and return the result the same way.
+
+    The result buffer is disowned before returning, the caller must `adopt` it.
+    """
+    board = prepare_board(transformations, target_sample_rate, load_plugin)
+    with SharedAudioBuffer.attach(handle) as source:
+        res = board(source.array, handle.sample_rate, source_key)
+        # Copied while attached, the result may be a view of the source, e.g. a trim
+        return SharedAudioBuffer.from_array(
+            res, board.output_sample_rate(handle.sample_rate)
+        ).disown()
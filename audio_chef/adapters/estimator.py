@@ -0,0 +1,301 @@
+"""Predicting a batch's cost from the throughput of past runs.
+
+Rates are seconds, or bytes, per second of audio, kept in the database for
+every decoder, transformation and encoder. Transformations also have a rate
+per order of magnitude of their parameters, used once it has a history, as
+e.g. a long reverb costs more than a short one. Anything without a history
+falls back to a rough default, until a run on this machine measured it.
+"""
+
+import collections
+import math
+import os
+import threading
+import time
+import typing
+
+import soundfile  # type: ignore
+
+from audio_chef.adapters.batch_planner import BatchPlan
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.repository import ThroughputRepository
+from audio_chef.models.catalog import FileCatalog
+from audio_chef.models.estimate import BatchEstimate, BatchProgress, FileEstimate
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.audio_formats import AudioFile
+
+DEFAULT_RATES = {"decode": 0.01, "encode": 0.02, "transform": 0.005}
+# Bytes per second of audio, for formats without a history
+DEFAULT_BYTES_PER_S = {"wav": 192000, "aiff": 192000, "flac": 100000}
+COMPRESSED_BYTES_PER_S = 16000
+DEFAULT_SAMPLE_RATE = 48000
+DEFAULT_CHANNELS = 2
+# A file in flight is held decoded as float64 and rendered as float32
+IN_FLIGHT_BYTES_PER_SAMPLE = 8 + 4
+# Internal files are 16 bit PCM
+SCRATCH_BYTES_PER_SAMPLE = 2
+
+
+def decode_key(ext: str) -> str:
+    return f"decode:{ext}"
+
+
+def encode_key(ext: str) -> str:
+    return f"encode:{ext}"
+
+
+def source_size_key(ext: str) -> str:
+    return f"source_bytes:{ext}"
+
+
+def output_size_key(ext: str) -> str:
+    return f"output_bytes:{ext}"
+
+
+def parameter_bucket(params: dict) -> str:
+    buckets = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = f"1e{math.floor(math.log10(abs(value)))}" if value else "0"
+        buckets.append(f"{name}={value}")
+    return ",".join(buckets)
+
+
+def transform_keys(transform: Transformation) -> list[str]:
+    """The name's key, then the parameter bucket's when there are parameters."""
+    keys = [f"transform:{transform.name}"]
+    if transform.params:
+        keys.append(f"transform:{transform.name}|{parameter_bucket(transform.params)}")
+    return keys
+
+
+class Rates:
+    def __init__(self, measured: dict[str, float]):
+        self.measured = measured
+
+    @classmethod
+    def load(cls, transformations: list[Transformation], exts: list[str]) -> "Rates":
+        keys = [
+            key for transform in transformations for key in transform_keys(transform)
+        ]
+        for ext in exts:
+            keys.extend(
+                [
+                    decode_key(ext),
+                    encode_key(ext),
+                    source_size_key(ext),
+                    output_size_key(ext),
+                ]
+            )
+        return cls(ThroughputRepository.get_rates(keys))
+
+    def get(self, key: str) -> float:
+        if key in self.measured:
+            return self.measured[key]
+        kind, ext = key.split(":", 1)
+        if kind in ("source_bytes", "output_bytes"):
+            return DEFAULT_BYTES_PER_S.get(ext, COMPRESSED_BYTES_PER_S)
+        return DEFAULT_RATES[kind]
+
+    def transform_rate(self, transform: Transformation) -> float:
+        keys = transform_keys(transform)
+        return next(
+            (self.measured[key] for key in reversed(keys) if key in self.measured),
+            self.get(keys[0]),
+        )
+
+    def chain_rate(self, transformations: list[Transformation]) -> float:
+        return sum(self.transform_rate(transform) for transform in transformations)
+
+
+def probe(audio_file: AudioFile, rates: Rates) -> tuple[float, int, int, bool]:
+    """Duration, sample rate, channels, and whether they were read from the file."""
+    try:
+        info = soundfile.info(audio_file.filename)
+        return info.duration, info.samplerate, info.channels, True
+    except RuntimeError:
+        # Formats libsndfile cannot read, guessed from the size
+        bytes_per_s = rates.get(source_size_key(audio_file.source_ext))
+        duration = os.path.getsize(audio_file.filename) / bytes_per_s
+        return duration, DEFAULT_SAMPLE_RATE, DEFAULT_CHANNELS, False
+
+
+def estimate_batch(
+    plan: BatchPlan,
+    transformations: list[Transformation],
+    additional_exts: list[str],
+    pipeline_config: PipelineConfig,
+    target_sample_rate: int | None,
+    rates: Rates,
+    catalog: FileCatalog | None = None,
+) -> BatchEstimate:
+    """With `catalog`, files are probed once and read from it after."""
+    chain_rate = rates.chain_rate(transformations)
+    files = []
+    in_flight_sizes = []
+    scratch_bytes = output_bytes = 0
+    for group in plan.groups:
+        primary = group.primary
+        cached = catalog.get_probe(primary.filename) if catalog is not None else None
+        if cached:
+            (duration, sample_rate, channels), probed = cached, True
+        else:
+            duration, sample_rate, channels, probed = probe(primary, rates)
+            if catalog is not None and probed:
+                catalog.set_probe(primary.filename, duration, sample_rate, channels)
+        exts = list(dict.fromkeys([primary.destination_ext, *additional_exts]))
+        files.append(
+            FileEstimate(
+                filename=primary.filename,
+                duration_s=duration,
+                decode_s=duration * rates.get(decode_key(primary.source_ext)),
+                process_s=duration * chain_rate,
+                encode_s=duration * sum(rates.get(encode_key(ext)) for ext in exts),
+                outputs=[primary.get_destination_filename(ext) for ext in exts],
+                probed=probed,
+            )
+        )
+        for duplicate in group.duplicates:
+            files.append(
+                FileEstimate(
+                    filename=duplicate.filename,
+                    duration_s=duration,
+                    decode_s=0,
+                    process_s=0,
+                    encode_s=0,
+                    outputs=[duplicate.get_destination_filename(ext) for ext in exts],
+                    probed=probed,
+                )
+            )
+        frames = duration * max(sample_rate, target_sample_rate or 0)
+        in_flight_sizes.append(frames * channels * IN_FLIGHT_BYTES_PER_SAMPLE)
+        scratch_bytes += frames * channels * SCRATCH_BYTES_PER_SAMPLE
+        output_bytes += (1 + len(group.duplicates)) * sum(
+            duration * rates.get(output_size_key(ext)) for ext in exts
+        )
+
+    rendered = [file for file in files if file.cost_s]
+    stages = [
+        ([file.decode_s for file in rendered], pipeline_config.decode_workers),
+        ([file.process_s for file in rendered], pipeline_config.dsp_workers),
+        ([file.encode_s for file in rendered], pipeline_config.encode_workers),
+    ]
+    stage_totals = [sum(costs) / workers for costs, workers in stages]
+    bottleneck = max(range(len(stages)), key=stage_totals.__getitem__)
+    # The slowest stage sets the pace, the others add one file at either end
+    total_s = stage_totals[bottleneck] + sum(
+        sum(costs) / len(costs)
+        for index, (costs, _) in enumerate(stages)
+        if index != bottleneck and costs
+    )
+    in_flight = (
+        pipeline_config.decode_workers
+        + pipeline_config.dsp_workers
+        + pipeline_config.encode_workers
+        + 2 * pipeline_config.queue_size
+    )
+
+    used_keys = {decode_key(group.primary.source_ext) for group in plan.groups}
+    for ext in {*(g.primary.destination_ext for g in plan.groups), *additional_exts}:
+        used_keys.update([encode_key(ext), output_size_key(ext)])
+    measured = sum(key in rates.measured for key in used_keys) + sum(
+        any(key in rates.measured for key in transform_keys(transform))
+        for transform in transformations
+    )
+    return BatchEstimate(
+        files=files,
+        total_s=total_s,
+        peak_memory_bytes=int(sum(sorted(in_flight_sizes)[-in_flight:])),
+        scratch_bytes=int(scratch_bytes),
+        output_bytes=int(output_bytes),
+        measured_rates=measured,
+        total_rates=len(used_keys) + len(transformations),
+    )
+
+
+class ThroughputRecorder:
+    """Measurements of one batch, added to the history when it is saved."""
+
+    def __init__(self, rates: Rates):
+        self.rates = rates
+        self._lock = threading.Lock()
+        self._measurements: dict[str, list[float]] = collections.defaultdict(
+            lambda: [0.0, 0.0]
+        )
+
+    def add(self, key: str, audio_s: float, total: float) -> None:
+        if audio_s <= 0:
+            return
+        with self._lock:
+            measurement = self._measurements[key]
+            measurement[0] += audio_s
+            measurement[1] += total
+
+    def add_chain(
+        self, transformations: list[Transformation], audio_s: float, elapsed_s: float
+    ) -> None:
+        """Split the chain's time between its transformations, as expected so far.
+
+        Stages share a board, so they cannot be timed on their own.
+        """
+        if not transformations:
+            return
+        expected = [self.rates.transform_rate(t) for t in transformations]
+        for transform, rate in zip(transformations, expected):
+            share = elapsed_s * rate / sum(expected)
+            for key in transform_keys(transform):
+                self.add(key, audio_s, share)
+
+    def save(self) -> None:
+        with self._lock:
+            measurements = {
+                key: (audio_s, total)
+                for key, (audio_s, total) in self._measurements.items()
+            }
+            self._measurements.clear()
+        if measurements:
+            ThroughputRepository.record(measurements)
+
+
+class EtaTracker:
+    """Remaining time of a running batch, trusting its speed more as it goes."""
+
+    def __init__(
+        self,
+        estimate: BatchEstimate,
+        callback: typing.Callable[[BatchProgress], None],
+    ):
+        self.estimate = estimate
+        self.callback = callback
+        self._expected = {file.filename: file.cost_s for file in estimate.files}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._done_files = 0
+        self._done_cost = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self.callback(
+            BatchProgress(0, len(self.estimate.files), 0.0, self.estimate.total_s)
+        )
+
+    def files_done(self, filenames: list[str]) -> None:
+        with self._lock:
+            self._done_files += len(filenames)
+            self._done_cost += sum(self._expected.get(f, 0.0) for f in filenames)
+            elapsed = time.perf_counter() - self._started
+            total_cost = self.estimate.cost_s
+            done = (
+                self._done_cost / total_cost
+                if total_cost
+                else self._done_files / len(self.estimate.files)
+            )
+            remaining = 1 - min(done, 1.0)
+            expected_s = remaining * self.estimate.total_s
+            # The pace so far, trusted as much as the part of the batch it covers
+            measured_s = elapsed * remaining / done if done else expected_s
+            eta = done * measured_s + remaining * expected_s
+            progress = BatchProgress(
+                self._done_files, len(self.estimate.files), elapsed, eta
+            )
+        self.callback(progress)
@@ -0,0 +1,197 @@
+"""A local HTTP API for other programs to hand files to a running AudioChef.
+
+It only listens on the loopback interface, bodies are json and must be sent
+as such. Requests from web pages, which carry a foreign Origin, are refused:
+
+    POST /jobs        {"preset_id", "files"} -> 202 {"job"}
+    GET  /jobs                               -> 200 {"jobs"}
+    GET  /jobs/<id>                          -> 200 {"job"}
+    GET  /events[?job=<id>]                  -> server-sent events
+
+Jobs go to the same scheduler as the app's own batches. Outputs are named by
+the preset, next to their inputs. The event stream sends a "job" event with
+the job on every change, and ends after the job's last one when filtered.
+"""
+
+import http
+import http.server
+import json
+import logging
+import os
+import queue
+import threading
+import urllib.parse
+
+import peewee
+
+from audio_chef.adapters.jobs import JobScheduler
+from audio_chef.adapters.repository import PresetRepository
+from audio_chef.models.job import Job
+from audio_chef.utils.audio_formats import AudioFile, NoCompatibleAudioFormatException
+
+logger = logging.getLogger("audiochef")
+
+DEFAULT_PORT = 8766
+# Comment lines sent on quiet event streams, to notice gone clients
+KEEP_ALIVE_S = 15.0
+
+
+class JobApi:
+    def __init__(
+        self, scheduler: JobScheduler, host: str = "127.0.0.1", port: int = DEFAULT_PORT
+    ):
+        self.scheduler = scheduler
+        self._stopping = threading.Event()
+        self._server = http.server.ThreadingHTTPServer(
+            (host, port), self._make_handler()
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="audiochef-job-api", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Accepting jobs on {self.url}")
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def submit(self, preset_id: int, filenames: list[str]) -> Job:
+        """Raises for unknown presets and unsupported files."""
+        preset = PresetRepository.get_by_id(preset_id)
+        audio_files = []
+        for filename in filenames:
+            audio_file = AudioFile(os.path.abspath(filename))
+            audio_file.update_destination_name_and_ext(
+                preset.get_output_filename(audio_file.filename)
+            )
+            audio_files.append(audio_file)
+        return self.scheduler.submit(preset, audio_files, source="api")
+
+    def _make_handler(self) -> type[http.server.BaseHTTPRequestHandler]:
+        api = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                parts = url.path.strip("/").split("/")
+                if parts == ["jobs"]:
+                    jobs = [job.to_dict() for job in api.scheduler.jobs()]
+                    self._reply(http.HTTPStatus.OK, {"jobs": jobs})
+                elif len(parts) == 2 and parts[0] == "jobs":
+                    job = api.scheduler.get(parts[1])
+                    if job:
+                        self._reply(http.HTTPStatus.OK, {"job": job.to_dict()})
+                    else:
+                        self._reply(http.HTTPStatus.NOT_FOUND)
+                elif parts == ["events"]:
+                    query = urllib.parse.parse_qs(url.query)
+                    self._stream_events(query.get("job", [None])[0])
+                else:
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/jobs":
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+                    return
+                # Browsers send simple cross-site posts without asking first,
+                # but only json from the same origin can get through here
+                origin = self.headers.get("Origin")
+                if origin is not None and origin != api.url:
+                    self._reply(
+                        http.HTTPStatus.FORBIDDEN,
+                        {"error": f"requests from {origin} are not allowed"},
+                    )
+                    return
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.split(";")[0].strip().lower() != "application/json":
+                    self._reply(
+                        http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                        {"error": "expected an application/json body"},
+                    )
+                    return
+                try:
+                    body = json.loads(
+                        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                    )
+                    preset_id, filenames = int(body["preset_id"]), body["files"]
+                except (ValueError, KeyError, TypeError):
+                    self._reply(
+                        http.HTTPStatus.BAD_REQUEST,
+                        {"error": 'expected {"preset_id": int, "files": [str]}'},
+                    )
+                    return
+                try:
+                    job = api.submit(preset_id, filenames)
+                except peewee.DoesNotExist:
+                    self._reply(
+                        http.HTTPStatus.NOT_FOUND,
+                        {"error": f"no preset with id {preset_id}"},
+                    )
+                    return
+                except NoCompatibleAudioFormatException as e:
+                    self._reply(http.HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                    return
+                self._reply(http.HTTPStatus.ACCEPTED, {"job": job.to_dict()})
+
+            def _stream_events(self, job_id: str | None) -> None:
+                if job_id and not api.scheduler.get(job_id):
+                    self._reply(http.HTTPStatus.NOT_FOUND)
+                    return
+                events: queue.Queue[Job] = queue.Queue()
+
+                def listener(job: Job) -> None:
+                    if job_id in (None, job.id):
+                        events.put(job)
+
+                api.scheduler.add_listener(listener)
+                self.send_response(http.HTTPStatus.OK)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    job = api.scheduler.get(job_id) if job_id else None
+                    if job:
+                        # The job may have finished before the stream opened
+                        events.put(job)
+                    while not api._stopping.is_set():
+                        try:
+                            job = events.get(timeout=KEEP_ALIVE_S)
+                        except queue.Empty:
+                            self.wfile.write(b": keep-alive\n\n")
+                            self.wfile.flush()
+                            continue
+                        data = json.dumps(job.to_dict())
+                        self.wfile.write(f"event: job\ndata: {data}\n\n".encode())
+                        self.wfile.flush()
+                        if job_id and job.finished:
+                            return
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    api.scheduler.remove_listener(listener)
+
+            def _reply(self, status: http.HTTPStatus, body: dict | None = None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+        return Handler
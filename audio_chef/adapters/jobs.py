@@ -0,0 +1,206 @@
+"""One queue for every batch, whether it comes from the app or the job API.
+
+Jobs run one batch at a time on the app's warm worker pool. Jobs queued with
+the same preset are taken together into one batch, so many small submissions,
+e.g. one file each from a file manager, flow through the pipeline like one
+big drop of files into the app.
+
+Other work on the app's files, like comparing presets, is queued as a task
+so it never runs alongside a batch using the same files.
+"""
+
+import collections
+import dataclasses
+import logging
+import threading
+import typing
+import uuid
+
+from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.silence import SilenceConfig
+from audio_chef.adapters.worker_pool import WorkerPool
+from audio_chef.models.estimate import BatchProgress
+from audio_chef.models.job import Job, JobStatus
+from audio_chef.models.preset import Preset
+from audio_chef.models.report import BatchReport
+from audio_chef.utils.audio_formats import AudioFile
+
+logger = logging.getLogger("audiochef")
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 1000
+
+Listener = typing.Callable[[Job], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchOptions:
+    pipeline_config: PipelineConfig = PipelineConfig()
+    analyze_outputs: bool = False
+    silence_config: SilenceConfig | None = None
+
+
+# Runs a task with the options of the moment, reporting like a batch
+Task = typing.Callable[[BatchOptions], BatchReport]
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        worker_pool: WorkerPool,
+        get_options: typing.Callable[[], BatchOptions] = BatchOptions,
+    ):
+        self.worker_pool = worker_pool
+        # Read when a batch starts, so settings changed meanwhile apply
+        self.get_options = get_options
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, Task] = {}
+        self._queue: collections.deque[Job] = collections.deque()
+        self._condition = threading.Condition()
+        self._listeners: list[Listener] = []
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="audiochef-jobs", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Finish the running batch, queued jobs are dropped."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+
+    def submit(
+        self, preset: Preset, audio_files: list[AudioFile], source: str = "api"
+    ) -> Job:
+        job = Job(uuid.uuid4().hex, preset, list(audio_files), source)
+        with self._condition:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._condition.notify_all()
+        logger.info(f"Queued job {job.id} from {source} ({len(job.files)} file(s))")
+        self._notify(job)
+        return job
+
+    def submit_task(
+        self, kind: str, audio_files: list[AudioFile], task: Task, source: str = "app"
+    ) -> Job:
+        """Queue a task on the files, run on its own in turn with the batches."""
+        job = Job(uuid.uuid4().hex, None, list(audio_files), source, kind)
+        with self._condition:
+            self._jobs[job.id] = job
+            self._tasks[job.id] = task
+            self._queue.append(job)
+            self._condition.notify_all()
+        logger.info(f"Queued {kind} task {job.id} ({len(job.files)} file(s))")
+        self._notify(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._condition:
+            return list(self._jobs.values())
+
+    def add_listener(self, listener: Listener) -> None:
+        """Called from the scheduler's thread whenever a job changes."""
+        with self._condition:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        with self._condition:
+            self._listeners.remove(listener)
+
+    def _notify(self, job: Job) -> None:
+        with self._condition:
+            listeners = self._listeners[:]
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception:
+                logger.exception("A job listener failed")
+
+    def _next_batch(self) -> list[Job] | None:
+        with self._condition:
+            while not self._queue and not self._stopping:
+                self._condition.wait()
+            if self._stopping:
+                return None
+            first = self._queue.popleft()
+            if first.id in self._tasks:
+                return [first]
+            batch = [first] + [
+                job
+                for job in self._queue
+                if job.id not in self._tasks and job.preset == first.preset
+            ]
+            for job in batch[1:]:
+                self._queue.remove(job)
+            return batch
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            self._run_batch(batch)
+            self._forget_finished()
+
+    def _run_batch(self, batch: list[Job]) -> None:
+        preset = batch[0].preset
+        with self._condition:
+            task = self._tasks.pop(batch[0].id, None)
+        options = self.get_options()
+        for job in batch:
+            job.status = JobStatus.RUNNING
+            self._notify(job)
+
+        def progress(batch_progress: BatchProgress) -> None:
+            for job in batch:
+                job.progress = batch_progress
+                self._notify(job)
+
+        try:
+            if task:
+                report = task(options)
+            else:
+                report = AudioClient.execute_batch(
+                    preset.ext,
+                    [audio_file for job in batch for audio_file in job.files],
+                    preset.transformations,
+                    options.pipeline_config,
+                    additional_exts=preset.additional_exts,
+                    encoder_settings=preset.encoder_settings,
+                    target_sample_rate=preset.target_sample_rate,
+                    analyze_outputs=options.analyze_outputs,
+                    silence_config=options.silence_config,
+                    worker_pool=self.worker_pool,
+                    progress=progress,
+                )
+        except Exception as e:
+            logger.exception("A batch failed")
+            for job in batch:
+                job.status = JobStatus.FAILED
+                job.summary = f"{type(e).__name__}: {e}"
+                self._notify(job)
+            return
+
+        for job in batch:
+            filenames = {audio_file.filename for audio_file in job.files}
+            job.failed_files = [f for f in report.failed_files if f in filenames]
+            # Without failed files, the whole batch could not run
+            succeeded = report.success or (report.failed_files and not job.failed_files)
+            job.status = JobStatus.DONE if succeeded else JobStatus.FAILED
+            job.summary = report.summary()
+            self._notify(job)
+
+    def _forget_finished(self) -> None:
+        with self._condition:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[job_id]
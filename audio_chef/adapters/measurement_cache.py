@@ -0,0 +1,51 @@
+import json
+import logging
+import os
+import threading
+
+from audio_chef.utils.cache_dir import get_cache_path
+
+logger = logging.getLogger("audiochef")
+
+
+class MeasurementCache:
+    """Measurements of a source file's audio, keyed by its fingerprint.
+
+    Every source has one small json file in the user's cache directory,
+    mapping a measurement key to its value. Worker processes read and write
+    it too.
+    """
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_path(source_key: str) -> str:
+        return get_cache_path("measurements", source_key + ".json")
+
+    @classmethod
+    def get(cls, source_key: str, measurement_key: str) -> float | None:
+        return cls._read(cls.get_path(source_key)).get(measurement_key)
+
+    @classmethod
+    def put(cls, source_key: str, measurement_key: str, value: float) -> None:
+        path = cls.get_path(source_key)
+        with cls._lock:
+            measurements = cls._read(path)
+            measurements[measurement_key] = value
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so a reader never sees half a file
+            partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+            with open(partial_path, "w") as f:
+                json.dump(measurements, f)
+            os.replace(partial_path, path)
+
+    @staticmethod
+    def _read(path: str) -> dict[str, float]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable measurement file {path}")
+            return {}
@@ -0,0 +1,104 @@
+import concurrent.futures
+import logging
+import os
+import threading
+import typing
+
+import soundfile
+
+from audio_chef.utils.audio_formats import AudioData, AudioFile, AudioFormatter
+from audio_chef.utils.cache_dir import get_cache_path
+from audio_chef.utils.fingerprint import quick_fingerprint
+from audio_chef.utils.peaks import PeakPyramid
+from audio_chef.utils.scratch import ScratchStorage
+
+logger = logging.getLogger("audiochef")
+
+
+class PeakPyramidStore:
+    """Peak pyramids on disk, keyed by the fingerprint of the source file."""
+
+    # Started with the first request, worker processes never make one
+    _builder: concurrent.futures.ThreadPoolExecutor | None = None
+    _builder_lock = threading.Lock()
+
+    @staticmethod
+    def get_path(fingerprint: str) -> str:
+        return get_cache_path("peaks", fingerprint + ".npz")
+
+    @classmethod
+    def get_cached(cls, fingerprint: str) -> PeakPyramid | None:
+        path = cls.get_path(fingerprint)
+        if not os.path.exists(path):
+            return None
+        try:
+            return PeakPyramid.load(path)
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"Ignoring unreadable peak file {path}")
+            return None
+
+    @classmethod
+    def store_if_missing(
+        cls, audio_file: AudioFile, audio: AudioData, sample_rate: int
+    ) -> None:
+        """Called wherever a file is decoded anyway, so building is nearly free."""
+        path = cls.get_path(audio_file.get_fingerprint())
+        if not os.path.exists(path):
+            cls._save(PeakPyramid.build(audio, sample_rate), path)
+
+    @classmethod
+    def request(
+        cls,
+        filename: str,
+        audio_format: AudioFormatter,
+        callback: typing.Callable[[PeakPyramid], None],
+    ) -> concurrent.futures.Future:
+        """Load or build a file's pyramid off the calling thread.
+
+        Only the file's name and decoder are needed, so listing a file never
+        makes an `AudioFile` for it. `callback` runs on the builder thread,
+        UI code must hop back itself.
+        """
+
+        def build() -> PeakPyramid | None:
+            try:
+                fingerprint = quick_fingerprint(filename)
+                pyramid = cls.get_cached(fingerprint)
+                if pyramid is None:
+                    audio, sample_rate = cls._read_audio(
+                        filename, audio_format, fingerprint
+                    )
+                    pyramid = PeakPyramid.build(audio, sample_rate)
+                    cls._save(pyramid, cls.get_path(fingerprint))
+            except Exception:
+                logger.exception(f"Could not build peaks for {filename}")
+                return None
+            callback(pyramid)
+            return pyramid
+
+        with cls._builder_lock:
+            if cls._builder is None:
+                cls._builder = concurrent.futures.ThreadPoolExecutor(
+                    1, thread_name_prefix="audiochef-peaks"
+                )
+        return cls._builder.submit(build)
+
+    @staticmethod
+    def _read_audio(
+        filename: str, audio_format: AudioFormatter, fingerprint: str
+    ) -> tuple[AudioData, int]:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        decoded_file = ScratchStorage.new_path(f"{name}-peaks-{fingerprint}")
+        try:
+            audio_format.decode(filename, decoded_file)
+            return soundfile.read(decoded_file)
+        finally:
+            ScratchStorage.remove(decoded_file)
+
+    @staticmethod
+    def _save(pyramid: PeakPyramid, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a reader never sees half a file
+        partial_path = f"{path}.{os.getpid()}.partial"
+        pyramid.save(partial_path)
+        os.replace(partial_path, path)
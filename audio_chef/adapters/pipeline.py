@@ -0,0 +1,177 @@
+import dataclasses
+import logging
+import queue
+import threading
+import typing
+
+logger = logging.getLogger("audiochef")
+
+T = typing.TypeVar("T")
+
+_END = object()
+
+
+@dataclasses.dataclass(frozen=True)
+class PipelineConfig:
+    decode_workers: int = 1
+    dsp_workers: int = 1
+    encode_workers: int = 1
+    # How many decoded/processed files may wait between two stages. Each one
+    # holds a whole file's audio in memory, so keep this small.
+    queue_size: int = 2
+    # Run the DSP stage in worker processes instead of threads, for chains
+    # whose plugins hold the GIL
+    dsp_processes: bool = False
+    # Threads that split one long file into chunks, for chains with a short
+    # memory. 1 processes every file in one piece.
+    chunk_workers: int = 1
+
+
+class _Stage:
+    def __init__(
+        self,
+        name: str,
+        func: typing.Callable[[typing.Any], typing.Any],
+        workers: int,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        downstream_workers: int,
+        abort: threading.Event,
+        errors: list[BaseException],
+        discard: typing.Callable[[typing.Any], None] | None,
+    ):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.abort = abort
+        self.errors = errors
+        self.discard = discard
+        self.max_depth = 0
+        self._remaining_workers = workers
+        self._lock = threading.Lock()
+        self.threads = [
+            threading.Thread(
+                target=self._work, name=f"audiochef-{name}-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+
+    def _work(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _END:
+                break
+            if self.abort.is_set():
+                if self.discard is not None:
+                    self.discard(item)
+                continue
+            try:
+                result = self.func(item)
+            except BaseException as e:
+                logger.exception(f"Pipeline {self.name} stage failed")
+                self.errors.append(e)
+                self.abort.set()
+                continue
+            if self.outbox is not None:
+                self.outbox.put(result)
+
+        with self._lock:
+            self._remaining_workers -= 1
+            last_worker = self._remaining_workers == 0
+        if last_worker and self.outbox is not None:
+            # Release every worker of the next stage once this stage is drained
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_END)
+
+    def record_depth(self) -> None:
+        self.max_depth = max(self.max_depth, self.inbox.qsize())
+
+
+class PipelinedExecutor:
+    """Runs decode, DSP and encode as three overlapping stages.
+
+    While file N is being processed, file N+1 is decoded and file N-1 encoded.
+    Stages are connected by bounded queues so a fast decoder cannot run ahead
+    and fill memory with audio the DSP stage is not ready for.
+    """
+
+    def __init__(
+        self,
+        decode: typing.Callable[[typing.Any], typing.Any],
+        process: typing.Callable[[typing.Any], typing.Any],
+        encode: typing.Callable[[typing.Any], typing.Any],
+        config: PipelineConfig = PipelineConfig(),
+        discard: typing.Callable[[typing.Any], None] | None = None,
+    ):
+        """`discard` is called with every item dropped after a stage failed."""
+        self.config = config
+        self.abort = threading.Event()
+        self.errors: list[BaseException] = []
+        self._tasks: queue.Queue = queue.Queue()
+        dsp_inbox: queue.Queue = queue.Queue(config.queue_size)
+        encode_inbox: queue.Queue = queue.Queue(config.queue_size)
+        self._stages = [
+            _Stage(
+                "decode",
+                decode,
+                config.decode_workers,
+                self._tasks,
+                dsp_inbox,
+                config.dsp_workers,
+                self.abort,
+                self.errors,
+                None,
+            ),
+            _Stage(
+                "dsp",
+                process,
+                config.dsp_workers,
+                dsp_inbox,
+                encode_inbox,
+                config.encode_workers,
+                self.abort,
+                self.errors,
+                discard,
+            ),
+            _Stage(
+                "encode",
+                encode,
+                config.encode_workers,
+                encode_inbox,
+                None,
+                0,
+                self.abort,
+                self.errors,
+                discard,
+            ),
+        ]
+
+    def queue_depths(self) -> dict[str, int]:
+        """How many items are waiting in front of each stage right now."""
+        return {stage.name: stage.inbox.qsize() for stage in self._stages}
+
+    def max_queue_depths(self) -> dict[str, int]:
+        return {stage.name: stage.max_depth for stage in self._stages}
+
+    def run(self, items: typing.Iterable[T]) -> None:
+        for item in items:
+            self._tasks.put(item)
+        for _ in range(self.config.decode_workers):
+            self._tasks.put(_END)
+
+        for stage in self._stages:
+            for thread in stage.threads:
+                thread.start()
+
+        for stage in self._stages:
+            for thread in stage.threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+                    for stage_ in self._stages:
+                        stage_.record_depth()
+
+        logger.debug(f"Pipeline max queue depths: {self.max_queue_depths()}")
+        if self.errors:
+            raise self.errors[0]
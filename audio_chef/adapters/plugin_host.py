@@ -0,0 +1,214 @@
+"""Running chains with external plugins in sandbox processes.
+
+A third party plugin can take its process down with it, so chains that use
+one only ever run in a host process. Hosts live across files and batches and
+keep their loaded plugin instances, so a plugin is loaded once per host.
+Audio goes back and forth as shared memory handles.
+"""
+
+import collections
+import logging
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import typing
+
+import pedalboard
+
+from audio_chef.adapters import dsp
+from audio_chef.models.plugin import PluginMetadata
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.audio_formats import AudioData
+from audio_chef.utils.shared_audio import SharedAudioBuffer, SharedAudioHandle
+
+logger = logging.getLogger("audiochef")
+
+STOP_TIMEOUT_S = 5
+
+
+class PluginHostError(Exception):
+    pass
+
+
+class PluginCrashError(PluginHostError):
+    pass
+
+
+def _serve(connection: multiprocessing.connection.Connection) -> None:
+    # Loaded instances by plugin path, a chain using a plugin twice needs two
+    instances: dict[str, list[pedalboard.Plugin]] = collections.defaultdict(list)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        handle, transformations, plugins, source_key, target_sample_rate = request
+        used: collections.Counter[str] = collections.Counter()
+
+        def load_plugin(name: str, params: dict) -> pedalboard.Plugin:
+            metadata: PluginMetadata = plugins[name]
+            loaded = instances[metadata.path]
+            if used[metadata.path] == len(loaded):
+                loaded.append(pedalboard.load_plugin(metadata.path))
+            plugin = loaded[used[metadata.path]]
+            used[metadata.path] += 1
+            # A warm instance still has the previous chain's values
+            defaults = {p.name: p.default for p in metadata.parameters}
+            for param, value in metadata.coerce_params({**defaults, **params}).items():
+                setattr(plugin, param, value)
+            return plugin
+
+        try:
+            res = dsp.process_shared_audio(
+                handle, transformations, source_key, target_sample_rate, load_plugin
+            )
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+        else:
+            connection.send(("ok", res))
+
+
+class _HostProcess:
+    def __init__(self, context: multiprocessing.context.BaseContext):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child_connection,),
+            name="audiochef-plugin-host",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def request(self, *request) -> SharedAudioHandle:
+        try:
+            self.connection.send(request)
+            status, value = self.connection.recv()
+        except (EOFError, OSError) as e:
+            self.process.join(STOP_TIMEOUT_S)
+            raise PluginCrashError(
+                f"The plugin host exited with code {self.process.exitcode}"
+            ) from e
+        if status == "error":
+            raise PluginHostError(value)
+        return value
+
+    def stop(self) -> None:
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(STOP_TIMEOUT_S)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class PluginHost:
+    """A pool of host processes, each serving one chain at a time."""
+
+    _shared: typing.ClassVar["PluginHost | None"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, hosts: int = 1):
+        # Spawned rather than forked, a fork of a threaded app may deadlock
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[_HostProcess] = queue.Queue()
+        self._lock = threading.Lock()
+        self._hosts = 0
+        self.resize(hosts)
+
+    @classmethod
+    def shared(cls, hosts: int = 1) -> "PluginHost":
+        """The app wide host pool, grown to at least `hosts` processes."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(hosts)
+            elif cls._shared.size < hosts:
+                cls._shared.resize(hosts)
+            return cls._shared
+
+    @classmethod
+    def shared_if_started(cls) -> "PluginHost | None":
+        return cls._shared
+
+    @classmethod
+    def shutdown_shared(cls) -> None:
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.shutdown()
+            cls._shared = None
+
+    @property
+    def size(self) -> int:
+        return self._hosts
+
+    def resize(self, hosts: int) -> None:
+        """Grow or shrink to `hosts` processes, busy ones are never stopped."""
+        with self._lock:
+            while self._hosts < hosts:
+                self._idle.put(_HostProcess(self._context))
+                self._hosts += 1
+            while self._hosts > hosts:
+                try:
+                    host = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                host.stop()
+                self._hosts -= 1
+
+    def process(
+        self,
+        handle: SharedAudioHandle,
+        transformations: list[Transformation],
+        plugins: dict[str, PluginMetadata],
+        source_key: str | None = None,
+        target_sample_rate: int | None = None,
+    ) -> SharedAudioHandle:
+        """Like `dsp.process_shared_audio`, the caller must `adopt` the result.
+
+        Raises PluginCrashError when the host died, it is replaced before
+        that, so the next chain runs as usual.
+        """
+        host = self._idle.get()
+        try:
+            return host.request(
+                handle,
+                dsp.picklable(transformations),
+                plugins,
+                source_key,
+                target_sample_rate,
+            )
+        except PluginCrashError:
+            logger.error("A plugin host crashed, starting a new one")
+            host.stop()
+            host = _HostProcess(self._context)
+            raise
+        finally:
+            self._idle.put(host)
+
+    def process_array(
+        self,
+        audio: AudioData,
+        sample_rate: int,
+        transformations: list[Transformation],
+        plugins: dict[str, PluginMetadata],
+        source_key: str | None = None,
+        target_sample_rate: int | None = None,
+    ) -> tuple[AudioData, int]:
+        with SharedAudioBuffer.from_array(audio, sample_rate) as source:
+            res_handle = self.process(
+                source.handle, transformations, plugins, source_key, target_sample_rate
+            )
+        with SharedAudioBuffer.adopt(res_handle) as res:
+            return res.array.copy(), res_handle.sample_rate
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for _ in range(self._hosts):
+                self._idle.get().stop()
+            self._hosts = 0
@@ -0,0 +1,80 @@
+import logging
+import os
+
+import numpy
+import pedalboard
+
+from audio_chef.models.plugin import PluginMetadata, PluginParameter
+
+logger = logging.getLogger("audiochef")
+
+PROBE_SAMPLE_RATE = 48000
+PROBE_CHANNELS = (1, 2)
+
+
+def bundle_mtime(path: str) -> float:
+    """The newest modification time of the plugin file, or of any file in its bundle."""
+    mtime = os.stat(path).st_mtime
+    for root, _, files in os.walk(path):
+        for file in files:
+            mtime = max(mtime, os.stat(os.path.join(root, file)).st_mtime)
+    return mtime
+
+
+class PluginScanner:
+    @classmethod
+    def scan(cls, path: str) -> PluginMetadata:
+        """Load the plugin once and read everything the app needs from it."""
+        mtime = bundle_mtime(path)
+        plugin = pedalboard.load_plugin(path)
+        parameters = [
+            cls._read_parameter(name, parameter, getattr(plugin, name))
+            for name, parameter in plugin.parameters.items()
+        ]
+        layouts = cls._probe_layouts(plugin)
+        return PluginMetadata(
+            name=plugin.name,
+            path=path,
+            vendor=getattr(plugin, "manufacturer_name", "") or "",
+            parameters=parameters,
+            # Only reported once the plugin has processed audio
+            latency_samples=int(getattr(plugin, "reported_latency_samples", 0)),
+            layouts=layouts,
+            mtime=mtime,
+        )
+
+    @staticmethod
+    def _read_parameter(
+        name: str, parameter: pedalboard.AudioProcessorParameter, value: object
+    ) -> PluginParameter:
+        if parameter.type is float:
+            return PluginParameter(
+                name,
+                "float",
+                float(value),  # type: ignore[arg-type]
+                min=parameter.min_value,
+                max=parameter.max_value,
+                step=parameter.step_size or parameter.approximate_step_size,
+            )
+        if parameter.type is bool:
+            return PluginParameter(name, "bool", bool(value))
+        return PluginParameter(
+            name,
+            "str",
+            str(value),
+            options=[str(option) for option in parameter.valid_values],
+        )
+
+    @staticmethod
+    def _probe_layouts(plugin: pedalboard.Plugin) -> list[int]:
+        layouts = []
+        for channels in PROBE_CHANNELS:
+            try:
+                plugin.process(
+                    numpy.zeros((channels, 512), numpy.float32), PROBE_SAMPLE_RATE
+                )
+            except Exception as e:
+                logger.debug(f"{plugin.name} cannot process {channels} channel(s): {e}")
+            else:
+                layouts.append(channels)
+        return layouts
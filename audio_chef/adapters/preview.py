@@ -0,0 +1,151 @@
+import collections
+import logging
+import os
+import threading
+import typing
+
+import soundfile
+
+from audio_chef.adapters import dsp
+from audio_chef.adapters.chain_tree import chain_hash
+from audio_chef.adapters.plugin_host import PluginHost
+from audio_chef.models.plugin import PluginMetadata
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.audio_formats import AudioData, AudioFile
+from audio_chef.utils.resampling import resample
+from audio_chef.utils.scratch import ScratchStorage
+
+logger = logging.getLogger("audiochef")
+
+DRAFT_SAMPLE_RATE = 22050
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class _LRUCache(typing.Generic[K, V]):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: collections.OrderedDict[K, V] = collections.OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key: K, value: V) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+class PreviewRenderer:
+    """Renders a short window of a file, caching every step on the way.
+
+    Decoded windows are cached per (file, window, draft), boards per chain and
+    target rate and results per (file, window, draft, chain, target rate), so
+    changing one parameter only reprocesses the already decoded window.
+    Previews are rendered one at a time, off the UI thread.
+    """
+
+    _lock = threading.Lock()
+
+    _decoded: _LRUCache[tuple, tuple[AudioData, int]] = _LRUCache(8)
+    _boards: _LRUCache[tuple, dsp.ProcessingChain] = _LRUCache(16)
+    _rendered: _LRUCache[tuple, tuple[AudioData, int]] = _LRUCache(32)
+
+    @classmethod
+    def render(
+        cls,
+        audio_file: AudioFile,
+        start_second: float,
+        duration: float,
+        transformations: list[Transformation],
+        draft: bool = False,
+        target_sample_rate: int | None = None,
+        plugins: dict[str, PluginMetadata] | None = None,
+    ) -> tuple[AudioData, int]:
+        """Render the window, drafts are never upsampled to the target rate.
+
+        Chains with external `plugins` are rendered by the plugin host.
+        """
+        window_key = (audio_file.get_fingerprint(), start_second, duration, draft)
+        if draft and target_sample_rate:
+            target_sample_rate = min(target_sample_rate, DRAFT_SAMPLE_RATE)
+        board_key = (chain_hash(transformations), target_sample_rate)
+        rendered = cls._rendered.get((*window_key, *board_key))
+        if rendered is not None:
+            return rendered
+
+        audio, sample_rate = cls._decode(audio_file, start_second, duration, draft)
+        # Measurements are of the window, cached apart from the whole file's
+        window_source_key = "-".join(str(part) for part in window_key)
+        if plugins:
+            rendered = PluginHost.shared().process_array(
+                audio,
+                sample_rate,
+                transformations,
+                plugins,
+                window_source_key,
+                target_sample_rate,
+            )
+        else:
+            board = cls._boards.get(board_key)
+            if board is None:
+                board = dsp.prepare_board(transformations, target_sample_rate)
+                cls._boards.put(board_key, board)
+            rendered = (
+                board(audio, sample_rate, window_source_key),
+                board.output_sample_rate(sample_rate),
+            )
+        cls._rendered.put((*window_key, *board_key), rendered)
+        return rendered
+
+    @classmethod
+    def write_preview(
+        cls,
+        audio_file: AudioFile,
+        start_second: float,
+        duration: float,
+        transformations: list[Transformation],
+        draft: bool = False,
+        target_sample_rate: int | None = None,
+        plugins: dict[str, PluginMetadata] | None = None,
+    ) -> str:
+        with cls._lock:
+            audio, sample_rate = cls.render(
+                audio_file,
+                start_second,
+                duration,
+                transformations,
+                draft,
+                target_sample_rate,
+                plugins,
+            )
+            preview_file = ScratchStorage.get_path(
+                f"preview-{audio_file.get_fingerprint()}-{chain_hash(transformations)}"
+                f"-{start_second:g}-{duration:g}-{sample_rate}"
+                f"{'-draft' if draft else ''}"
+            )
+            if not os.path.exists(preview_file):
+                ScratchStorage.reserve(audio.nbytes)
+                soundfile.write(preview_file, audio, sample_rate)
+                ScratchStorage.register(preview_file)
+        return preview_file
+
+    @classmethod
+    def _decode(
+        cls, audio_file: AudioFile, start_second: float, duration: float, draft: bool
+    ) -> tuple[AudioData, int]:
+        key = (audio_file.get_fingerprint(), start_second, duration, draft)
+        decoded = cls._decoded.get(key)
+        if decoded is None:
+            audio, sample_rate = audio_file.get_audio_window(start_second, duration)
+            if draft and sample_rate > DRAFT_SAMPLE_RATE:
+                audio = resample(audio, sample_rate, DRAFT_SAMPLE_RATE)
+                sample_rate = DRAFT_SAMPLE_RATE
+            decoded = audio, sample_rate
+            cls._decoded.put(key, decoded)
+        return decoded
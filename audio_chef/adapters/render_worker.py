@@ -0,0 +1,160 @@
+"""A stateless worker rendering tasks claimed from a coordinator.
+
+See adapters.coordinator for the protocol. The worker keeps nothing between
+tasks but its warm processes, so it can be started and stopped at any time.
+"""
+
+import http
+import json
+import logging
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.coordinator import HEARTBEAT_TIMEOUT_S
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.worker_pool import WorkerPool
+from audio_chef.models.report import BatchReport
+from audio_chef.models.task import RenderTask
+from audio_chef.utils.audio_formats import AudioFile
+
+logger = logging.getLogger("audiochef")
+
+POLL_INTERVAL_S = 1.0
+REQUEST_TIMEOUT_S = 10.0
+# Consecutive failed requests before the coordinator is taken to be gone
+MAX_CONNECTION_ERRORS = 5
+
+
+class RenderWorker:
+    def __init__(
+        self,
+        coordinator_url: str,
+        worker_id: str | None = None,
+        pipeline_config: PipelineConfig = PipelineConfig(),
+        heartbeat_interval_s: float = HEARTBEAT_TIMEOUT_S / 3,
+    ):
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.worker_id = worker_id or f"{socket.gethostname()}-{id(self):x}"
+        self.pipeline_config = pipeline_config
+        self.heartbeat_interval_s = heartbeat_interval_s
+        self.worker_pool = WorkerPool()
+
+    def run(self) -> None:
+        """Render tasks until the coordinator has none left or is gone."""
+        errors = 0
+        try:
+            while True:
+                try:
+                    status, body = self._post("/claim")
+                except (urllib.error.URLError, OSError) as e:
+                    errors += 1
+                    if errors >= MAX_CONNECTION_ERRORS:
+                        logger.error(f"Giving up on the coordinator: {e}")
+                        return
+                    time.sleep(POLL_INTERVAL_S)
+                    continue
+                errors = 0
+                if status == http.HTTPStatus.GONE:
+                    logger.info("The coordinator has no tasks left")
+                    return
+                if status == http.HTTPStatus.OK:
+                    self.run_task(RenderTask.from_dict(body["task"]))
+                else:
+                    time.sleep(POLL_INTERVAL_S)
+        finally:
+            self.worker_pool.shutdown()
+
+    def run_task(self, task: RenderTask) -> None:
+        logger.info(f"Rendering task {task.id} ({len(task.filenames)} file(s))")
+        stop_heartbeats = threading.Event()
+        heartbeats = threading.Thread(
+            target=self._send_heartbeats,
+            args=(task, stop_heartbeats),
+            name="audiochef-heartbeat",
+            daemon=True,
+        )
+        heartbeats.start()
+        try:
+            report = self.render(task)
+        except Exception as e:
+            logger.exception(f"Task {task.id} failed")
+            self._post_result(task, "fail", error=f"{type(e).__name__}: {e}")
+            return
+        finally:
+            stop_heartbeats.set()
+            heartbeats.join()
+        if not report.success:
+            logger.error(f"Task {task.id} failed")
+            self._post_result(task, "fail", error=report.summary())
+            return
+        status = self._post_result(task, "complete", report=report.to_dict())
+        if status == http.HTTPStatus.CONFLICT:
+            logger.warning(f"Task {task.id} was reassigned before it completed")
+
+    def render(self, task: RenderTask) -> BatchReport:
+        preset = task.preset
+        audio_files = []
+        for filename in task.filenames:
+            audio_file = AudioFile(filename)
+            audio_file.update_destination_name_and_ext(
+                preset.get_output_filename(filename)
+            )
+            audio_files.append(audio_file)
+        return AudioClient.execute_batch(
+            preset.ext,
+            audio_files,
+            preset.transformations,
+            self.pipeline_config,
+            additional_exts=preset.additional_exts,
+            encoder_settings=preset.encoder_settings,
+            target_sample_rate=preset.target_sample_rate,
+            worker_pool=self.worker_pool,
+        )
+
+    def _send_heartbeats(self, task: RenderTask, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_interval_s):
+            try:
+                status, _ = self._post(f"/tasks/{task.id}/heartbeat")
+            except (urllib.error.URLError, OSError) as e:
+                logger.warning(f"Could not send a heartbeat: {e}")
+                continue
+            if status == http.HTTPStatus.CONFLICT:
+                # The render carries on, the coordinator ignores its result
+                logger.warning(f"Task {task.id} was reassigned")
+                return
+
+    def _post_result(self, task: RenderTask, action: str, **body) -> int | None:
+        """Report how the task went, retrying while the coordinator is unreachable.
+
+        Returns the coordinator's answer, None when it could not be reached.
+        """
+        for attempt in range(1, MAX_CONNECTION_ERRORS + 1):
+            try:
+                status, _ = self._post(f"/tasks/{task.id}/{action}", **body)
+                return status
+            except (urllib.error.URLError, OSError) as e:
+                if attempt == MAX_CONNECTION_ERRORS:
+                    # The task goes back to the queue once its heartbeats stop
+                    logger.error(f"Could not report task {task.id} as {action}: {e}")
+                    return None
+                time.sleep(POLL_INTERVAL_S)
+        return None
+
+    def _post(self, path: str, **body) -> tuple[int, dict | None]:
+        request = urllib.request.Request(
+            self.coordinator_url + path,
+            data=json.dumps({"worker": self.worker_id, **body}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_S) as response:
+                data = response.read()
+                return response.status, json.loads(data) if data else None
+        except urllib.error.HTTPError as e:
+            # urllib raises for 4xx, they are answers of the protocol here
+            return e.code, None
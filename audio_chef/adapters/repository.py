@@ -1,19 +1,25 @@
 import dataclasses
 import json
+import logging
 import uuid
 from collections.abc import Callable
 
 import pedalboard
 import peewee
 from peewee import DatabaseProxy
+from playhouse import migrate
 
+from audio_chef.adapters.plugin_scanner import PluginScanner, bundle_mtime
+from audio_chef.models.plugin import PluginMetadata, PluginParameter
 from audio_chef.models.preset import (
     Preset,
     Transformation,
     NameChangeParameters,
     PresetMetadata, NameChangeMode,
 )
-from audio_chef.utils.transformations import TRANSFORMATIONS
+from audio_chef.utils.transformations import TRANSFORMATIONS, Argument
+
+logger = logging.getLogger("audiochef")
 
 db_proxy = DatabaseProxy()
 
@@ -21,7 +27,26 @@ db_proxy = DatabaseProxy()
 def initialize_db(db_name: str) -> None:
     db = peewee.SqliteDatabase(db_name)
     db_proxy.initialize(db)
-    db.create_tables([PresetModel, PluginModel])
+    db.create_tables([PresetModel, PluginModel, ThroughputModel])
+    _add_missing_columns(db, [PresetModel, PluginModel, ThroughputModel])
+
+
+def _add_missing_columns(db: peewee.SqliteDatabase, models: list) -> None:
+    # create_tables leaves existing tables alone, so columns added to a model
+    # after a user's db was created must be added by hand
+    migrator = migrate.SqliteMigrator(db)
+    operations = []
+    for model in models:
+        existing = {column.name for column in db.get_columns(model._meta.table_name)}
+        for field in model._meta.sorted_fields:
+            if field.column_name not in existing:
+                operations.append(
+                    migrator.add_column(
+                        model._meta.table_name, field.column_name, field
+                    )
+                )
+    if operations:
+        migrate.migrate(*operations)
 
 
 class JSONField(peewee.TextField):
@@ -39,6 +64,9 @@ class PresetModel(peewee.Model):
     ext = peewee.CharField(max_length=64, default="")
     transformations = JSONField()
     name_changer = JSONField()
+    additional_exts = JSONField(default=list)
+    encoder_settings = JSONField(default=dict)
+    target_sample_rate = peewee.IntegerField(null=True)
 
     class Meta:
         database = db_proxy
@@ -86,6 +114,9 @@ class PresetRepository:
                 dataclasses.asdict(transform) for transform in preset.transformations
             ],
             name_changer=dataclasses.asdict(preset.name_change_parameters),
+            additional_exts=preset.additional_exts,
+            encoder_settings=preset.encoder_settings,
+            target_sample_rate=preset.target_sample_rate,
         )
         return cls.metadata_from_model(preset_model)
 
@@ -117,6 +148,9 @@ class PresetRepository:
                 replace_from_input=model.name_changer["replace_from_input"],
                 replace_to_input=model.name_changer["replace_to_input"],
             ),
+            additional_exts=model.additional_exts or [],
+            encoder_settings=model.encoder_settings or {},
+            target_sample_rate=model.target_sample_rate,
         )
 
 
@@ -124,6 +158,11 @@ class PluginModel(peewee.Model):
     name = peewee.CharField(max_length=256)
     path = peewee.CharField(max_length=2048)
     params = JSONField(default={})
+    vendor = peewee.CharField(max_length=256, default="")
+    latency_samples = peewee.IntegerField(default=0)
+    layouts = JSONField(default=list)
+    # 0 until scanned, so plugins saved before scanning existed get rescanned
+    mtime = peewee.FloatField(default=0)
 
     class Meta:
         database = db_proxy
@@ -132,8 +171,84 @@ class PluginModel(peewee.Model):
 class PluginRepository:
     @classmethod
     def save_plugin(cls, path: str) -> None:
-        pedalboard_plugin: pedalboard.VST3Plugin = pedalboard.load_plugin(path)
-        PluginModel.get_or_create(name=pedalboard_plugin.name, path=path)
+        cls._store(PluginScanner.scan(path))
+
+    @classmethod
+    def rescan_changed_plugins(cls) -> None:
+        """Rescan only plugins whose bundle changed since they were scanned."""
+        for plugin in PluginModel.select():
+            try:
+                if bundle_mtime(plugin.path) == plugin.mtime:
+                    continue
+                logger.info(f"Rescanning changed plugin {plugin.path}")
+                cls._store(PluginScanner.scan(plugin.path))
+            except Exception:
+                logger.exception(f"Could not rescan plugin {plugin.path}")
+
+    @classmethod
+    def get_metadata(cls, name: str) -> PluginMetadata | None:
+        plugin = PluginModel.get_or_none(PluginModel.name == name)
+        return cls.metadata_from_model(plugin) if plugin else None
+
+    @classmethod
+    def get_arguments(cls, name: str) -> list[Argument]:
+        metadata = cls.get_metadata(name)
+        if metadata is None:
+            return []
+        arguments = []
+        for parameter in metadata.parameters:
+            if parameter.type == "float":
+                arguments.append(
+                    Argument(
+                        parameter.name,
+                        float,
+                        parameter.default,
+                        min=parameter.min,
+                        max=parameter.max,
+                        step=parameter.step,
+                    )
+                )
+            else:
+                arguments.append(
+                    Argument(
+                        parameter.name,
+                        str,
+                        str(parameter.default),
+                        options=parameter.options or ["False", "True"],
+                    )
+                )
+        return arguments
+
+    @staticmethod
+    def _store(metadata: PluginMetadata) -> None:
+        plugin, _ = PluginModel.get_or_create(
+            path=metadata.path, defaults={"name": metadata.name}
+        )
+        plugin.name = metadata.name
+        plugin.vendor = metadata.vendor
+        plugin.params = [
+            dataclasses.asdict(parameter) for parameter in metadata.parameters
+        ]
+        plugin.latency_samples = metadata.latency_samples
+        plugin.layouts = metadata.layouts
+        plugin.mtime = metadata.mtime
+        plugin.save()
+
+    @staticmethod
+    def metadata_from_model(model: PluginModel) -> PluginMetadata:
+        return PluginMetadata(
+            name=model.name,
+            path=model.path,
+            vendor=model.vendor,
+            parameters=[
+                PluginParameter(**parameter)
+                # Plugins saved before scanning existed have a {} here
+                for parameter in (model.params or [])
+            ],
+            latency_samples=model.latency_samples,
+            layouts=model.layouts or [],
+            mtime=model.mtime,
+        )
 
     @classmethod
     def get_available_transformations(cls) -> list[Transformation]:
@@ -158,8 +273,51 @@ class PluginRepository:
     @staticmethod
     def _get_show_editor_func(plugin_model: PluginModel) -> Callable[[dict], dict]:
         def show_editor(params: dict) -> dict:
-            plugin = pedalboard.load_plugin(plugin_model.path, parameter_values=params)
+            metadata = PluginRepository.metadata_from_model(plugin_model)
+            plugin = pedalboard.load_plugin(
+                plugin_model.path, parameter_values=metadata.coerce_params(params)
+            )
             plugin.show_editor()
             return {param.python_name: param.type(getattr(plugin, param.python_name)) for param in plugin.parameters.values()}
 
         return show_editor
+
+
+class ThroughputModel(peewee.Model):
+    # e.g. "decode:mp3" or "transform:Compressor", see adapters.estimator
+    key = peewee.CharField(max_length=512, unique=True)
+    audio_s = peewee.FloatField(default=0)
+    # Seconds taken, or bytes written, for those seconds of audio
+    total = peewee.FloatField(default=0)
+
+    class Meta:
+        database = db_proxy
+
+
+class ThroughputRepository:
+    # Older measurements are scaled down to this many seconds of audio, so
+    # the rates follow the machine when it gets faster or slower
+    HISTORY_S = 3600.0
+
+    @classmethod
+    def get_rates(cls, keys: list[str]) -> dict[str, float]:
+        """Per second of audio, only for the keys with history."""
+        return {
+            model.key: model.total / model.audio_s
+            for model in ThroughputModel.select().where(ThroughputModel.key.in_(keys))
+            if model.audio_s > 0
+        }
+
+    @classmethod
+    def record(cls, measurements: dict[str, tuple[float, float]]) -> None:
+        """Add (audio seconds, total) measurements to the history of each key."""
+        with db_proxy.atomic():
+            for key, (audio_s, total) in measurements.items():
+                model, _ = ThroughputModel.get_or_create(key=key)
+                if model.audio_s > cls.HISTORY_S:
+                    scale = cls.HISTORY_S / model.audio_s
+                    model.audio_s *= scale
+                    model.total *= scale
+                model.audio_s += audio_s
+                model.total += total
+                model.save()
@@ -0,0 +1,94 @@
+"""Bypassing the chain over long silent spans of a file.
+
+A silent span is only bypassed after the chain's memory has passed, so tails
+of the audio before it are still rendered, and the audio after it starts
+from a fresh chain, which is what a chain left to decay over silence is.
+"""
+
+import concurrent.futures
+import dataclasses
+import math
+import typing
+
+import numpy
+
+from audio_chef.utils.audio_formats import AudioData, as_frames_by_channels
+
+GATE_WINDOW_S = 0.01
+
+
+@dataclasses.dataclass(frozen=True)
+class SilenceConfig:
+    threshold_db: float = -60.0
+    # Shorter silent spans, after the chain's tail, are processed as usual
+    min_silence_s: float = 1.0
+    # Write bypassed spans as digital silence rather than the unprocessed input
+    zero: bool = True
+
+
+def find_silent_spans(
+    audio: AudioData, sample_rate: int, threshold_db: float
+) -> list[tuple[int, int]]:
+    """(start, end) frames of spans whose RMS stays under the threshold."""
+    frames = as_frames_by_channels(audio)
+    window = max(1, int(GATE_WINDOW_S * sample_rate))
+    windows = frames[: len(frames) // window * window].reshape(
+        -1, window, frames.shape[1]
+    )
+    # einsum sums the squares without a squared copy of the whole file
+    power = numpy.einsum("ijk,ijk->i", windows, windows) / (window * frames.shape[1])
+    silent = power < 10 ** (threshold_db / 10)
+
+    edges = numpy.diff(numpy.concatenate([[0], silent.view(numpy.int8), [0]]))
+    starts = numpy.flatnonzero(edges == 1) * window
+    ends = numpy.flatnonzero(edges == -1) * window
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def process_skipping_silence(
+    process: typing.Callable[[AudioData], AudioData],
+    audio: AudioData,
+    sample_rate: int,
+    memory_s: float,
+    config: SilenceConfig,
+    executor: concurrent.futures.Executor,
+) -> tuple[AudioData, int]:
+    """Run `process` over everything but long silent spans.
+
+    `process` must keep the number of frames. Returns the result, exactly as
+    long as the input, and how many frames were bypassed.
+    """
+    if not len(audio):
+        return audio, 0
+    tail = math.ceil(memory_s * sample_rate)
+    min_frames = int(config.min_silence_s * sample_rate)
+    bypassed = []
+    for start, end in find_silent_spans(audio, sample_rate, config.threshold_db):
+        start = start + tail if start else 0
+        if end - start >= min_frames:
+            bypassed.append((start, end))
+
+    boundaries = [0, *(frame for span in bypassed for frame in span), len(audio)]
+    active = [
+        (start, end)
+        for start, end in zip(boundaries[::2], boundaries[1::2])
+        if end > start
+    ]
+    results = dict(
+        zip(active, executor.map(lambda span: process(audio[slice(*span)]), active))
+    )
+
+    shape, dtype = audio.shape[1:], audio.dtype
+    if results:
+        first = next(iter(results.values()))
+        shape, dtype = first.shape[1:], first.dtype
+    parts = []
+    for start, end in sorted([*active, *bypassed]):
+        if (start, end) in results:
+            parts.append(results[(start, end)])
+        elif config.zero or audio.shape[1:] != shape:
+            # The input cannot stand in for output with other channels
+            parts.append(numpy.zeros((end - start, *shape), dtype))
+        else:
+            parts.append(audio[start:end].astype(dtype))
+    return numpy.concatenate(parts), sum(end - start for start, end in bypassed)
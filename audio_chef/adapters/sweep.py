@@ -0,0 +1,192 @@
+import concurrent.futures
+import configparser
+import csv
+import dataclasses
+import itertools
+import logging
+import os
+import re
+
+import numpy
+
+from audio_chef.adapters import dsp
+from audio_chef.models.preset import Preset, Transformation
+from audio_chef.utils.analysis import AudioStats, analyze
+from audio_chef.utils.audio_formats import AudioFile
+from audio_chef.utils.resampling import resample
+from audio_chef.utils.scratch import ScratchStorage
+from audio_chef.utils.transformations import TRANSFORMATIONS
+
+logger = logging.getLogger("audiochef")
+
+
+@dataclasses.dataclass(frozen=True)
+class SweepRange:
+    transform_index: int
+    argument_name: str
+    min: float
+    max: float
+    step: float
+
+    def __post_init__(self):
+        if self.step <= 0:
+            raise ValueError(
+                f"The step of {self.argument_name} must be above 0, not {self.step:g}"
+            )
+
+    @classmethod
+    def for_argument(
+        cls,
+        preset: Preset,
+        transform_index: int,
+        argument_name: str,
+        config: configparser.ConfigParser | None = None,
+    ) -> "SweepRange":
+        """Use the slider range the user configured for this argument."""
+        transform_name = preset.transformations[transform_index].name
+        argument = next(
+            argument
+            for argument in TRANSFORMATIONS[transform_name].arguments
+            if argument.name == argument_name
+        )
+        bounds = {"min": argument.min, "max": argument.max, "step": argument.step}
+        if config is not None:
+            for bound in bounds:
+                option = f"{argument_name} {bound}"
+                if config.has_option(transform_name, option):
+                    bounds[bound] = config.getfloat(transform_name, option)
+        return cls(transform_index, argument_name, **bounds)
+
+    def values(self) -> list[float]:
+        count = int(numpy.floor((self.max - self.min) / self.step + 1e-9)) + 1
+        return [round(self.min + i * self.step, 10) for i in range(max(count, 1))]
+
+
+@dataclasses.dataclass(frozen=True)
+class SweepRender:
+    audio_file: AudioFile
+    values: dict[str, float]
+    output_filename: str
+    stats: AudioStats
+
+
+class ParameterSweep:
+    @classmethod
+    def render(
+        cls,
+        preset: Preset,
+        ranges: list[SweepRange],
+        selected_files: list[AudioFile],
+        workers: int = os.cpu_count() or 1,
+    ) -> list[SweepRender]:
+        """Render every combination of the ranges' values over each file.
+
+        Each file is decoded once and its combinations are processed in
+        parallel. A CSV summary with peak, RMS and loudness per render is
+        written next to the outputs.
+        """
+        grid = list(itertools.product(*(range_.values() for range_ in ranges)))
+        logger.info(
+            f"Sweeping {len(grid)} combination(s) over {len(selected_files)} file(s)"
+        )
+        renders = []
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            for audio_file in selected_files:
+                audio, sample_rate = audio_file.get_audio_data()
+                audio_file.release_internal_file()
+                source_key = audio_file.get_fingerprint()
+                # Downsample once for the whole grid rather than per render
+                processing_rate = dsp.get_processing_sample_rate(
+                    sample_rate, preset.target_sample_rate
+                )
+                if processing_rate != sample_rate:
+                    audio = resample(audio, sample_rate, processing_rate)
+                    sample_rate = processing_rate
+                    source_key = f"{source_key}@{processing_rate}"
+                futures = [
+                    pool.submit(
+                        cls._render_one,
+                        preset,
+                        ranges,
+                        combination,
+                        audio_file,
+                        audio,
+                        sample_rate,
+                        source_key,
+                    )
+                    for combination in grid
+                ]
+                file_renders = [future.result() for future in futures]
+                cls._write_summary(audio_file, file_renders)
+                renders.extend(file_renders)
+        return renders
+
+    @classmethod
+    def _render_one(
+        cls,
+        preset: Preset,
+        ranges: list[SweepRange],
+        combination: tuple[float, ...],
+        audio_file: AudioFile,
+        audio,
+        sample_rate: int,
+        source_key: str,
+    ) -> SweepRender:
+        transformations = list(preset.transformations)
+        values = {}
+        for range_, value in zip(ranges, combination):
+            transform = transformations[range_.transform_index]
+            transformations[range_.transform_index] = dataclasses.replace(
+                transform, params={**transform.params, range_.argument_name: value}
+            )
+            values[cls._label(transform, range_)] = value
+
+        board = dsp.prepare_board(transformations, preset.target_sample_rate)
+        res = board(audio, sample_rate, source_key)
+        sample_rate = board.output_sample_rate(sample_rate)
+        suffix = "_" + "_".join(
+            re.sub(r"[^\w.\-=]+", "_", f"{label}={value:g}")
+            for label, value in values.items()
+        )
+        render_file = audio_file.write_render_file(res, sample_rate, suffix)
+        try:
+            audio_file.encode_output_file(
+                audio_file.destination_ext,
+                preset.encoder_settings.get(audio_file.destination_ext),
+                suffix,
+                render_file,
+            )
+        finally:
+            ScratchStorage.remove(render_file)
+        return SweepRender(
+            audio_file,
+            values,
+            audio_file.get_destination_filename(audio_file.destination_ext, suffix),
+            analyze(res, sample_rate),
+        )
+
+    @staticmethod
+    def _label(transform: Transformation, range_: SweepRange) -> str:
+        return f"{transform.name}.{range_.argument_name}"
+
+    @staticmethod
+    def _write_summary(audio_file: AudioFile, renders: list[SweepRender]) -> None:
+        if not renders:
+            return
+        summary_file = f"{audio_file.destination_name}_sweep.csv"
+        with open(summary_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["output", *renders[0].values, "peak_db", "rms_db", "loudness_lufs"]
+            )
+            for render in renders:
+                writer.writerow(
+                    [
+                        render.output_filename,
+                        *render.values.values(),
+                        f"{render.stats.peak_db:.2f}",
+                        f"{render.stats.rms_db:.2f}",
+                        f"{render.stats.loudness_lufs:.2f}",
+                    ]
+                )
+        logger.info(f"Wrote sweep summary to {summary_file}")
@@ -0,0 +1,129 @@
+"""Worker processes kept warm between batches.
+
+Starting a process and importing the DSP stack in it takes longer than
+processing a short file, so the app keeps its DSP processes and plugin hosts
+alive across batches. Nothing is started until it is first needed or
+prewarmed, and workers left idle for a while are let go again.
+"""
+
+import concurrent.futures
+import concurrent.futures.process
+import contextlib
+import logging
+import multiprocessing
+import threading
+import time
+import typing
+
+import numpy
+
+from audio_chef.adapters import dsp
+from audio_chef.adapters.plugin_host import PluginHost
+from audio_chef.models.preset import Transformation
+
+logger = logging.getLogger("audiochef")
+
+IDLE_TIMEOUT_S = 300.0
+
+
+def _warm_up() -> None:
+    # Runs once per DSP process, so the first file does not pay for the imports
+    # and the first board
+    dsp.prepare_board([Transformation(name="Gain", params={"gain_db": 0})])(
+        numpy.zeros((1024, 2), numpy.float32), 48000
+    )
+
+
+def _ready() -> None:
+    pass
+
+
+class WorkerPool:
+    """The app's DSP processes and plugin hosts, started on first use."""
+
+    def __init__(self, idle_timeout_s: float = IDLE_TIMEOUT_S, min_hosts: int = 1):
+        self.idle_timeout_s = idle_timeout_s
+        # Plugin hosts kept after an idle timeout, loading plugins again is slow
+        self.min_hosts = min_hosts
+        self._lock = threading.Lock()
+        self._dsp_processes: concurrent.futures.ProcessPoolExecutor | None = None
+        self._dsp_workers = 0
+        self._leases = 0
+        self._last_used = time.monotonic()
+
+    def get_dsp_processes(self, workers: int) -> concurrent.futures.Executor:
+        with self._lock:
+            if self._dsp_processes is not None and self._dsp_workers != workers:
+                self._dsp_processes.shutdown(wait=False)
+                self._dsp_processes = None
+            if self._dsp_processes is None:
+                logger.debug(f"Starting {workers} DSP process(es) ...")
+                # Spawned rather than forked, a fork of a threaded app may deadlock
+                self._dsp_processes = concurrent.futures.ProcessPoolExecutor(
+                    workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+                self._dsp_workers = workers
+            return self._dsp_processes
+
+    @staticmethod
+    def get_plugin_host(hosts: int) -> PluginHost:
+        # The preview renders through the same hosts
+        return PluginHost.shared(hosts)
+
+    @contextlib.contextmanager
+    def lease(self) -> typing.Iterator["WorkerPool"]:
+        """Keep the workers from being let go while a batch uses them."""
+        with self._lock:
+            self._leases += 1
+        try:
+            yield self
+        except concurrent.futures.process.BrokenProcessPool:
+            # A crashed process breaks its executor for good, start a new one
+            with self._lock:
+                if self._dsp_processes is not None:
+                    self._dsp_processes.shutdown(wait=False)
+                self._dsp_processes = None
+            raise
+        finally:
+            with self._lock:
+                self._leases -= 1
+                self._last_used = time.monotonic()
+
+    def prewarm(self, dsp_workers: int, dsp_processes: bool) -> None:
+        """Start the workers a batch would use, blocking until they are ready."""
+        started = time.perf_counter()
+        with self.lease():
+            if dsp_processes:
+                executor = self.get_dsp_processes(dsp_workers)
+                # Idle workers are spawned per submit, so all of them start
+                for future in [executor.submit(_ready) for _ in range(dsp_workers)]:
+                    future.result()
+            self.get_plugin_host(self.min_hosts)
+        logger.info(f"Prewarmed workers in {time.perf_counter() - started:.2f} s")
+
+    def shrink_if_idle(self) -> bool:
+        """Let idle workers go after the timeout, True if any were."""
+        with self._lock:
+            if self._leases or time.monotonic() - self._last_used < self.idle_timeout_s:
+                return False
+            dsp_processes, self._dsp_processes = self._dsp_processes, None
+        host = PluginHost.shared_if_started()
+        shrunk = dsp_processes is not None or (
+            host is not None and host.size > self.min_hosts
+        )
+        if dsp_processes is not None:
+            dsp_processes.shutdown(wait=False)
+        if host is not None:
+            host.resize(self.min_hosts)
+        if shrunk:
+            logger.debug("Let idle workers go")
+        return shrunk
+
+    def shutdown(self) -> None:
+        with self._lock:
+            dsp_processes, self._dsp_processes = self._dsp_processes, None
+        if dsp_processes is not None:
+            dsp_processes.shutdown(wait=True, cancel_futures=True)
+        PluginHost.shutdown_shared()
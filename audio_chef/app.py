@@ -3,6 +3,7 @@ import dataclasses
 import json
 import logging
 import pathlib
+import threading
 
 import kivy
 import kivy.app
@@ -10,11 +11,19 @@ import kivy.base
 import kivy.core.window
 import kivy.metrics
 import kivy.uix.settings
+from kivy.clock import Clock
 from kivy.modules import inspector
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 
 from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.job_api import DEFAULT_PORT, JobApi
+from audio_chef.adapters.jobs import BatchOptions, JobScheduler
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.preview import PreviewRenderer
+from audio_chef.adapters.sweep import ParameterSweep, SweepRange
+from audio_chef.adapters.silence import SilenceConfig
+from audio_chef.adapters.worker_pool import IDLE_TIMEOUT_S, WorkerPool
 from audio_chef.adapters.repository import (
     PresetRepository,
     PluginRepository,
@@ -22,29 +31,44 @@ from audio_chef.adapters.repository import (
 )
 from audio_chef.components.audio_chef_window import AudioChefWindow
 from audio_chef.components.error_popup import ErrorPopup
-from audio_chef.components.helper_classes import NoticePopup
+from audio_chef.components.helper_classes import (
+    NoticePopup,
+    PlanPopup,
+    UnexecutableRecipeError,
+)
 from audio_chef.components.plugin_popup import PluginPopup
 from audio_chef.consts import FFMPEG_PATH
+from audio_chef.models.catalog import FileCatalog, FileStatus
+from audio_chef.models.estimate import BatchEstimate
+from audio_chef.models.job import Job, JobStatus
 from audio_chef.models.preset import (
     NameChangeParameters,
     Transformation,
     Preset,
     NameChangeMode,
 )
+from audio_chef.models.report import BatchReport
 
 from audio_chef.utils.audio_formats import (
     SUPPORTED_AUDIO_FORMATS,
     load_audio_formats,
-    AudioFile,
-    NoCompatibleAudioFormatException,
 )
+from audio_chef.utils.cache_dir import configure_cache_dir
+from audio_chef.utils.scratch import ScratchStorage
+from audio_chef.utils.state_store import StateStore
 from audio_chef.utils.transformations import TRANSFORMATIONS
 
 logger = logging.getLogger("audiochef")
 
+PREWARM_DELAY_S = 1.0
+IDLE_CHECK_INTERVAL_S = 30.0
+
 
-class AppState:
+class AppStateStore(StateStore):
     ext: str = ""
+    additional_exts: list[str] = []
+    encoder_settings: dict[str, dict] = {}
+    target_sample_rate: int | None = None
     ext_locked: bool = False
     name_change_params: NameChangeParameters = NameChangeParameters(
         mode=NameChangeMode.REPLACE,
@@ -56,7 +80,12 @@ class AppState:
     transformations: list[Transformation] = []
     transformations_locked: bool = False
     available_transformations: list[Transformation] = []
-    selected_files: list[AudioFile] = []
+    selected_files: FileCatalog = FileCatalog()
+    compared_preset_ids: list[int] = []
+
+
+# The UI catches up with every change once per frame
+AppState = AppStateStore(schedule=lambda flush: Clock.schedule_once(lambda dt: flush()))
 
 
 class AudioChefApp(kivy.app.App):
@@ -75,17 +104,24 @@ class AudioChefApp(kivy.app.App):
     supported_audio_formats = SUPPORTED_AUDIO_FORMATS
     audio_chef_window: AudioChefWindow
     ffmpeg_path: pathlib.Path = FFMPEG_PATH
+    worker_pool: WorkerPool
+    scheduler: JobScheduler
+    job_api: JobApi | None = None
+    # Counts preview requests, rendered off the UI thread
+    _preview_request = 0
 
     def __init__(self):
         logger.setLevel(self.log_level)
         super().__init__()
+        # Nothing is started until the window is up or a batch needs it
+        self.worker_pool = WorkerPool()
+        # The app's batches and the job API's share the queue
+        self.scheduler = JobScheduler(self.worker_pool, self._get_batch_options)
 
 
     def add_file(self, window, filename: bytes, x, y):
         filename = filename.decode()
-        try:
-            audio_file = AudioFile(filename)
-        except NoCompatibleAudioFormatException:
+        if AppState.selected_files.add([filename]):
             logger.error(f"Unable to find audio format for {filename}")
             Popup(
                 title="Unsupported file format!",
@@ -99,8 +135,7 @@ class AudioChefApp(kivy.app.App):
             ).open()
             return
 
-        AppState.selected_files.append(audio_file)
-        self.audio_chef_window.update_files_to_ui(AppState.selected_files)
+        AppState.touch("selected_files")
 
     def build(self):
         logger.info("Loading KV file ...")
@@ -110,8 +145,20 @@ class AudioChefApp(kivy.app.App):
         logger.info("Loading audio formats ...")
         load_audio_formats(self.ffmpeg_path)
 
+        logger.info("Preparing scratch storage ...")
+        self._configure_scratch()
+        ScratchStorage.cleanup_orphans()
+
         logger.info("Initializing database ...")
         initialize_db("presets.db")
+        # Unchanged plugins are never loaded, their metadata is in the db
+        PluginRepository.rescan_changed_plugins()
+
+        logger.info("Starting job scheduler ...")
+        self.scheduler.add_listener(
+            lambda job: Clock.schedule_once(lambda dt: self._on_job_update(job))
+        )
+        self.scheduler.start()
 
         logger.debug("Binding dropfile event ...")
         kivy.core.window.Window.clearcolor = self.window_background_color
@@ -134,17 +181,103 @@ class AudioChefApp(kivy.app.App):
         kivy.core.window.Window.bind(on_restore=self.set_window_restored_state)
         kivy.core.window.Window.bind(on_drop_file=self.add_file)
         self.audio_chef_window = AudioChefWindow()
+        self._subscribe_ui()
         preset = self._get_default_preset()
 
         self._load_preset(preset)
 
         AppState.available_transformations = self._get_available_transformations()
-        self.audio_chef_window.update_available_transformations_to_ui(
-            AppState.available_transformations
-        )
         inspector.create_inspector(kivy.core.window.Window, self.audio_chef_window)
         return self.audio_chef_window
 
+    def _subscribe_ui(self) -> None:
+        window = self.audio_chef_window
+        AppState.subscribe(
+            ["ext", "additional_exts", "target_sample_rate"],
+            lambda: window.update_ext_to_ui(
+                AppState.ext, AppState.additional_exts, AppState.target_sample_rate
+            ),
+        )
+        AppState.subscribe(
+            ["name_change_params"],
+            lambda: window.update_name_changer_to_ui(AppState.name_change_params),
+        )
+        AppState.subscribe(
+            ["ext", "name_change_params"],
+            lambda: window.update_filenames_to_ui(
+                AppState.ext, AppState.name_change_params
+            ),
+        )
+        AppState.subscribe(
+            ["transformations"],
+            lambda: window.update_transformations_to_ui(AppState.transformations),
+        )
+        AppState.subscribe(
+            ["available_transformations"],
+            lambda: window.update_available_transformations_to_ui(
+                AppState.available_transformations
+            ),
+        )
+        AppState.subscribe(
+            ["selected_files"],
+            lambda: window.update_files_to_ui(AppState.selected_files),
+        )
+
+    def on_start(self):
+        self.worker_pool.idle_timeout_s = self.config.getfloat(
+            "Execution", "worker_idle_timeout_s"
+        )
+        Clock.schedule_once(self._prewarm_workers, PREWARM_DELAY_S)
+        Clock.schedule_interval(self._shrink_idle_workers, IDLE_CHECK_INTERVAL_S)
+        self._configure_job_api()
+
+    def on_config_change(self, config, section, key, value):
+        if (section, key) == ("Execution", "worker_idle_timeout_s"):
+            self.worker_pool.idle_timeout_s = float(value)
+        elif section == "Storage":
+            self._configure_scratch()
+        elif section == "Jobs":
+            self._configure_job_api()
+
+    def _configure_scratch(self) -> None:
+        configure_cache_dir(self.config.get("Storage", "cache_dir"))
+        ScratchStorage.configure(
+            self.config.get("Storage", "scratch_dir") or None,
+            int(self.config.getfloat("Storage", "scratch_quota_mb") * 2**20),
+        )
+
+    def _configure_job_api(self) -> None:
+        if self.job_api:
+            self.job_api.shutdown()
+            self.job_api = None
+        if not self.config.getboolean("Jobs", "api_enabled"):
+            return
+        try:
+            self.job_api = JobApi(
+                self.scheduler, port=self.config.getint("Jobs", "port")
+            )
+        except OSError as e:
+            logger.error(f"Unable to start the job API: {e}")
+            return
+        self.job_api.start()
+
+    def _prewarm_workers(self, dt) -> None:
+        pipeline_config = self._get_pipeline_config()
+        threading.Thread(
+            target=self.worker_pool.prewarm,
+            args=(pipeline_config.dsp_workers, pipeline_config.dsp_processes),
+            name="audiochef-prewarm",
+            daemon=True,
+        ).start()
+
+    def _shrink_idle_workers(self, dt) -> None:
+        # Stopping processes waits for them, keep that off the UI thread
+        threading.Thread(
+            target=self.worker_pool.shrink_if_idle,
+            name="audiochef-shrink",
+            daemon=True,
+        ).start()
+
     def _get_default_preset(self) -> Preset:
         default_preset = PresetRepository.get_default()
         if default_preset:
@@ -163,7 +296,16 @@ class AudioChefApp(kivy.app.App):
         return preset
 
     def _get_available_transformations(self) -> list[Transformation]:
-        return PluginRepository.get_available_transformations()
+        transformations = PluginRepository.get_available_transformations()
+        # Plugin parameters' slider ranges come from their scanned metadata
+        for transformation in transformations:
+            if transformation.name not in TRANSFORMATIONS:
+                self._set_argument_defaults(
+                    self.config,
+                    transformation.name,
+                    PluginRepository.get_arguments(transformation.name),
+                )
+        return transformations
 
     def _save_plugin(self, plugin_path: str) -> None:
         PluginRepository.save_plugin(plugin_path)
@@ -179,6 +321,9 @@ class AudioChefApp(kivy.app.App):
     def _load_preset(preset: Preset) -> None:
         if not AppState.ext_locked:
             AppState.ext = preset.ext
+            AppState.additional_exts = preset.additional_exts
+            AppState.encoder_settings = preset.encoder_settings
+            AppState.target_sample_rate = preset.target_sample_rate
         if not AppState.name_change_locked:
             AppState.name_change_params = preset.name_change_parameters
         if not AppState.transformations_locked:
@@ -190,29 +335,233 @@ class AudioChefApp(kivy.app.App):
             preset_metadata = PresetRepository.save_preset(current_preset)
             self.audio_chef_window.add_preset_button(preset_metadata)
 
+    def plan_preset(self) -> None:
+        preset = self._make_preset()
+        if not preset:
+            return
+
+        # Probing reads every file, so it runs on a snapshot off the UI thread
+        catalog = AppState.selected_files.copy()
+        pipeline_config = self._get_pipeline_config()
+
+        def estimate() -> None:
+            try:
+                batch_estimate = AudioClient.estimate_batch(
+                    catalog,
+                    preset.transformations,
+                    pipeline_config,
+                    additional_exts=preset.additional_exts,
+                    target_sample_rate=preset.target_sample_rate,
+                )
+            except Exception as e:
+                logger.exception("Unable to estimate the batch")
+                message = str(e)
+                Clock.schedule_once(
+                    lambda dt: NoticePopup(
+                        title="Cannot plan this batch", text=message
+                    ).open()
+                )
+                return
+            Clock.schedule_once(
+                lambda dt: self._on_batch_estimated(catalog, batch_estimate)
+            )
+
+        threading.Thread(target=estimate, name="audiochef-plan", daemon=True).start()
+
+    def _on_batch_estimated(self, catalog: FileCatalog, estimate: BatchEstimate) -> None:
+        AppState.selected_files.update_probes(catalog)
+        PlanPopup(title="Batch plan", text=estimate.summary()).open()
+
     def execute_preset(self) -> None:
         preset = self._make_preset()
         if not preset:
             return
 
-        success = AudioClient.execute_preset(
-            preset.ext, AppState.selected_files, preset.transformations
+        # Runs off the UI thread, progress comes back through _on_job_update
+        self.scheduler.submit(
+            preset, AppState.selected_files.audio_files(), source="app"
         )
-        if not success:
+
+    def _on_job_update(self, job: Job) -> None:
+        if job.status == JobStatus.RUNNING:
+            self.audio_chef_window.update_progress_to_ui(job.progress)
+            return
+        if not job.finished:
+            return
+        self.audio_chef_window.update_progress_to_ui(None)
+        if job.source != "app":
+            return
+        filenames = [audio_file.filename for audio_file in job.files]
+        if job.status == JobStatus.DONE:
+            AppState.selected_files.set_statuses(filenames, FileStatus.RENDERED)
+            AppState.selected_files.set_statuses(job.failed_files, FileStatus.FAILED)
+        else:
+            AppState.selected_files.set_statuses(filenames, FileStatus.FAILED)
+        AppState.touch("selected_files")
+        if job.status == JobStatus.FAILED:
             Popup(
                 title="I Encountered an Error!",
                 content=Label(
                     text="I wrote all the info for the developer in a log file.\n"
                     "Check the folder with AudioChef it in."
                 ),
+            ).open()
+
+    def compare_preset(self, preset_id: int, compare: bool) -> None:
+        compared = [id_ for id_ in AppState.compared_preset_ids if id_ != preset_id]
+        AppState.compared_preset_ids = compared + ([preset_id] if compare else [])
+
+    def execute_compared_presets(self) -> None:
+        if not AppState.compared_preset_ids:
+            NoticePopup(
+                title="No presets to compare",
+                text="Tick 'Compare' on the presets you want to render side by side",
+            ).open()
+            return
+
+        # Presets deleted since they were ticked are skipped
+        names = {
+            metadata.id: metadata.name for metadata in PresetRepository.get_metadata()
+        }
+        presets = {
+            preset_id: self._get_preset_by_id(preset_id)
+            for preset_id in AppState.compared_preset_ids
+            if preset_id in names
+        }
+        audio_files = AppState.selected_files.audio_files()
+        # Queued with the batches, which use the same files, see _on_job_update
+        self.scheduler.submit_task(
+            "compare",
+            audio_files,
+            lambda options: AudioClient.execute_presets(
+                presets, audio_files, options.pipeline_config, names
+            ),
+        )
+
+    def preview_preset(self, start_second: float, duration: float, draft: bool) -> None:
+        preset = self._make_preset()
+        if not AppState.selected_files:
+            NoticePopup(
+                title="Nothing to preview",
+                text="Add a file first, its preview will play here",
+            ).open()
+            return
+
+        try:
+            AudioClient.check_selected_transformation(preset.transformations)
+            plugins = AudioClient.get_plugins(preset.transformations)
+        except UnexecutableRecipeError as e:
+            NoticePopup(title="Cannot preview this preset", text=str(e)).open()
+            return
+
+        first_file = next(iter(AppState.selected_files))
+        audio_file = AppState.selected_files.get_audio_file(first_file)
+        self._preview_request += 1
+        request = self._preview_request
+
+        def render() -> None:
+            try:
+                preview_file = PreviewRenderer.write_preview(
+                    audio_file,
+                    start_second,
+                    duration,
+                    preset.transformations,
+                    draft,
+                    preset.target_sample_rate,
+                    plugins,
+                )
+            except Exception:
+                logger.exception("Unable to render the preview")
+                return
+            Clock.schedule_once(
+                lambda dt: self._on_preview_rendered(request, preview_file)
             )
 
+        threading.Thread(target=render, name="audiochef-preview", daemon=True).start()
+
+    def _on_preview_rendered(self, request: int, preview_file: str) -> None:
+        # Only the latest preview asked for is played
+        if request == self._preview_request:
+            self.audio_chef_window.play_preview(preview_file)
+
+    def render_sweep(
+        self, index: int, params: dict, sweep_argument_names: list[str]
+    ) -> None:
+        if not sweep_argument_names:
+            NoticePopup(
+                title="Nothing to sweep",
+                text="Tick 'Sweep' next to the parameters you want to try out",
+            ).open()
+            return
+
+        preset = Preset.replace_transform_at(
+            self._make_preset(),
+            index,
+            dataclasses.replace(AppState.transformations[index], params=params),
+        )
+        if AudioClient.get_plugins(preset.transformations):
+            NoticePopup(
+                title="Cannot sweep this preset",
+                text="Sweeps only run built-in transformations for now",
+            ).open()
+            return
+        try:
+            ranges = [
+                SweepRange.for_argument(preset, index, argument_name, self.config)
+                for argument_name in sweep_argument_names
+            ]
+        except ValueError as e:
+            NoticePopup(title="Cannot sweep this preset", text=str(e)).open()
+            return
+        audio_files = AppState.selected_files.audio_files()
+
+        def sweep(options: BatchOptions) -> BatchReport:
+            renders = ParameterSweep.render(
+                preset, ranges, audio_files, options.pipeline_config.dsp_workers
+            )
+            logger.info(f"Rendered {len(renders)} sweep output(s)")
+            return BatchReport(
+                rendered_files=len(audio_files), encoded_files=len(renders)
+            )
+
+        # Runs off the UI thread like the comparisons, see _on_job_update
+        self.scheduler.submit_task("sweep", audio_files, sweep)
+
+    def _get_pipeline_config(self) -> PipelineConfig:
+        return PipelineConfig(
+            decode_workers=self.config.getint("Execution", "decode_workers"),
+            dsp_workers=self.config.getint("Execution", "dsp_workers"),
+            encode_workers=self.config.getint("Execution", "encode_workers"),
+            queue_size=self.config.getint("Execution", "queue_size"),
+            dsp_processes=self.config.getboolean("Execution", "dsp_processes"),
+            chunk_workers=self.config.getint("Execution", "chunk_workers"),
+        )
+
+    def _get_batch_options(self) -> BatchOptions:
+        return BatchOptions(
+            self._get_pipeline_config(),
+            self.config.getboolean("Execution", "analyze_outputs"),
+            self._get_silence_config(),
+        )
+
+    def _get_silence_config(self) -> SilenceConfig | None:
+        if not self.config.getboolean("Execution", "skip_silence"):
+            return None
+        return SilenceConfig(
+            threshold_db=self.config.getfloat("Execution", "silence_threshold_db"),
+            min_silence_s=self.config.getfloat("Execution", "min_silence_s"),
+            zero=self.config.getboolean("Execution", "zero_silence"),
+        )
+
     @staticmethod
     def _make_preset() -> Preset:
         return Preset(
             ext=AppState.ext,
             transformations=AppState.transformations,
             name_change_parameters=AppState.name_change_params,
+            additional_exts=AppState.additional_exts,
+            encoder_settings=AppState.encoder_settings,
+            target_sample_rate=AppState.target_sample_rate,
         )
 
     @staticmethod
@@ -242,6 +591,13 @@ class AudioChefApp(kivy.app.App):
         self.config.set("Window", "left", kivy.core.window.Window.left)
         # self.config.set('graphics', 'window_state', Window.ma)
         self.config.write()
+        logger.debug("Stopping workers ...")
+        if self.job_api:
+            self.job_api.shutdown()
+        self.scheduler.shutdown()
+        self.worker_pool.shutdown()
+        logger.info(ScratchStorage.stats().summary())
+        ScratchStorage.end_run()
         return False
 
     def build_config(self, config):
@@ -250,15 +606,44 @@ class AudioChefApp(kivy.app.App):
             "Window",
             {"width": self.min_width, "height": self.min_height, "maximized": "false"},
         )
+        default_pipeline_config = PipelineConfig()
+        config.setdefaults(
+            "Execution",
+            {
+                "decode_workers": default_pipeline_config.decode_workers,
+                "dsp_workers": default_pipeline_config.dsp_workers,
+                "encode_workers": default_pipeline_config.encode_workers,
+                "queue_size": default_pipeline_config.queue_size,
+                "dsp_processes": int(default_pipeline_config.dsp_processes),
+                "chunk_workers": default_pipeline_config.chunk_workers,
+                "worker_idle_timeout_s": IDLE_TIMEOUT_S,
+                "analyze_outputs": 0,
+                "skip_silence": 0,
+                "silence_threshold_db": SilenceConfig.threshold_db,
+                "min_silence_s": SilenceConfig.min_silence_s,
+                "zero_silence": int(SilenceConfig.zero),
+            },
+        )
+
+        config.setdefaults(
+            "Storage", {"scratch_dir": "", "scratch_quota_mb": 0, "cache_dir": ""}
+        )
+        config.setdefaults("Jobs", {"api_enabled": 0, "port": DEFAULT_PORT})
 
         for transformation_name, transformation in TRANSFORMATIONS.items():
-            arguments_dict = {}
-            for argument in transformation.arguments:
-                if argument.type is float:
-                    arguments_dict[f"{argument.name} max"] = argument.max
-                    arguments_dict[f"{argument.name} min"] = argument.min
-                    arguments_dict[f"{argument.name} step"] = argument.step
-            config.setdefaults(transformation_name, arguments_dict)
+            self._set_argument_defaults(
+                config, transformation_name, transformation.arguments
+            )
+
+    @staticmethod
+    def _set_argument_defaults(config, transformation_name: str, arguments) -> None:
+        arguments_dict = {}
+        for argument in arguments:
+            if argument.type is float:
+                arguments_dict[f"{argument.name} max"] = argument.max
+                arguments_dict[f"{argument.name} min"] = argument.min
+                arguments_dict[f"{argument.name} step"] = argument.step
+        config.setdefaults(transformation_name, arguments_dict)
 
     def get_application_config(self, defaultpath="%(appdir)s/%(appname)s.ini"):
         if kivy.platform == "macosx":  # mac will not write into app folder
@@ -268,6 +653,140 @@ class AudioChefApp(kivy.app.App):
         return super().get_application_config(defaultpath=s)
 
     def build_settings(self, settings):
+        execution_settings = [
+            {
+                "type": "numeric",
+                "title": title,
+                "desc": desc,
+                "section": "Execution",
+                "key": key,
+            }
+            for key, title, desc in [
+                (
+                    "decode_workers",
+                    "Decode workers",
+                    "How many files to decode at the same time",
+                ),
+                (
+                    "dsp_workers",
+                    "Processing workers",
+                    "How many files to run through the transformations at the same time",
+                ),
+                (
+                    "encode_workers",
+                    "Encode workers",
+                    "How many files to encode at the same time",
+                ),
+                (
+                    "queue_size",
+                    "Queue size",
+                    "How many files may wait between two stages (each one is held in memory)",
+                ),
+                (
+                    "chunk_workers",
+                    "Chunk workers",
+                    "How many parts of one long file to process at the same time, when its transformations allow it",
+                ),
+                (
+                    "worker_idle_timeout_s",
+                    "Worker idle timeout",
+                    "Seconds before idle worker processes are stopped, they are started again when needed",
+                ),
+                (
+                    "silence_threshold_db",
+                    "Silence threshold",
+                    "Audio quieter than this many dB counts as silence when skipping silence",
+                ),
+                (
+                    "min_silence_s",
+                    "Minimum silence",
+                    "Silences shorter than this many seconds are processed anyway",
+                ),
+            ]
+        ]
+        execution_settings.append(
+            {
+                "type": "bool",
+                "title": "Process in separate processes",
+                "desc": "Run transformations in worker processes, sharing audio through shared memory",
+                "section": "Execution",
+                "key": "dsp_processes",
+            }
+        )
+        execution_settings.append(
+            {
+                "type": "bool",
+                "title": "Skip silence",
+                "desc": "Do not run transformations over long silences, when the transformations allow it",
+                "section": "Execution",
+                "key": "skip_silence",
+            }
+        )
+        execution_settings.append(
+            {
+                "type": "bool",
+                "title": "Zero skipped silence",
+                "desc": "Write skipped silences as digital silence instead of the untouched input",
+                "section": "Execution",
+                "key": "zero_silence",
+            }
+        )
+        execution_settings.append(
+            {
+                "type": "bool",
+                "title": "Analyze outputs",
+                "desc": "Measure peak, true peak, clipping, RMS and loudness of every output and save them in a .analysis.json file next to it",
+                "section": "Execution",
+                "key": "analyze_outputs",
+            }
+        )
+        settings.add_json_panel(
+            "Execution", self.config, data=json.dumps(execution_settings)
+        )
+        storage_settings = [
+            {
+                "type": "path",
+                "title": "Scratch directory",
+                "desc": "Where intermediate audio files are written, e.g. /dev/shm to keep them in memory. Empty for the default, applies after a restart",
+                "section": "Storage",
+                "key": "scratch_dir",
+            },
+            {
+                "type": "numeric",
+                "title": "Scratch quota",
+                "desc": "How many MiB of intermediate files a run may write before it fails, 0 for no limit",
+                "section": "Storage",
+                "key": "scratch_quota_mb",
+            },
+            {
+                "type": "path",
+                "title": "Cache directory",
+                "desc": "Where waveform peaks and audio measurements are kept between runs. Empty for your user's cache directory, applies after a restart",
+                "section": "Storage",
+                "key": "cache_dir",
+            },
+        ]
+        settings.add_json_panel(
+            "Storage", self.config, data=json.dumps(storage_settings)
+        )
+        job_settings = [
+            {
+                "type": "bool",
+                "title": "Accept jobs from other programs",
+                "desc": "Listen on this computer only for files to render with a saved preset",
+                "section": "Jobs",
+                "key": "api_enabled",
+            },
+            {
+                "type": "numeric",
+                "title": "Port",
+                "desc": "The port of the job API, on 127.0.0.1",
+                "section": "Jobs",
+                "key": "port",
+            },
+        ]
+        settings.add_json_panel("Jobs", self.config, data=json.dumps(job_settings))
+
         for transformation_name, transformation in TRANSFORMATIONS.items():
             arguments_list = []
             for argument in transformation.arguments:
@@ -299,36 +818,44 @@ class AudioChefApp(kivy.app.App):
                             "key": f"{argument.name} step",
                         }
                     )
+            # Nothing to set for transformations without numeric arguments
+            if not arguments_list:
+                continue
             settings.add_json_panel(
                 transformation_name, self.config, data=json.dumps(arguments_list)
             )
 
     def update_ext(self, new_ext: str) -> None:
         AppState.ext = new_ext
-        self.audio_chef_window.update_ext_to_ui(AppState.ext)
+
+    def update_additional_exts(self, new_additional_exts: str) -> None:
+        AppState.additional_exts = [
+            ext.strip().lower() for ext in new_additional_exts.split(",") if ext.strip()
+        ]
+
+    def update_target_sample_rate(self, new_sample_rate: int | None) -> None:
+        AppState.target_sample_rate = new_sample_rate
 
     def add_transform_item_click_handler(self) -> None:
-        AppState.transformations += [Transformation(name=None, params={})]
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
+        AppState.transformations = AppState.transformations + [
+            Transformation(name=None, params={})
+        ]
 
     def remove_transform_item(self, transform_index: int) -> None:
         transformations = AppState.transformations
         AppState.transformations = (
             transformations[:transform_index] + transformations[transform_index + 1 :]
         )
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
 
     def shift_up(self, index: int) -> None:
         AppState.transformations = self._move_transform(
             AppState.transformations, index, index + 1
         )
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
 
     def shift_down(self, index: int) -> None:
         AppState.transformations = self._move_transform(
             AppState.transformations, index, max(index - 1, 0)
         )
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
 
     @staticmethod
     def _move_transform(
@@ -347,7 +874,6 @@ class AudioChefApp(kivy.app.App):
         new_transformations = AppState.transformations[:]
         new_transformations[index] = new_transform
         AppState.transformations = new_transformations
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
 
     def update_transformation_params(self, index: int, params: dict) -> None:
         transform = AppState.transformations[index]
@@ -357,13 +883,11 @@ class AudioChefApp(kivy.app.App):
         new_transformations = AppState.transformations[:]
         new_transformations[index] = new_transform
         AppState.transformations = new_transformations
-        self.audio_chef_window.update_transformations_to_ui(AppState.transformations)
 
     def update_name_change_mode(self, new_mode: NameChangeMode) -> None:
         AppState.name_change_params = dataclasses.replace(
             AppState.name_change_params, mode=new_mode
         )
-        self.audio_chef_window.update_name_changer_to_ui(AppState.name_change_params)
 
     def update_name_change_replace_from_input(
         self, new_replace_from_input: str
@@ -371,23 +895,24 @@ class AudioChefApp(kivy.app.App):
         AppState.name_change_params = dataclasses.replace(
             AppState.name_change_params, replace_from_input=new_replace_from_input
         )
-        self.audio_chef_window.update_name_changer_to_ui(AppState.name_change_params)
 
     def update_name_change_replace_to_input(self, new_replace_to_input: str) -> None:
         AppState.name_change_params = dataclasses.replace(
             AppState.name_change_params, replace_to_input=new_replace_to_input
         )
-        self.audio_chef_window.update_name_changer_to_ui(AppState.name_change_params)
 
     def update_name_change_wildcards_input(self, new_wildcards_input: str) -> None:
         AppState.name_change_params = dataclasses.replace(
             AppState.name_change_params, wildcards_input=new_wildcards_input
         )
-        self.audio_chef_window.update_name_changer_to_ui(AppState.name_change_params)
+
+    def remove_file(self, filename: str) -> None:
+        AppState.selected_files.remove(filename)
+        AppState.touch("selected_files")
 
     def clear_files(self, *args, **kwargs):
-        AppState.selected_files = []
-        self.audio_chef_window.update_files_to_ui(AppState.selected_files)
+        AppState.selected_files.clear()
+        AppState.touch("selected_files")
 
     def lock_ext(self, lock_status: bool):
         AppState.ext_locked = lock_status
@@ -412,9 +937,6 @@ class AudioChefApp(kivy.app.App):
 
         self._save_plugin(vst3_file)
         AppState.available_transformations = self._get_available_transformations()
-        self.audio_chef_window.update_available_transformations_to_ui(
-            AppState.available_transformations
-        )
         return True
 
 
@@ -1,4 +1,5 @@
-from kivy.properties import BooleanProperty, ObjectProperty
+from kivy.core.audio import Sound, SoundLoader
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.widget import Widget
 
@@ -8,12 +9,13 @@ from audio_chef.components.extension_box import ExtBox
 from audio_chef.components.helper_classes import PresetButton
 from audio_chef.components.name_changer import NameChangerBox
 from audio_chef.components.transforms_box import TransformsBox
+from audio_chef.models.catalog import FileCatalog
+from audio_chef.models.estimate import BatchProgress
 from audio_chef.models.preset import (
     NameChangeParameters,
     PresetMetadata,
     Transformation,
 )
-from audio_chef.utils.audio_formats import AudioFile
 
 
 class AudioChefWindow(BoxLayout):
@@ -23,17 +25,20 @@ class AudioChefWindow(BoxLayout):
     transforms_box: TransformsBox = ObjectProperty()
     presets_box: Widget = ObjectProperty()
     file_list: FileList = ObjectProperty()
+    status_text = StringProperty("")
 
     def __init__(self, **kwargs):
         self.selected_transformations = []
+        self._preview_sound: Sound | None = None
         super().__init__(**kwargs)
 
     def on_kv_post(self, base_widget):
         self._load_preset_buttons()
 
-    def update_ext_to_ui(self, ext: str) -> None:
-        self.ext_box.load_state(ext)
-        self.file_list.ext = ext
+    def update_ext_to_ui(
+        self, ext: str, additional_exts: list[str], target_sample_rate: int | None
+    ) -> None:
+        self.ext_box.load_state(ext, additional_exts, target_sample_rate)
 
     def update_transformations_to_ui(self, transformations: list[Transformation]):
         self.transforms_box.load_state(transformations)
@@ -45,7 +50,13 @@ class AudioChefWindow(BoxLayout):
 
     def update_name_changer_to_ui(self, name_change_parameters: NameChangeParameters):
         self.name_changer.load_state(name_change_parameters)
+
+    def update_filenames_to_ui(
+        self, ext: str, name_change_parameters: NameChangeParameters
+    ) -> None:
+        self.file_list.ext = ext
         self.file_list.name_change_parameters = name_change_parameters
+        self.file_list.update_filenames()
 
     def _load_preset_buttons(self):
         metadata = PresetRepository.get_metadata()
@@ -73,5 +84,16 @@ class AudioChefWindow(BoxLayout):
                 self.presets_box.remove_widget(button)
                 break
 
-    def update_files_to_ui(self, selected_files: list[AudioFile]):
+    def update_files_to_ui(self, selected_files: FileCatalog):
         self.file_list.update_files(selected_files)
+
+    def update_progress_to_ui(self, progress: BatchProgress | None) -> None:
+        self.status_text = progress.summary() if progress else ""
+
+    def play_preview(self, preview_file: str) -> None:
+        if self._preview_sound:
+            self._preview_sound.stop()
+            self._preview_sound.unload()
+        self._preview_sound = SoundLoader.load(preview_file)
+        if self._preview_sound:
+            self._preview_sound.play()
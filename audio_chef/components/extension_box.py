@@ -1,12 +1,40 @@
-from kivy.properties import StringProperty
+from kivy.app import App
+from kivy.properties import BooleanProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 
+from audio_chef.utils.resampling import parse_sample_rate
+
 
 class ExtBox(BoxLayout):
     ext_text = StringProperty()
+    additional_exts_text = StringProperty()
+    sample_rate_text = StringProperty()
+    sample_rate_valid = BooleanProperty(True)
 
-    def load_state(self, ext: str):
+    def load_state(
+        self, ext: str, additional_exts: list[str], target_sample_rate: int | None
+    ):
         if not self.ids.lock.selected:
             return
 
         self.ext_text = ext
+        if additional_exts != self._parse_additional_exts():
+            self.additional_exts_text = ", ".join(additional_exts)
+        self.sample_rate_text = str(target_sample_rate or "")
+
+    def on_sample_rate_text(self, _, text: str) -> None:
+        # Invalid rates keep the previous one until corrected
+        try:
+            sample_rate = parse_sample_rate(text)
+        except ValueError:
+            self.sample_rate_valid = False
+            return
+        self.sample_rate_valid = True
+        App.get_running_app().update_target_sample_rate(sample_rate)
+
+    def _parse_additional_exts(self) -> list[str]:
+        return [
+            ext.strip().lower()
+            for ext in self.additional_exts_text.split(",")
+            if ext.strip()
+        ]
@@ -1,93 +1,138 @@
 import logging
-import os
-from typing import List
 
-from kivy.uix.button import Button
-from kivy.uix.gridlayout import GridLayout
+import numpy
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.graphics import Color, Mesh
+from kivy.properties import (
+    ListProperty,
+    NumericProperty,
+    ObjectProperty,
+    StringProperty,
+)
+from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
 
+from audio_chef.adapters.peak_store import PeakPyramidStore
+from audio_chef.models.catalog import FileCatalog, FileStatus
 from audio_chef.models.preset import NameChangeParameters, NameChangeMode
-from audio_chef.utils.audio_formats import (
-    AudioFile,
-    SUPPORTED_AUDIO_FORMATS,
-)
+from audio_chef.utils.peaks import PeakPyramid
 
 logger = logging.getLogger("audiochef")
 
+STATUS_COLORS = {
+    FileStatus.ADDED: (1, 1, 1, 1),
+    FileStatus.RENDERED: (0.6, 1, 0.6, 1),
+    FileStatus.FAILED: (1, 0.4, 0.4, 1),
+}
+
+
+class FileList(RecycleView):
+    """The catalog's rows, only the visible ones have widgets, recycled on scroll.
+
+    Rows read their file, destination and status straight from the catalog's
+    columns, and ask for peaks once they are first shown.
+    """
 
-class FileList(GridLayout):
     def __init__(self, **kwargs):
-        self.selected_files: list[AudioFile] = []
+        self.catalog = FileCatalog()
         self.ext = ""
         self.name_change_parameters = NameChangeParameters(mode=NameChangeMode.REPLACE, wildcards_input="", replace_from_input="", replace_to_input="")
-        self.file_widget_map = {}
+        # None while being built, or when it could not be
+        self._pyramids: dict[str, PeakPyramid | None] = {}
         super().__init__(**kwargs)
 
-    def add_file(self, audio_file: AudioFile):
-        if audio_file not in self.selected_files:
-            audio_file.update_destination_name_and_ext(
-                self.get_output_filename(audio_file.filename)
+    def update_files(self, catalog: FileCatalog):
+        self.catalog = catalog
+        self.catalog.rename(self.name_change_parameters, self.ext)
+        self._pyramids = {
+            filename: pyramid
+            for filename, pyramid in self._pyramids.items()
+            if filename in catalog
+        }
+        data = [{"row": row} for row in range(len(catalog))]
+        if data == self.data:
+            # Same rows, their files or statuses changed
+            self.refresh_from_data()
+        else:
+            self.data = data
+
+    def update_filenames(self, *args, **kwargs):
+        self.catalog.rename(self.name_change_parameters, self.ext)
+        self.refresh_from_data()
+
+    def get_pyramid(self, filename: str) -> PeakPyramid | None:
+        if filename not in self._pyramids:
+            self._pyramids[filename] = None
+            PeakPyramidStore.request(
+                filename,
+                self.catalog.get_decoder(filename),
+                lambda pyramid: Clock.schedule_once(
+                    lambda _: self._on_pyramid(filename, pyramid)
+                ),
             )
-            self.selected_files.append(audio_file)
+        return self._pyramids[filename]
 
-            file_label = FileLabel(text=audio_file.filename)
-            self.add_widget(file_label)
+    def _on_pyramid(self, filename: str, pyramid: PeakPyramid) -> None:
+        if filename not in self._pyramids:
+            return
+        self._pyramids[filename] = pyramid
+        for row in self.layout_manager.children:
+            if row.filename == filename:
+                row.pyramid = pyramid
 
-            preview_label = FileLabel(
-                text=self.get_output_filename(audio_file.filename)
-            )
-            self.add_widget(preview_label)
 
-            remove_button = Button(
-                text="-",
-                width=50,
-                size_hint_x=None,
-                on_release=lambda x: self.remove_file(audio_file),
-            )
-            self.add_widget(remove_button)
-            self.file_widget_map[audio_file.filename] = (
-                file_label,
-                preview_label,
-                remove_button,
-            )
+class FileRow(RecycleDataViewBehavior, BoxLayout):
+    row = NumericProperty()
+    filename = StringProperty()
+    destination = StringProperty()
+    status_color = ListProperty(STATUS_COLORS[FileStatus.ADDED])
+    pyramid: PeakPyramid | None = ObjectProperty(None, allownone=True)
 
-    def remove_file(self, file: AudioFile):
-        for widget in self.file_widget_map[file.filename]:
-            self.remove_widget(widget)
-        del self.file_widget_map[file.filename]
-        self.selected_files.remove(file)
+    def refresh_view_attrs(self, file_list: FileList, index: int, data: dict):
+        self.filename, self.destination, status = file_list.catalog.get_row(index)
+        self.status_color = STATUS_COLORS[status]
+        self.pyramid = file_list.get_pyramid(self.filename)
+        return super().refresh_view_attrs(file_list, index, data)
 
-    def update_files(self, files: List[AudioFile]):
-        self.clear_files()
-        for file in files:
-            self.add_file(file)
 
-    def clear_files(self, *args, **kwargs):
-        for file in self.selected_files[:]:
-            self.remove_file(file)
+class FileLabel(Label):
+    pass
 
-    def update_filenames(self, *args, **kwargs):
-        for audio_file in self.selected_files:
-            new_filename = self.get_output_filename(audio_file.filename)
-            audio_file.update_destination_name_and_ext(new_filename)
-            self.file_widget_map[audio_file.filename][1].text = new_filename
 
-    def get_output_filename(self, filename):
-        name, ext = os.path.splitext(filename)
-        if ext.strip(".") not in [
-            format_.ext for format_ in SUPPORTED_AUDIO_FORMATS if format_.can_decode
-        ]:
-            return "This file format is not supported"
-        return self.get_output_name(name) + self.get_output_ext(ext)
+class WaveformThumbnail(Widget):
+    """Draws a file's waveform from its peak pyramid, never from the audio."""
 
-    def get_output_name(self, name):
-        path, filename = os.path.split(name)
-        new_name = self.name_change_parameters.change_name(filename)
-        return os.path.join(path, new_name)
+    pyramid: PeakPyramid | None = ObjectProperty(None, allownone=True)
 
-    def get_output_ext(self, ext):
-        return "." + (self.ext or ext[1:])
+    def on_pyramid(self, *args):
+        self.redraw()
 
+    def on_size(self, *args):
+        self.redraw()
 
-class FileLabel(Label):
-    pass
+    def on_pos(self, *args):
+        self.redraw()
+
+    def redraw(self):
+        self.canvas.clear()
+        width = int(self.width)
+        if self.pyramid is None or width <= 0:
+            return
+
+        minimum, maximum = self.pyramid.thumbnail(width)
+        vertices = numpy.zeros((width, 2, 4))
+        vertices[:, :, 0] = self.x + numpy.arange(width)[:, numpy.newaxis]
+        vertices[:, 0, 1] = minimum
+        vertices[:, 1, 1] = maximum
+        vertices[:, :, 1] = self.y + (vertices[:, :, 1] + 1) * self.height / 2
+        with self.canvas:
+            Color(*App.get_running_app().main_color)
+            Mesh(
+                vertices=vertices.ravel().tolist(),
+                indices=list(range(width * 2)),
+                mode="lines",
+            )
@@ -7,6 +7,7 @@ import kivy.properties  # type: ignore
 import kivy.uix.boxlayout  # type: ignore
 import kivy.uix.button  # type: ignore
 import kivy.uix.dropdown  # type: ignore
+import kivy.uix.recycleview  # type: ignore
 from kivy.uix.popup import Popup
 
 logger = logging.getLogger("audiochef")
@@ -65,17 +66,28 @@ class ValidatedInput(kivy.uix.boxlayout.BoxLayout):
             text_input.background_color = "lightsalmon"
 
 
+class OptionRow(kivy.uix.button.Button):
+    options_box = kivy.properties.ObjectProperty()
+
+
+class OptionsList(kivy.uix.recycleview.RecycleView):
+    """Only the visible options have a row, recycled while scrolling."""
+
+
 class OptionsBox(ValidatedInput):
     options: typing.List[str] = kivy.properties.ListProperty()
 
     def __init__(self, **kwargs):
         self.dropdown = kivy.uix.dropdown.DropDown()
+        self.options_list = OptionsList()
+        self.dropdown.add_widget(self.options_list)
+        # Built once per options list, filtering only picks from them
+        self._rows: typing.List[dict] = []
+        self._lowercase_options: typing.List[str] = []
+        self._option_set: typing.Set[str] = set()
         super().__init__(**kwargs)
 
     def on_kv_post(self, _) -> None:
-        for option in self.options:
-            self.dropdown.add_widget(self.create_option_button(option))
-
         self.dropdown.bind(
             on_select=lambda _, selected_option: setattr(self, "text", selected_option)
         )
@@ -85,23 +97,26 @@ class OptionsBox(ValidatedInput):
             else self.dropdown.dismiss()
         )
 
+    def on_options(self, instance, options):
+        self._rows = [{"text": option, "options_box": self} for option in options]
+        self._lowercase_options = [option.lower() for option in options]
+        self._option_set = set(self._lowercase_options)
+        self.update_dropdown_options()
+
     def on_text(self, instance, pos):
         super().on_text(instance, pos)
         self.update_dropdown_options()
 
     def update_dropdown_options(self):
-        self.dropdown.clear_widgets()
-        for option in self.options:
-            if self.text in option:
-                self.dropdown.add_widget(self.create_option_button(option))
-
-    def create_option_button(self, option: str):
-        option_button = kivy.uix.button.Button(text=option, size_hint_y=None, height=44)
-        option_button.bind(on_release=lambda _: self.dropdown.select(option))
-        return option_button
+        query = self.text.lower()
+        self.options_list.data = [
+            row
+            for row, option in zip(self._rows, self._lowercase_options)
+            if query in option
+        ]
 
     def validate(self, text: str) -> bool:
-        return text.lower() in self.options
+        return text.lower() in self._option_set
 
     def get_value(self) -> str:
         return self.text
@@ -120,6 +135,7 @@ class FloatArgumentBox(ValidatedInput):
     min = kivy.properties.NumericProperty()
     max = kivy.properties.NumericProperty()
     step = kivy.properties.NumericProperty()
+    sweep = kivy.properties.BooleanProperty(False)
 
     def validate(self, text: str) -> bool:
         try:
@@ -143,3 +159,7 @@ class PresetButton(kivy.uix.boxlayout.BoxLayout):
 
 class NoticePopup(Popup):
     text = kivy.properties.StringProperty()
+
+
+class PlanPopup(Popup):
+    text = kivy.properties.StringProperty()
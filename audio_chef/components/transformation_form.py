@@ -4,6 +4,7 @@ from collections.abc import Callable
 from kivy.properties import ListProperty, ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
 
+from audio_chef.adapters.repository import PluginRepository
 from audio_chef.components.transformation_parameter_popup import TransformationParameterPopup
 from audio_chef.models.preset import Transformation
 from audio_chef.utils.functions import find_first
@@ -26,6 +27,12 @@ class TransformationForm(BoxLayout):
     def load(self):
         self.ids.spinner.text = self.selected_transformation_name or ""
 
+    def show(self, transform: Transformation) -> None:
+        """Show another transformation without building the form again."""
+        self.selected_transformation_name = transform.name
+        self.arg_values = transform.params
+        self.load()
+
     @property
     def index(self) -> int:
         self_index = self.parent.children.index(self)
@@ -37,17 +44,22 @@ class TransformationForm(BoxLayout):
                 self.available_transformations,
                 lambda t: t.name == self.selected_transformation_name,
             )
-            if transform.show_editor:
+            if self.selected_transformation_name in TRANSFORMATIONS:
+                arguments = TRANSFORMATIONS[self.selected_transformation_name].arguments
+            else:
+                arguments = PluginRepository.get_arguments(
+                    self.selected_transformation_name
+                )
+            if arguments or not transform.show_editor:
+                popup = TransformationParameterPopup.for_transformation(
+                    self.selected_transformation_name, arguments
+                )
+                popup.load(self.index, self.arg_values)
+                popup.open()
+            else:
+                # Only plugins without scanned parameters need their own editor
                 self.arg_values = transform.show_editor(self.arg_values)
                 self.update_func(self.index, self.arg_values)
-            else:
-                TransformationParameterPopup(
-                    self.index,
-                    self.selected_transformation_name,
-                    TRANSFORMATIONS[self.selected_transformation_name].arguments,
-                    self.arg_values,
-                    title=f"Edit {self.selected_transformation_name} parameters",
-                ).open()
         else:
             # TODO: Open a popup here to let the user know he must select a transformation first
             pass
@@ -7,31 +7,61 @@ from audio_chef.components.helper_classes import FloatArgumentBox, FileArgumentB
 
 
 class TransformationParameterPopup(kivy.uix.popup.Popup):
+    # One per transformation, only its values change between openings
+    _cache: typing.Dict[str, "TransformationParameterPopup"] = {}
+
     def __init__(
-        self,
-        index: int,
-        transformation_name: str,
-        arguments: typing.List[Argument],
-        params: dict,
-        **kwargs
+        self, transformation_name: str, arguments: typing.List[Argument], **kwargs
     ):
         super().__init__(**kwargs)
-        self.index = index
+        self.index = 0
+        self.arguments = arguments
         for arg in arguments:
             if arg.type is float:
                 self.ids.args_box.add_widget(
                     FloatArgumentBox(
                         transformation_name=transformation_name,
                         name=arg.name,
-                        initial=str(params.get(arg.name, arg.default)),
+                        initial=str(arg.default),
                     )
                 )
-            elif arg.type is str:
+            elif arg.type is str and not arg.options:
                 self.ids.args_box.add_widget(FileArgumentBox(name=arg.name))
             else:
                 self.ids.args_box.add_widget(
-                    OptionsBox(name=arg.name, options=arg.options, initial=params.get(arg.name, ''))
+                    OptionsBox(name=arg.name, options=arg.options)
                 )
 
+    @classmethod
+    def for_transformation(
+        cls, transformation_name: str, arguments: typing.List[Argument]
+    ) -> "TransformationParameterPopup":
+        """The transformation's popup, built again only if its arguments changed."""
+        popup = cls._cache.get(transformation_name)
+        if popup is None or popup.arguments != arguments:
+            popup = cls._cache[transformation_name] = cls(
+                transformation_name,
+                arguments,
+                title=f"Edit {transformation_name} parameters",
+            )
+        return popup
+
+    def load(self, index: int, params: dict) -> None:
+        self.index = index
+        defaults = {arg.name: arg.default for arg in self.arguments}
+        for box in self.ids.args_box.children:
+            if isinstance(box, FloatArgumentBox):
+                box.text = str(params.get(box.name, defaults[box.name]))
+                box.sweep = False
+            else:
+                box.text = str(params.get(box.name, ""))
+
     def get_arguments(self):
         return {arg.name: arg.get_value() for arg in self.ids.args_box.children}
+
+    def get_sweep_arguments(self) -> list[str]:
+        return [
+            arg.name
+            for arg in reversed(self.ids.args_box.children)
+            if isinstance(arg, FloatArgumentBox) and arg.sweep
+        ]
@@ -8,19 +8,65 @@ from audio_chef.models.preset import Transformation
 class TransformsBox(BoxLayout):
     available_transformations: list[Transformation] = ListProperty()
 
+    def __init__(self, **kwargs):
+        # The transformation each form shows, in order
+        self._shown: list[tuple[Transformation, TransformationForm]] = []
+        super().__init__(**kwargs)
+
     def load_state(self, transformations: list[Transformation]) -> None:
+        """Update the forms to show `transformations`, reusing what is there.
+
+        Transformations are matched to the forms that showed them by
+        identity, as the app replaces only those that change. Moved ones move
+        their form, the forms left are reused for edited ones, and only extra
+        transformations get a new form.
+        """
         if not self.ids.lock.selected:
             return
 
-        self.ids.transforms_box.clear_widgets()
+        forms_by_transform: dict[int, list[TransformationForm]] = {}
+        for transform, form in self._shown:
+            forms_by_transform.setdefault(id(transform), []).append(form)
+        forms: list[TransformationForm | None] = []
         for transform in transformations:
-            form = TransformationForm(
-                transform_name=transform.name,
-                params=transform.params,
+            same = forms_by_transform.get(id(transform))
+            forms.append(same.pop(0) if same else None)
+        matched = {id(form) for form in forms if form is not None}
+        leftovers = [form for _, form in self._shown if id(form) not in matched]
+        changed = []
+        for index in range(len(forms)):
+            if forms[index] is None and leftovers:
+                forms[index] = leftovers.pop(0)
+                changed.append(index)
+        new = [index for index, form in enumerate(forms) if form is None]
+        for index in new:
+            forms[index] = TransformationForm(
+                transform_name=transformations[index].name,
+                params=transformations[index].params,
                 available_transformations=self.available_transformations,
             )
-            self.ids.transforms_box.add_widget(form)
-            form.load()
+
+        box = self.ids.transforms_box
+        for form in leftovers:
+            box.remove_widget(form)
+        self._arrange(box, forms)
+        self._shown = list(zip(transformations, forms))
+        # Spinners report their form's index, so forms load once in place
+        for index in changed:
+            forms[index].show(transformations[index])
+        for index in new:
+            forms[index].load()
+
+    @staticmethod
+    def _arrange(box: BoxLayout, forms: list[TransformationForm]) -> None:
+        for position, form in enumerate(forms):
+            # Children are in reverse order
+            at = len(box.children) - 1 - position
+            if at >= 0 and box.children[at] is form:
+                continue
+            if form.parent:
+                box.remove_widget(form)
+            box.add_widget(form, index=len(box.children) - position)
 
     def load_available_tranformations(
         self, available_transformations: list[Transformation]
@@ -0,0 +1,86 @@
+"""Rendering a batch over several machines, without the GUI.
+
+    python -m audio_chef.distributed coordinator --preset-id 3 --host 0.0.0.0 FILE...
+    python -m audio_chef.distributed worker http://coordinator:8765
+
+Every machine must reach the inputs under the same paths, outputs are
+written next to them as in the app.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Kivy, imported with the adapters, would take the command line for itself
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+from audio_chef.adapters.coordinator import Coordinator, HEARTBEAT_TIMEOUT_S
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.render_worker import POLL_INTERVAL_S, RenderWorker
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.consts import FFMPEG_PATH
+from audio_chef.utils.audio_formats import load_audio_formats
+
+logger = logging.getLogger("audiochef")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="audio_chef.distributed")
+    parser.add_argument("--db", default="presets.db", help="the presets database")
+    roles = parser.add_subparsers(dest="role", required=True)
+
+    coordinator = roles.add_parser("coordinator", help="serve a batch to workers")
+    coordinator.add_argument("--preset-id", type=int, required=True)
+    coordinator.add_argument("--host", default="127.0.0.1")
+    coordinator.add_argument("--port", type=int, default=8765)
+    coordinator.add_argument(
+        "--heartbeat-timeout", type=float, default=HEARTBEAT_TIMEOUT_S
+    )
+    coordinator.add_argument("files", nargs="+")
+
+    worker = roles.add_parser("worker", help="render tasks of a coordinator")
+    worker.add_argument("url")
+    worker.add_argument("--id", help="defaults to one made from the host name")
+    worker.add_argument("--dsp-workers", type=int, default=os.cpu_count() or 1)
+    worker.add_argument("--dsp-processes", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s[%(process)d] %(levelname)s: %(message)s",
+    )
+    load_audio_formats(FFMPEG_PATH)
+    initialize_db(args.db)
+
+    if args.role == "coordinator":
+        coordinator = Coordinator.from_preset(
+            args.preset_id,
+            [os.path.abspath(filename) for filename in args.files],
+            host=args.host,
+            port=args.port,
+            heartbeat_timeout_s=args.heartbeat_timeout,
+        )
+        coordinator.start()
+        try:
+            report = coordinator.wait()
+            # Let polling workers hear that the batch is done
+            time.sleep(2 * POLL_INTERVAL_S)
+        finally:
+            coordinator.shutdown()
+        return 0 if report.success else 1
+
+    RenderWorker(
+        args.url,
+        args.id,
+        PipelineConfig(dsp_workers=args.dsp_workers, dsp_processes=args.dsp_processes),
+    ).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
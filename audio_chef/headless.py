@@ -0,0 +1,80 @@
+"""Running AudioChef without its window, taking jobs from other programs.
+
+    python -m audio_chef.headless --port 8766
+
+See adapters.job_api for the API, jobs use the presets saved in the app.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+# Kivy, imported with the adapters, would take the command line for itself
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+from audio_chef.adapters.job_api import DEFAULT_PORT, JobApi
+from audio_chef.adapters.jobs import BatchOptions, JobScheduler
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.adapters.worker_pool import WorkerPool
+from audio_chef.consts import FFMPEG_PATH
+from audio_chef.utils.audio_formats import load_audio_formats
+from audio_chef.utils.scratch import ScratchStorage
+
+logger = logging.getLogger("audiochef")
+
+IDLE_CHECK_INTERVAL_S = 5.0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="audio_chef.headless")
+    parser.add_argument("--db", default="presets.db", help="the presets database")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--dsp-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dsp-processes", action="store_true")
+    parser.add_argument("--analyze-outputs", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s[%(process)d] %(levelname)s: %(message)s",
+    )
+    load_audio_formats(FFMPEG_PATH)
+    initialize_db(args.db)
+    ScratchStorage.cleanup_orphans()
+
+    options = BatchOptions(
+        PipelineConfig(dsp_workers=args.dsp_workers, dsp_processes=args.dsp_processes),
+        analyze_outputs=args.analyze_outputs,
+    )
+    worker_pool = WorkerPool()
+    scheduler = JobScheduler(worker_pool, lambda: options)
+    scheduler.start()
+    api = JobApi(scheduler, port=args.port)
+    api.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        # Waiting in steps lets Ctrl-C through on every platform
+        while not stop.wait(IDLE_CHECK_INTERVAL_S):
+            worker_pool.shrink_if_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Stopping ...")
+        api.shutdown()
+        scheduler.shutdown()
+        worker_pool.shutdown()
+        ScratchStorage.end_run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,206 @@
+import array
+import enum
+import math
+import os
+import sys
+import typing
+
+from audio_chef.models.preset import NameChangeParameters
+from audio_chef.utils.audio_formats import (
+    AudioFile,
+    AudioFormatter,
+    SUPPORTED_AUDIO_FORMATS,
+)
+
+
+class FileStatus(enum.IntEnum):
+    ADDED = 0
+    RENDERED = 1
+    FAILED = 2
+
+
+class FileCatalog:
+    """The files added to the app, one row each, stored column by column.
+
+    Paths are split into an interned directory and a stem, so thousands of
+    files from one folder share its string. Probe metadata and statuses are
+    packed arrays, and rows are found by path through an index. `AudioFile`
+    handles, which decode and encode, are only made for files being rendered
+    and are not kept here.
+    """
+
+    def __init__(self, filenames: typing.Iterable[str] = ()):
+        self._rows: dict[str, int] = {}
+        self._filenames: list[str] = []
+        self._dirs: list[str] = []
+        self._stems: list[str] = []
+        self._exts: list[str] = []
+        self._destinations: list[str] = []
+        # Probe metadata, nan and 0 until probed
+        self._durations = array.array("d")
+        self._sample_rates = array.array("l")
+        self._channels = array.array("b")
+        self._statuses = bytearray()
+        self.add(filenames)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._rows
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._filenames)
+
+    @property
+    def filenames(self) -> list[str]:
+        return self._filenames[:]
+
+    def add(self, filenames: typing.Iterable[str]) -> list[str]:
+        """Append new files, returning those of an unsupported format."""
+        decoders = self._get_decoders()
+        unsupported = []
+        for filename in filenames:
+            if filename in self._rows:
+                continue
+            name, ext = os.path.splitext(filename)
+            ext = sys.intern(ext.strip("."))
+            if ext not in decoders:
+                unsupported.append(filename)
+                continue
+            directory, stem = os.path.split(name)
+            self._rows[filename] = len(self._filenames)
+            self._filenames.append(filename)
+            self._dirs.append(sys.intern(directory))
+            self._stems.append(stem)
+            self._exts.append(ext)
+            self._destinations.append(filename)
+            self._durations.append(math.nan)
+            self._sample_rates.append(0)
+            self._channels.append(0)
+            self._statuses.append(FileStatus.ADDED)
+        return unsupported
+
+    def remove(self, *filenames: str) -> None:
+        """Drop the files' rows, the rest are re-indexed once for all of them."""
+        removed = {self._rows.pop(filename) for filename in filenames}
+        if not removed:
+            return
+        kept = [row for row in range(len(self._filenames)) if row not in removed]
+        for column in self._columns():
+            values = [column[row] for row in kept]
+            if isinstance(column, array.array):
+                column[:] = array.array(column.typecode, values)
+            else:
+                column[:] = values
+        self._rows = {filename: row for row, filename in enumerate(self._filenames)}
+
+    def clear(self) -> None:
+        self._rows.clear()
+        for column in self._columns():
+            del column[:]
+
+    def rename(self, name_change_parameters: NameChangeParameters, ext: str) -> None:
+        """Name every output, with `ext` or the input's format when empty."""
+        new_stems = name_change_parameters.change_names(self._stems)
+        self._destinations = [
+            f"{os.path.join(directory, new_stem)}.{ext or source_ext}"
+            for directory, new_stem, source_ext in zip(
+                self._dirs, new_stems, self._exts
+            )
+        ]
+
+    def get_destination(self, filename: str) -> str:
+        return self._destinations[self._rows[filename]]
+
+    def destinations(self) -> list[str]:
+        return self._destinations[:]
+
+    def get_row(self, row: int) -> tuple[str, str, FileStatus]:
+        """The file, its destination and status at a position, for list views."""
+        return (
+            self._filenames[row],
+            self._destinations[row],
+            FileStatus(self._statuses[row]),
+        )
+
+    def get_decoder(self, filename: str) -> AudioFormatter:
+        return self._get_decoders()[self._exts[self._rows[filename]]]
+
+    def get_audio_file(self, filename: str) -> AudioFile:
+        """A new handle for rendering the file, to its current destination."""
+        row = self._rows[filename]
+        return self._make_audio_file(row, self._get_decoders())
+
+    def audio_files(self) -> list[AudioFile]:
+        """New handles for rendering every file, in the order they were added."""
+        decoders = self._get_decoders()
+        return [self._make_audio_file(row, decoders) for row in range(len(self))]
+
+    def get_probe(self, filename: str) -> tuple[float, int, int] | None:
+        """Duration, sample rate and channels, None until probed."""
+        row = self._rows[filename]
+        if math.isnan(self._durations[row]):
+            return None
+        return self._durations[row], self._sample_rates[row], self._channels[row]
+
+    def set_probe(
+        self, filename: str, duration_s: float, sample_rate: int, channels: int
+    ) -> None:
+        row = self._rows[filename]
+        self._durations[row] = duration_s
+        self._sample_rates[row] = sample_rate
+        self._channels[row] = channels
+
+    def copy(self) -> typing.Self:
+        """A snapshot, for reading off the UI thread while this one changes."""
+        catalog = type(self)()
+        for column, values in zip(catalog._columns(), self._columns()):
+            column[:] = values
+        catalog._rows = dict(self._rows)
+        return catalog
+
+    def update_probes(self, other: "FileCatalog") -> None:
+        """Keep what was probed in `other` for the files still here."""
+        for filename in other:
+            probe = other.get_probe(filename)
+            if probe is not None and filename in self._rows:
+                self.set_probe(filename, *probe)
+
+    def get_status(self, filename: str) -> FileStatus:
+        return FileStatus(self._statuses[self._rows[filename]])
+
+    def set_statuses(self, filenames: typing.Iterable[str], status: FileStatus) -> None:
+        for filename in filenames:
+            row = self._rows.get(filename)
+            if row is not None:
+                self._statuses[row] = status
+
+    def _make_audio_file(
+        self, row: int, decoders: dict[str, AudioFormatter]
+    ) -> AudioFile:
+        audio_file = AudioFile(self._filenames[row], decoders[self._exts[row]])
+        audio_file.update_destination_name_and_ext(self._destinations[row])
+        return audio_file
+
+    @staticmethod
+    def _get_decoders() -> dict[str, AudioFormatter]:
+        decoders: dict[str, AudioFormatter] = {}
+        for format_ in SUPPORTED_AUDIO_FORMATS:
+            if format_.can_decode:
+                # The first one, like AudioFile finds
+                decoders.setdefault(format_.ext, format_)
+        return decoders
+
+    def _columns(self) -> list[typing.MutableSequence]:
+        return [
+            self._filenames,
+            self._dirs,
+            self._stems,
+            self._exts,
+            self._destinations,
+            self._durations,
+            self._sample_rates,
+            self._channels,
+            self._statuses,
+        ]
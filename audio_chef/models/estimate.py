@@ -0,0 +1,85 @@
+import dataclasses
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} h {minutes} min"
+    if minutes:
+        return f"{minutes} min {seconds} s"
+    return f"{seconds} s"
+
+
+@dataclasses.dataclass(frozen=True)
+class FileEstimate:
+    filename: str
+    duration_s: float
+    # Serial seconds of each stage for this file, 0 for a duplicate input
+    decode_s: float
+    process_s: float
+    encode_s: float
+    outputs: list[str]
+    # False when the duration was guessed from the file size
+    probed: bool = True
+
+    @property
+    def cost_s(self) -> float:
+        return self.decode_s + self.process_s + self.encode_s
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchEstimate:
+    files: list[FileEstimate]
+    # Wall clock seconds, with the stages of the pipeline overlapping
+    total_s: float
+    peak_memory_bytes: int
+    scratch_bytes: int
+    output_bytes: int
+    # How many of the rates used came from measurements on this machine
+    measured_rates: int
+    total_rates: int
+
+    @property
+    def audio_s(self) -> float:
+        return sum(file.duration_s for file in self.files)
+
+    @property
+    def cost_s(self) -> float:
+        return sum(file.cost_s for file in self.files)
+
+    def summary(self) -> str:
+        lines = []
+        for file in self.files:
+            duration = format_duration(file.duration_s)
+            lines.append(
+                f"{file.filename} ({duration if file.probed else '~' + duration})"
+                f" -> {', '.join(file.outputs)}: {file.cost_s:.1f} s"
+            )
+        lines.extend(
+            [
+                "",
+                f"{len(self.files)} file(s), {format_duration(self.audio_s)} of audio",
+                f"Estimated time: {format_duration(self.total_s)}",
+                f"Peak memory: about {self.peak_memory_bytes / 2**20:.0f} MiB",
+                f"Scratch space: {self.scratch_bytes / 2**20:.0f} MiB, "
+                f"outputs: {self.output_bytes / 2**20:.0f} MiB",
+                f"Based on {self.measured_rates} of {self.total_rates} rate(s) "
+                f"measured on this machine",
+            ]
+        )
+        return "\n".join(lines)
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchProgress:
+    done_files: int
+    total_files: int
+    elapsed_s: float
+    eta_s: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.done_files}/{self.total_files} file(s), "
+            f"{format_duration(self.eta_s)} left"
+        )
@@ -0,0 +1,48 @@
+import dataclasses
+import enum
+
+from audio_chef.models.estimate import BatchProgress
+from audio_chef.models.preset import Preset
+from audio_chef.utils.audio_formats import AudioFile
+
+
+class JobStatus(enum.StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclasses.dataclass
+class Job:
+    """Files to render with a preset, from the app or another program."""
+
+    id: str
+    # None for tasks, which bring their own presets
+    preset: Preset | None
+    files: list[AudioFile]
+    # "app", or "api" for jobs submitted by other programs
+    source: str
+    # "batch", or what a task does, e.g. "compare"
+    kind: str = "batch"
+    status: JobStatus = JobStatus.QUEUED
+    progress: BatchProgress | None = None
+    failed_files: list[str] = dataclasses.field(default_factory=list)
+    summary: str = ""
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "source": self.source,
+            "kind": self.kind,
+            "status": self.status.value,
+            "files": [audio_file.filename for audio_file in self.files],
+            "outputs": [audio_file.destination_filename for audio_file in self.files],
+            "progress": dataclasses.asdict(self.progress) if self.progress else None,
+            "failed_files": self.failed_files,
+            "summary": self.summary,
+        }
@@ -5,3 +5,45 @@ import dataclasses
 class Plugin:
     path: str
     params: dict
+
+
+@dataclasses.dataclass(frozen=True)
+class PluginParameter:
+    name: str
+    # "float", "bool" or "str", str parameters only take one of `options`
+    type: str
+    default: float | bool | str
+    min: float | None = None
+    max: float | None = None
+    step: float | None = None
+    options: list[str] | None = None
+
+    def coerce(self, value: object) -> float | bool | str:
+        """Convert a value as typed in the UI to what the plugin expects."""
+        if self.type == "float":
+            return float(value)  # type: ignore[arg-type]
+        if self.type == "bool":
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+        return str(value)
+
+
+@dataclasses.dataclass(frozen=True)
+class PluginMetadata:
+    """Everything known about a plugin without loading it again."""
+
+    name: str
+    path: str
+    vendor: str
+    parameters: list[PluginParameter]
+    latency_samples: int
+    # Channel counts the plugin processed when probed
+    layouts: list[int]
+    # Of the newest file in the bundle, a different one means a rescan
+    mtime: float
+
+    def coerce_params(self, params: dict) -> dict:
+        parameters = {parameter.name: parameter for parameter in self.parameters}
+        return {
+            name: parameters[name].coerce(value) if name in parameters else value
+            for name, value in params.items()
+        }
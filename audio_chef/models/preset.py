@@ -1,5 +1,6 @@
 import dataclasses
 import enum
+import os
 import typing
 from datetime import datetime
 
@@ -24,15 +25,22 @@ class NameChangeParameters:
     replace_to_input: str
 
     def change_name(self, old_name: str) -> str:
+        return self.change_names([old_name])[0]
+
+    def change_names(self, old_names: list[str]) -> list[str]:
+        """Rename in bulk, every name gets the same $date."""
         if self.mode == NameChangeMode.WILDCARDS:
-            new_name = self.wildcards_input
-            new_name = new_name.replace("$item", old_name)
-            new_name = new_name.replace("$date", str(datetime.today()))
-            return new_name
+            template = self.wildcards_input.replace("$date", str(datetime.today()))
+            if "$item" not in template:
+                return [template] * len(old_names)
+            return [template.replace("$item", old_name) for old_name in old_names]
         else:
             if self.replace_from_input == "":
-                return old_name
-            return old_name.replace(self.replace_from_input, self.replace_to_input)
+                return list(old_names)
+            return [
+                old_name.replace(self.replace_from_input, self.replace_to_input)
+                for old_name in old_names
+            ]
 
 
 @dataclasses.dataclass(frozen=True)
@@ -40,6 +48,23 @@ class Preset:
     ext: str
     transformations: list[Transformation]
     name_change_parameters: NameChangeParameters
+    # Formats rendered alongside `ext` from the same processed audio
+    additional_exts: list[str] = dataclasses.field(default_factory=list)
+    # Keyword arguments for the encoder of each format, e.g. {"mp3": {"bitrate": "320k"}}
+    encoder_settings: dict[str, dict] = dataclasses.field(default_factory=dict)
+    # Outputs are converted to this rate, None keeps the source's rate
+    target_sample_rate: int | None = None
+
+    @property
+    def output_exts(self) -> list[str]:
+        return list(dict.fromkeys([self.ext, *self.additional_exts]))
+
+    def get_output_filename(self, filename: str) -> str:
+        """Like the file list names outputs, in the input's directory."""
+        name, ext = os.path.splitext(filename)
+        path, base = os.path.split(name)
+        new_name = self.name_change_parameters.change_name(base)
+        return os.path.join(path, new_name) + "." + (self.ext or ext[1:])
 
     @classmethod
     def replace_transform_at(
@@ -0,0 +1,86 @@
+import dataclasses
+
+from audio_chef.utils.analysis import AudioStats
+
+
+@dataclasses.dataclass
+class BatchReport:
+    success: bool = True
+    rendered_files: int = 0
+    encoded_files: int = 0
+    materialized_files: int = 0
+    saved_bytes: int = 0
+    max_queue_depths: dict[str, int] = dataclasses.field(default_factory=dict)
+    output_stats: dict[str, AudioStats] = dataclasses.field(default_factory=dict)
+    failed_files: list[str] = dataclasses.field(default_factory=list)
+    # Seconds of audio run through the chains, how much of it was silence that
+    # bypassed them, and how long the processing took
+    processed_audio_s: float = 0.0
+    skipped_silence_s: float = 0.0
+    processing_s: float = 0.0
+
+    @property
+    def saved_processing_s(self) -> float:
+        """Estimated from the processing speed over the audio that was not skipped."""
+        rendered_audio_s = self.processed_audio_s - self.skipped_silence_s
+        if rendered_audio_s <= 0:
+            return 0.0
+        return self.skipped_silence_s * self.processing_s / rendered_audio_s
+
+    def merge(self, other: "BatchReport") -> None:
+        """Add another part of the same batch, e.g. one rendered elsewhere."""
+        self.success = self.success and other.success
+        for field in [
+            "rendered_files",
+            "encoded_files",
+            "materialized_files",
+            "saved_bytes",
+            "processed_audio_s",
+            "skipped_silence_s",
+            "processing_s",
+        ]:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        for stage, depth in other.max_queue_depths.items():
+            self.max_queue_depths[stage] = max(
+                self.max_queue_depths.get(stage, 0), depth
+            )
+        self.output_stats.update(other.output_stats)
+        self.failed_files.extend(other.failed_files)
+
+    def to_dict(self) -> dict:
+        """Everything but the output stats, as plain json types."""
+        data = dataclasses.asdict(self)
+        del data["output_stats"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchReport":
+        return cls(**data)
+
+    def summary(self) -> str:
+        lines = [
+            f"Rendered {self.rendered_files} file(s) into {self.encoded_files} output(s)"
+        ]
+        if self.materialized_files:
+            lines.append(
+                f"Copied {self.materialized_files} duplicate output(s) instead of "
+                f"rendering them, skipping {self.saved_bytes / 2**20:.1f} MiB of input"
+            )
+        if self.skipped_silence_s:
+            lines.append(
+                f"Skipped {self.skipped_silence_s:.1f} s of silence out of "
+                f"{self.processed_audio_s:.1f} s, saving about "
+                f"{self.saved_processing_s:.1f} s of processing"
+            )
+        if self.failed_files:
+            lines.append(
+                f"{len(self.failed_files)} file(s) failed: {', '.join(self.failed_files)}"
+            )
+        clipped = [
+            output
+            for output, stats in self.output_stats.items()
+            if stats.clipped_samples
+        ]
+        if clipped:
+            lines.append(f"{len(clipped)} output(s) clip: {', '.join(clipped)}")
+        return "\n".join(lines)
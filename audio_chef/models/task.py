@@ -0,0 +1,66 @@
+import dataclasses
+
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Preset,
+    Transformation,
+)
+
+
+def preset_to_dict(preset: Preset) -> dict:
+    return {
+        "ext": preset.ext,
+        "transformations": [
+            {"name": transform.name, "params": transform.params}
+            for transform in preset.transformations
+        ],
+        "name_change_parameters": dataclasses.asdict(preset.name_change_parameters),
+        "additional_exts": preset.additional_exts,
+        "encoder_settings": preset.encoder_settings,
+        "target_sample_rate": preset.target_sample_rate,
+    }
+
+
+def preset_from_dict(data: dict) -> Preset:
+    name_change = data["name_change_parameters"]
+    return Preset(
+        ext=data["ext"],
+        transformations=[
+            Transformation(name=transform["name"], params=transform["params"])
+            for transform in data["transformations"]
+        ],
+        name_change_parameters=NameChangeParameters(
+            mode=NameChangeMode(name_change["mode"]),
+            wildcards_input=name_change["wildcards_input"],
+            replace_from_input=name_change["replace_from_input"],
+            replace_to_input=name_change["replace_to_input"],
+        ),
+        additional_exts=data["additional_exts"],
+        encoder_settings=data["encoder_settings"],
+        target_sample_rate=data["target_sample_rate"],
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderTask:
+    """Inputs rendered together by one worker, the first one and its duplicates."""
+
+    id: str
+    filenames: list[str]
+    preset: Preset
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "filenames": self.filenames,
+            "preset": preset_to_dict(self.preset),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RenderTask":
+        return cls(
+            id=data["id"],
+            filenames=data["filenames"],
+            preset=preset_from_dict(data["preset"]),
+        )
@@ -0,0 +1,189 @@
+import dataclasses
+import math
+
+import numpy
+
+from audio_chef.utils.audio_formats import AudioData, as_frames_by_channels
+from audio_chef.utils.resampling import iter_resampled
+
+SILENCE_DB = -math.inf
+
+# ITU-R BS.1770 K-weighting, as an analog prototype so it works at any rate
+_SHELF_GAIN_DB = 3.999843853973347
+_SHELF_FREQUENCY_HZ = 1681.974450955533
+_SHELF_Q = 0.7071752369554196
+_HIGHPASS_FREQUENCY_HZ = 38.13547087602444
+_HIGHPASS_Q = 0.5003270373238773
+_IMPULSE_RESPONSE_LENGTH = 2**14
+_BLOCK_SIZE = 2**16
+
+_GATE_HOP_S = 0.1
+_GATE_BLOCK_HOPS = 4
+_ABSOLUTE_GATE_LUFS = -70.0
+_RELATIVE_GATE_LU = -10.0
+# BS.1770 weights by channel count, in the usual L, R, C, (LFE,) Ls, Rs order:
+# surround channels count more and the LFE is left out. Others weigh 1.0.
+_CHANNEL_WEIGHTS = {
+    5: (1.0, 1.0, 1.0, 1.41, 1.41),
+    6: (1.0, 1.0, 1.0, 0.0, 1.41, 1.41),
+}
+
+
+# Float samples at or beyond full scale clip once encoded to a fixed point format
+CLIPPING_LEVEL = 1.0
+TRUE_PEAK_OVERSAMPLING = 4
+
+
+@dataclasses.dataclass(frozen=True)
+class AudioStats:
+    peak_db: float
+    rms_db: float
+    loudness_lufs: float
+    true_peak_db: float | None = None
+    clipped_samples: int | None = None
+
+    def to_dict(self) -> dict:
+        # JSON has no infinity, silence is written as null
+        return {
+            key: None if isinstance(value, float) and math.isinf(value) else value
+            for key, value in dataclasses.asdict(self).items()
+        }
+
+
+def to_db(value: float) -> float:
+    return 20 * math.log10(value) if value > 0 else SILENCE_DB
+
+
+def peak(audio: AudioData) -> float:
+    return float(numpy.max(numpy.abs(audio))) if audio.size else 0.0
+
+
+def rms(audio: AudioData) -> float:
+    return float(numpy.sqrt(numpy.mean(numpy.square(audio)))) if audio.size else 0.0
+
+
+def true_peak(audio: AudioData, sample_rate: int) -> float:
+    """Peak of the reconstructed waveform, estimated by 4x oversampling."""
+    if not audio.size:
+        return 0.0
+    return max(
+        peak(audio),
+        *(
+            peak(block)
+            for block in iter_resampled(
+                audio, sample_rate, sample_rate * TRUE_PEAK_OVERSAMPLING
+            )
+        ),
+    )
+
+
+def clipped_samples(audio: AudioData) -> int:
+    return int(numpy.count_nonzero(numpy.abs(audio) >= CLIPPING_LEVEL))
+
+
+def analyze(audio: AudioData, sample_rate: int, full: bool = False) -> AudioStats:
+    """Level statistics, `full` adds the costlier true peak and clip count."""
+    return AudioStats(
+        peak_db=to_db(peak(audio)),
+        rms_db=to_db(rms(audio)),
+        loudness_lufs=integrated_loudness(audio, sample_rate),
+        true_peak_db=to_db(true_peak(audio, sample_rate)) if full else None,
+        clipped_samples=clipped_samples(audio) if full else None,
+    )
+
+
+def integrated_loudness(audio: AudioData, sample_rate: int) -> float:
+    """Gated integrated loudness in LUFS, as defined by ITU-R BS.1770-4."""
+    hop_power = _k_weighted_hop_power(as_frames_by_channels(audio), sample_rate)
+    if len(hop_power) < _GATE_BLOCK_HOPS:
+        return SILENCE_DB
+
+    # 400 ms blocks overlapping by 75% are the mean of four 100 ms hops
+    cumulative = numpy.cumsum(
+        numpy.vstack([numpy.zeros(hop_power.shape[1]), hop_power]), axis=0
+    )
+    block_power = (
+        cumulative[_GATE_BLOCK_HOPS:] - cumulative[:-_GATE_BLOCK_HOPS]
+    ) / _GATE_BLOCK_HOPS
+    channels = block_power.shape[1]
+    weights = numpy.array(_CHANNEL_WEIGHTS.get(channels, (1.0,) * channels))
+    weighted_power = block_power @ weights
+
+    with numpy.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10 * numpy.log10(weighted_power)
+    gated = block_loudness > _ABSOLUTE_GATE_LUFS
+    if not gated.any():
+        return SILENCE_DB
+
+    relative_gate = _power_to_lufs(weighted_power[gated].mean()) + _RELATIVE_GATE_LU
+    gated &= block_loudness > relative_gate
+    return _power_to_lufs(weighted_power[gated].mean())
+
+
+def _power_to_lufs(power: float) -> float:
+    return -0.691 + 10 * math.log10(power) if power > 0 else SILENCE_DB
+
+
+def _k_weighted_hop_power(audio: numpy.ndarray, sample_rate: int) -> numpy.ndarray:
+    """Mean square of the K-weighted signal over every 100 ms hop, per channel."""
+    hop = int(round(sample_rate * _GATE_HOP_S))
+    hops = len(audio) // hop
+    if hops == 0:
+        return numpy.zeros((0, audio.shape[1]))
+
+    impulse_response = _k_weighting_impulse_response(sample_rate)
+    squared = numpy.square(_convolve(audio[: hops * hop], impulse_response))
+    return squared.reshape(hops, hop, audio.shape[1]).mean(axis=1)
+
+
+def _convolve(audio: numpy.ndarray, impulse_response: numpy.ndarray) -> numpy.ndarray:
+    # Overlap-add in blocks, so hour long files don't need one huge FFT
+    fft_size = 1 << (_BLOCK_SIZE + len(impulse_response) - 2).bit_length()
+    ir_spectrum = numpy.fft.rfft(impulse_response, fft_size)[:, numpy.newaxis]
+    res = numpy.zeros((len(audio) + fft_size, audio.shape[1]))
+    for start in range(0, len(audio), _BLOCK_SIZE):
+        block = audio[start : start + _BLOCK_SIZE]
+        spectrum = numpy.fft.rfft(block, fft_size, axis=0) * ir_spectrum
+        res[start : start + fft_size] += numpy.fft.irfft(spectrum, fft_size, axis=0)
+    return res[: len(audio)]
+
+
+def _k_weighting_impulse_response(sample_rate: int) -> numpy.ndarray:
+    # The filters decay within a few ms, so sampling their frequency response
+    # on a fine grid gives the impulse response without running the recursion
+    z = numpy.exp(-1j * numpy.linspace(0, numpy.pi, _IMPULSE_RESPONSE_LENGTH // 2 + 1))
+    response = _biquad_response(_high_shelf(sample_rate), z) * _biquad_response(
+        _highpass(sample_rate), z
+    )
+    return numpy.fft.irfft(response, _IMPULSE_RESPONSE_LENGTH)
+
+
+def _biquad_response(coefficients: tuple, z: numpy.ndarray) -> numpy.ndarray:
+    (b0, b1, b2), (a0, a1, a2) = coefficients
+    return (b0 + b1 * z + b2 * z**2) / (a0 + a1 * z + a2 * z**2)
+
+
+def _high_shelf(sample_rate: int) -> tuple:
+    # Bilinear design from libebur128, which reproduces the coefficients the
+    # standard lists for 48 kHz
+    k = math.tan(math.pi * _SHELF_FREQUENCY_HZ / sample_rate)
+    vh = 10 ** (_SHELF_GAIN_DB / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / _SHELF_Q + k * k
+    return (
+        (
+            (vh + vb * k / _SHELF_Q + k * k) / a0,
+            2 * (k * k - vh) / a0,
+            (vh - vb * k / _SHELF_Q + k * k) / a0,
+        ),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / _SHELF_Q + k * k) / a0),
+    )
+
+
+def _highpass(sample_rate: int) -> tuple:
+    k = math.tan(math.pi * _HIGHPASS_FREQUENCY_HZ / sample_rate)
+    a0 = 1 + k / _HIGHPASS_Q + k * k
+    return (
+        (1.0, -2.0, 1.0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / _HIGHPASS_Q + k * k) / a0),
+    )
@@ -8,6 +8,10 @@ import typing
 import numpy.typing
 import soundfile  # type: ignore
 
+from audio_chef.utils.fingerprint import quick_fingerprint
+from audio_chef.utils.scratch import ScratchStorage
+from audio_chef.utils.shared_audio import SharedAudioBuffer
+
 SUPPORTED_AUDIO_FORMATS: typing.List["AudioFormatter"] = []
 
 logger = logging.getLogger("audiochef")
@@ -15,6 +19,10 @@ logger = logging.getLogger("audiochef")
 AudioData = numpy.typing.NDArray
 
 
+def as_frames_by_channels(audio: AudioData) -> AudioData:
+    return audio[:, numpy.newaxis] if audio.ndim == 1 else audio
+
+
 class AudioFormatter:
     def __init__(self, can_encode: bool, can_decode: bool, ext: str, description: str):
         self.can_encode = can_encode
@@ -22,10 +30,18 @@ class AudioFormatter:
         self.ext = ext
         self.description = description
 
-    def decode(self, input_file: str, output_file: str) -> None:
+    def decode(
+        self,
+        input_file: str,
+        output_file: str,
+        start_second: float | None = None,
+        duration: float | None = None,
+    ) -> None:
         raise NotImplementedError()
 
-    def encode(self, input_file: str, output_file: str) -> None:
+    def encode(
+        self, input_file: str, output_file: str, settings: dict | None = None
+    ) -> None:
         raise NotImplementedError()
 
     def __repr__(self) -> str:
@@ -33,19 +49,34 @@ class AudioFormatter:
 
 
 class FFMPEGAudioFormatter(AudioFormatter):
-    def decode(self, input_file: str, output_file: str) -> None:
+    def decode(
+        self,
+        input_file: str,
+        output_file: str,
+        start_second: float | None = None,
+        duration: float | None = None,
+    ) -> None:
         logger.info(f"Reading from file {input_file}")
         import pydub  # type: ignore
 
-        given_audio = pydub.AudioSegment.from_file(input_file, format=self.ext)
+        # pydub passes these to ffmpeg as -ss/-t, so only the window is decoded
+        given_audio = pydub.AudioSegment.from_file(
+            input_file,
+            format=self.ext,
+            start_second=start_second,
+            duration=duration,
+        )
         given_audio.export(output_file, format="wav")
 
-    def encode(self, input_file: str, output_file: str) -> None:
+    def encode(
+        self, input_file: str, output_file: str, settings: dict | None = None
+    ) -> None:
         import pydub
 
         given_audio = pydub.AudioSegment.from_file(input_file, format="wav")
         logger.info(f"Writing file {output_file}")
-        given_audio.export(output_file, format=self.ext)
+        # settings are passed to pydub's export, e.g. bitrate, codec or parameters
+        given_audio.export(output_file, format=self.ext, **(settings or {}))
 
 
 class NoCompatibleAudioFormatException(Exception):
@@ -53,24 +84,36 @@ class NoCompatibleAudioFormatException(Exception):
 
 
 class AudioFile:
-    def __init__(self, filename: str) -> None:
+    # Batches hold one per input, they are kept small
+    __slots__ = (
+        "filename",
+        "source_audio_format",
+        "internal_file",
+        "destination_name",
+        "destination_ext",
+        "_fingerprint",
+    )
+
+    def __init__(
+        self, filename: str, audio_format: AudioFormatter | None = None
+    ) -> None:
         self.filename = filename
-        name, ext = os.path.splitext(filename)
-        self.source_name = name
-        self.source_ext = ext.strip(".")
-        try:
-            self.source_audio_format = next(
-                format_
-                for format_ in SUPPORTED_AUDIO_FORMATS
-                if format_.can_decode and format_.ext == self.source_ext
-            )
-        except StopIteration:
-            raise NoCompatibleAudioFormatException(
-                f"New supported audio format found for '{filename}'!"
-            )
+        if audio_format is None:
+            try:
+                audio_format = next(
+                    format_
+                    for format_ in SUPPORTED_AUDIO_FORMATS
+                    if format_.can_decode and format_.ext == self.source_ext
+                )
+            except StopIteration:
+                raise NoCompatibleAudioFormatException(
+                    f"New supported audio format found for '{filename}'!"
+                )
+        self.source_audio_format = audio_format
         self.internal_file: typing.Union[str, None] = None
         self.destination_name = self.source_name
         self.destination_ext = self.source_ext
+        self._fingerprint: typing.Union[str, None] = None
 
     def __eq__(self, other: typing.Any) -> bool:
         if not isinstance(other, AudioFile):
@@ -78,6 +121,26 @@ class AudioFile:
 
         return self.filename == other.filename
 
+    @property
+    def source_name(self) -> str:
+        return os.path.splitext(self.filename)[0]
+
+    @property
+    def source_ext(self) -> str:
+        return os.path.splitext(self.filename)[1].strip(".")
+
+    @property
+    def destination_filename(self) -> str:
+        return self.get_destination_filename(self.destination_ext)
+
+    def get_destination_filename(self, ext: str, suffix: str = "") -> str:
+        return f"{self.destination_name}{suffix}.{ext}"
+
+    def get_fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = quick_fingerprint(self.filename)
+        return self._fingerprint
+
     def get_audio_data(
         self,
     ) -> typing.Tuple[AudioData, int]:
@@ -85,21 +148,46 @@ class AudioFile:
             self.create_internal_file()
         return soundfile.read(self.internal_file)
 
-    @staticmethod
-    def get_internal_file_path(name: str) -> str:
-        return os.path.join(os.getcwd(), ".audiochef", name + ".wav")
-
-    def create_internal_file(self) -> None:
+    def get_audio_window(
+        self, start_second: float, duration: float
+    ) -> typing.Tuple[AudioData, int]:
+        """Decode only part of the file."""
         _, name = os.path.split(self.source_name)
-        self.internal_file = self.get_internal_file_path(name)
-        internal_dir = os.path.split(self.internal_file)[0]
-        if not os.path.exists(internal_dir):
-            os.mkdir(internal_dir)
+        window_file = ScratchStorage.new_path(
+            f"{name}-window-{start_second:g}-{duration:g}"
+        )
+        try:
+            self.source_audio_format.decode(
+                self.filename, window_file, start_second, duration
+            )
+            return soundfile.read(window_file)
+        finally:
+            ScratchStorage.remove(window_file)
 
-        if os.path.exists(self.internal_file):
-            os.remove(self.internal_file)
+    def get_shared_audio_data(self) -> SharedAudioBuffer:
+        """Decode straight into shared memory so worker processes can map it."""
+        if self.internal_file is None:
+            self.create_internal_file()
+        with soundfile.SoundFile(self.internal_file) as f:
+            shape = (f.frames, f.channels) if f.channels > 1 else (f.frames,)
+            buffer = SharedAudioBuffer.create(shape, "float64", f.samplerate)
+            f.read(out=buffer.array)
+        return buffer
 
-        self.source_audio_format.decode(self.filename, self.internal_file)
+    def create_internal_file(self) -> None:
+        _, name = os.path.split(self.source_name)
+        # Decoded audio is at least as large as the encoded source
+        ScratchStorage.reserve(os.path.getsize(self.filename))
+        internal_file = ScratchStorage.new_path(name)
+        self.source_audio_format.decode(self.filename, internal_file)
+        ScratchStorage.register(internal_file)
+        self.internal_file = internal_file
+
+    def release_internal_file(self) -> None:
+        """Free the decode's scratch space once its audio is in memory."""
+        if self.internal_file is not None:
+            ScratchStorage.remove(self.internal_file)
+            self.internal_file = None
 
     def update_destination_name_and_ext(self, new_filename: str) -> None:
         logger.debug(
@@ -109,22 +197,51 @@ class AudioFile:
         self.destination_ext = self.destination_ext.strip(".")
 
     def write_output_file(self, data: AudioData, sample_rate: int):
+        render_file = self.write_render_file(data, sample_rate)
+        try:
+            self.encode_output_file(self.destination_ext, internal_file=render_file)
+        finally:
+            ScratchStorage.remove(render_file)
+
+    def write_render_file(
+        self, data: AudioData, sample_rate: int, suffix: str = ""
+    ) -> str:
+        """Write a render to a scratch file of its own, returning its path.
+
+        The internal file stays the decoded source, so later renders of the
+        same file start from it again. The caller removes the render file.
+        """
+        _, name = os.path.split(self.source_name)
+        render_file = ScratchStorage.new_path(f"{name}-render{suffix}")
+        # Written as 16 bit PCM
+        ScratchStorage.reserve(data.size * 2)
         with soundfile.SoundFile(
-            self.internal_file,
+            render_file,
             "w",
             samplerate=sample_rate,
-            channels=len(data.shape),
+            channels=1 if data.ndim == 1 else data.shape[1],
         ) as f:
             f.write(data)
+        ScratchStorage.register(render_file)
+        return render_file
 
+    def encode_output_file(
+        self,
+        ext: str,
+        settings: dict | None = None,
+        suffix: str = "",
+        internal_file: str | None = None,
+    ) -> None:
+        """Encode a render file, so several formats can share one render."""
         output_format = next(
             format_
             for format_ in SUPPORTED_AUDIO_FORMATS
-            if format_.can_encode and format_.ext == self.destination_ext
+            if format_.can_encode and format_.ext == ext
         )
         output_format.encode(
-            self.internal_file,
-            f"{self.destination_name}.{self.destination_ext}",
+            internal_file or self.internal_file,
+            self.get_destination_filename(ext, suffix),
+            settings,
         )
 
 
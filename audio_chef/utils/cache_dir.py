@@ -0,0 +1,34 @@
+"""Where peaks and measurements are kept between runs, one directory per user.
+
+The directory is passed on in the environment, so spawned worker processes
+use the one the app was configured with.
+"""
+
+import os
+import sys
+
+CACHE_DIR_ENV = "AUDIOCHEF_CACHE_DIR"
+
+
+def default_cache_dir() -> str:
+    if sys.platform == "win32":
+        local_app_data = os.environ.get("LOCALAPPDATA") or os.path.expanduser(
+            os.path.join("~", "AppData", "Local")
+        )
+        return os.path.join(local_app_data, "AudioChef", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/AudioChef")
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "audiochef")
+
+
+def configure_cache_dir(directory: str | None) -> None:
+    """Use `directory`, or the default when None or empty."""
+    if directory:
+        os.environ[CACHE_DIR_ENV] = os.path.abspath(directory)
+    else:
+        os.environ.pop(CACHE_DIR_ENV, None)
+
+
+def get_cache_path(*parts: str) -> str:
+    return os.path.join(os.environ.get(CACHE_DIR_ENV) or default_cache_dir(), *parts)
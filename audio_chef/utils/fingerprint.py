@@ -0,0 +1,33 @@
+import hashlib
+import os
+
+SAMPLE_BLOCK_SIZE = 64 * 1024
+SAMPLE_BLOCK_COUNT = 8
+FULL_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def quick_fingerprint(filename: str) -> str:
+    """Hash the file size together with a handful of evenly spaced blocks.
+
+    Cheap enough to run on every input of a batch, but two different files can
+    collide, so matches must be confirmed with `full_fingerprint`.
+    """
+    size = os.path.getsize(filename)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(filename, "rb") as f:
+        if size <= SAMPLE_BLOCK_SIZE * SAMPLE_BLOCK_COUNT:
+            digest.update(f.read())
+        else:
+            last_offset = size - SAMPLE_BLOCK_SIZE
+            for block_index in range(SAMPLE_BLOCK_COUNT):
+                f.seek(last_offset * block_index // (SAMPLE_BLOCK_COUNT - 1))
+                digest.update(f.read(SAMPLE_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def full_fingerprint(filename: str) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(filename, "rb") as f:
+        while chunk := f.read(FULL_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
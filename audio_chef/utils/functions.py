@@ -1,7 +1,16 @@
+import shutil
 import typing
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 T = typing.TypeVar("T")
 
+# From linux/fs.h, lets a copy-on-write filesystem (btrfs, xfs) share extents
+FICLONE = 0x40049409
+
 
 def find_first(
     iterable: typing.Iterable[T], match_func: typing.Callable[[T], bool]
@@ -11,3 +20,16 @@ def find_first(
             return item
 
     return None
+
+
+def clone_file(source: str, destination: str) -> None:
+    """Copy a file, using a reflink when the filesystem supports one."""
+    if fcntl is not None:
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+
+    shutil.copyfile(source, destination)
@@ -0,0 +1,75 @@
+"""Cheap utility transformations as vectorized numpy kernels.
+
+Kernels take (audio, sample_rate, **params) and return the result. Those
+marked in place write into the given buffer, the rest return a view or a new
+buffer. Audio is either (frames,) or (frames, channels).
+"""
+
+import math
+
+import numpy
+
+from audio_chef.utils.audio_formats import AudioData, as_frames_by_channels
+
+
+def downmix_to_mono(audio: AudioData, sample_rate: int) -> AudioData:
+    if audio.ndim == 1:
+        return audio
+    return audio.mean(axis=1, dtype=audio.dtype)
+
+
+def select_channel(audio: AudioData, sample_rate: int, channel: float) -> AudioData:
+    if audio.ndim == 1:
+        return audio
+    return audio[:, min(int(channel), audio.shape[1] - 1)]
+
+
+def swap_channels(audio: AudioData, sample_rate: int) -> AudioData:
+    if audio.ndim == 1 or audio.shape[1] < 2:
+        return audio
+    # A one channel temporary instead of a copy of both
+    left = audio[:, 0].copy()
+    audio[:, 0] = audio[:, 1]
+    audio[:, 1] = left
+    return audio
+
+
+def fade(
+    audio: AudioData, sample_rate: int, fade_in_s: float, fade_out_s: float
+) -> AudioData:
+    frames = as_frames_by_channels(audio)
+    fade_in = min(int(fade_in_s * sample_rate), len(frames))
+    fade_out = min(int(fade_out_s * sample_rate), len(frames))
+    if fade_in:
+        frames[:fade_in] *= numpy.linspace(0, 1, fade_in, dtype=audio.dtype)[:, None]
+    if fade_out:
+        frames[len(frames) - fade_out :] *= numpy.linspace(
+            1, 0, fade_out, dtype=audio.dtype
+        )[:, None]
+    return audio
+
+
+def remove_dc_offset(audio: AudioData, sample_rate: int) -> AudioData:
+    audio -= audio.mean(axis=0, dtype=audio.dtype)
+    return audio
+
+
+def trim(
+    audio: AudioData, sample_rate: int, start_s: float, duration_s: float
+) -> AudioData:
+    """Keep `duration_s` seconds from `start_s`, or all of the rest for 0."""
+    start = int(start_s * sample_rate)
+    end = start + int(duration_s * sample_rate) if duration_s else None
+    return audio[start:end]
+
+
+def invert_polarity(audio: AudioData, sample_rate: int) -> AudioData:
+    return numpy.negative(audio, out=audio)
+
+
+def normalize_peak(audio: AudioData, sample_rate: int, peak_db: float) -> AudioData:
+    # Two reductions rather than a temporary absolute copy of the audio
+    current_peak = max(audio.max(initial=0.0), -audio.min(initial=0.0))
+    if current_peak > 0:
+        audio *= audio.dtype.type(math.pow(10, peak_db / 20) / current_peak)
+    return audio
@@ -0,0 +1,117 @@
+import dataclasses
+import typing
+
+import numpy
+
+from audio_chef.utils.audio_formats import AudioData, as_frames_by_channels
+
+# Samples summarized by one bucket at each zoom level, finest first. Every
+# level must be a multiple of the previous one.
+LEVEL_BLOCK_SIZES = (256, 1024, 4096, 16384, 65536)
+
+
+@dataclasses.dataclass(frozen=True)
+class PeakLevel:
+    block_size: int
+    minimum: numpy.ndarray
+    maximum: numpy.ndarray
+    rms: numpy.ndarray
+
+
+@dataclasses.dataclass(frozen=True)
+class PeakPyramid:
+    """Min/max/RMS summaries of a file at several zoom levels.
+
+    Stored as float16, a pyramid is roughly 1/100th of the 16 bit audio, and
+    waveforms of any width are drawn from it without reading the audio again.
+    """
+
+    sample_rate: int
+    frames: int
+    levels: list[PeakLevel]
+
+    @classmethod
+    def build(cls, audio: AudioData, sample_rate: int) -> typing.Self:
+        frames = as_frames_by_channels(audio)
+        finest = LEVEL_BLOCK_SIZES[0]
+        channels = frames.shape[1]
+        full = len(frames) // finest
+        # Full blocks are reduced in place, the tail on its own, so no padding
+        # is summarized and no copy of the audio is made
+        blocks = frames[: full * finest].reshape(full, finest, channels)
+        minimum = blocks.min(axis=(1, 2))
+        maximum = blocks.max(axis=(1, 2))
+        mean_square = numpy.einsum("ijk,ijk->i", blocks, blocks) / (finest * channels)
+        tail = frames[full * finest :]
+        if len(tail):
+            minimum = numpy.append(minimum, tail.min())
+            maximum = numpy.append(maximum, tail.max())
+            mean_square = numpy.append(
+                mean_square, numpy.einsum("ij,ij", tail, tail) / tail.size
+            )
+        levels = [cls._level(finest, minimum, maximum, mean_square)]
+        for block_size in LEVEL_BLOCK_SIZES[1:]:
+            # Coarser levels are reduced from the finer ones, not from the audio
+            factor = block_size // levels[-1].block_size
+            buckets = -(-len(minimum) // factor)
+            minimum = _pad(minimum, buckets * factor).reshape(buckets, factor).min(1)
+            maximum = _pad(maximum, buckets * factor).reshape(buckets, factor).max(1)
+            mean_square = (
+                _pad(mean_square, buckets * factor).reshape(buckets, factor).mean(1)
+            )
+            levels.append(cls._level(block_size, minimum, maximum, mean_square))
+        return cls(sample_rate, len(frames), levels)
+
+    @staticmethod
+    def _level(block_size, minimum, maximum, mean_square) -> PeakLevel:
+        return PeakLevel(
+            block_size,
+            minimum.astype(numpy.float16),
+            maximum.astype(numpy.float16),
+            numpy.sqrt(mean_square).astype(numpy.float16),
+        )
+
+    def thumbnail(self, width: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Min and max per pixel column, from the coarsest level that is enough."""
+        level = next(
+            (level for level in reversed(self.levels) if len(level.minimum) >= width),
+            self.levels[0],
+        )
+        starts = numpy.arange(width) * len(level.minimum) // width
+        return (
+            numpy.minimum.reduceat(level.minimum, starts),
+            numpy.maximum.reduceat(level.maximum, starts),
+        )
+
+    def save(self, path: str) -> None:
+        arrays = {}
+        for level in self.levels:
+            arrays[f"min_{level.block_size}"] = level.minimum
+            arrays[f"max_{level.block_size}"] = level.maximum
+            arrays[f"rms_{level.block_size}"] = level.rms
+        with open(path, "wb") as f:
+            numpy.savez(
+                f,
+                meta=numpy.array([self.sample_rate, self.frames], dtype=numpy.int64),
+                **arrays,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> typing.Self:
+        with numpy.load(path) as data:
+            sample_rate, frames = (int(value) for value in data["meta"])
+            levels = [
+                PeakLevel(
+                    block_size,
+                    data[f"min_{block_size}"],
+                    data[f"max_{block_size}"],
+                    data[f"rms_{block_size}"],
+                )
+                for block_size in LEVEL_BLOCK_SIZES
+            ]
+        return cls(sample_rate, frames, levels)
+
+
+def _pad(values: numpy.ndarray, length: int) -> numpy.ndarray:
+    # Padding repeats the last bucket so it can't change a min or max
+    return numpy.pad(values, (0, length - len(values)), mode="edge")
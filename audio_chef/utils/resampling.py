@@ -0,0 +1,62 @@
+import typing
+
+import numpy
+import pedalboard
+import pedalboard.io
+
+from audio_chef.utils.audio_formats import AudioData, as_frames_by_channels
+
+STREAM_BLOCK_SIZE = 2**18
+# Target sample rates accepted from the user
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 384000
+
+
+def parse_sample_rate(text: str) -> int | None:
+    """The target sample rate typed in `text`, None when it is empty.
+
+    Raises ValueError for anything but a whole number of Hz within
+    MIN_SAMPLE_RATE and MAX_SAMPLE_RATE.
+    """
+    if not text.strip():
+        return None
+    sample_rate = int(text)
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        raise ValueError(
+            f"{sample_rate} Hz is outside {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz"
+        )
+    return sample_rate
+
+
+def resample(audio: AudioData, source_rate: int, target_rate: int) -> AudioData:
+    """High quality sample rate conversion that keeps the input's layout."""
+    if source_rate == target_rate:
+        return audio
+
+    res = numpy.concatenate(
+        list(iter_resampled(audio, source_rate, target_rate, len(audio) or 1)), axis=1
+    )
+    return res[0] if audio.ndim == 1 else numpy.ascontiguousarray(res.T)
+
+
+def iter_resampled(
+    audio: AudioData,
+    source_rate: int,
+    target_rate: int,
+    block_size: int = STREAM_BLOCK_SIZE,
+) -> typing.Iterator[numpy.ndarray]:
+    """Resample block by block, yielding float32 (channels, frames) arrays.
+
+    Memory stays bounded by the block size, whatever the ratio.
+    """
+    frames = as_frames_by_channels(audio)
+    resampler = pedalboard.io.StreamResampler(
+        source_rate,
+        target_rate,
+        frames.shape[1],
+        pedalboard.Resample.Quality.WindowedSinc32,
+    )
+    for start in range(0, len(frames), block_size):
+        block = frames[start : start + block_size]
+        yield resampler.process(numpy.ascontiguousarray(block.T, dtype=numpy.float32))
+    yield resampler.process()
@@ -0,0 +1,193 @@
+"""Where intermediate audio files are written.
+
+Every run of the app gets its own directory under the scratch root, removed
+when the app closes. Directories left behind by runs that crashed are removed
+at the next start. Pointing the root at RAM-backed storage, e.g. /dev/shm,
+keeps disk-bound batches off the disk entirely.
+"""
+
+import dataclasses
+import itertools
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+logger = logging.getLogger("audiochef")
+
+RUN_PREFIX = "run-"
+# Left free on the device, the rest of the system needs some too
+MIN_FREE_BYTES = 64 * 2**20
+
+
+class ScratchSpaceError(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class ScratchStats:
+    root: str
+    files: int
+    used_bytes: int
+    peak_bytes: int
+    quota_bytes: int | None
+    free_bytes: int
+
+    def summary(self) -> str:
+        quota = f" of {self.quota_bytes / 2**20:.1f} MiB" if self.quota_bytes else ""
+        return (
+            f"Scratch in {self.root}: {self.files} file(s), "
+            f"{self.used_bytes / 2**20:.1f} MiB used{quota}, "
+            f"peak {self.peak_bytes / 2**20:.1f} MiB, "
+            f"{self.free_bytes / 2**20:.1f} MiB free"
+        )
+
+
+def default_root() -> str:
+    return os.path.join(os.getcwd(), ".audiochef", "scratch")
+
+
+def _is_running(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+
+        # os.kill would terminate the process on Windows
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchStorage:
+    _root: str | None = None
+    _quota_bytes: int | None = None
+    _run_dir: str | None = None
+    _names = itertools.count()
+    # Sizes of the files written this run, by path
+    _files: dict[str, int] = {}
+    _peak_bytes = 0
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure(cls, root: str | None = None, quota_bytes: int | None = None):
+        """A run that already has a directory keeps it until it ends."""
+        with cls._lock:
+            cls._root = os.path.abspath(root or default_root())
+            cls._quota_bytes = quota_bytes or None
+
+    @classmethod
+    def get_root(cls) -> str:
+        # Resolved late, the app changes directory before it starts
+        return cls._root or os.path.abspath(default_root())
+
+    @classmethod
+    def get_run_dir(cls) -> str:
+        with cls._lock:
+            if cls._run_dir is None:
+                cls._run_dir = os.path.join(
+                    cls.get_root(), f"{RUN_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}"
+                )
+                os.makedirs(cls._run_dir)
+            return cls._run_dir
+
+    @classmethod
+    def get_path(cls, name: str, ext: str = "wav") -> str:
+        """The same path for the same name, for files reused within a run."""
+        return os.path.join(cls.get_run_dir(), f"{name}.{ext}")
+
+    @classmethod
+    def new_path(cls, name: str, ext: str = "wav") -> str:
+        """A path no other file of this run has, for sources with the same name."""
+        return cls.get_path(f"{name}-{next(cls._names)}", ext)
+
+    @classmethod
+    def reserve(cls, size: int) -> None:
+        """Fail early when `size` more bytes would not fit in the quota or device."""
+        with cls._lock:
+            used = sum(cls._files.values())
+            if cls._quota_bytes is not None and used + size > cls._quota_bytes:
+                raise ScratchSpaceError(
+                    f"{size / 2**20:.1f} MiB more scratch space would exceed the "
+                    f"quota of {cls._quota_bytes / 2**20:.1f} MiB, "
+                    f"{used / 2**20:.1f} MiB are used"
+                )
+        free = shutil.disk_usage(cls.get_run_dir()).free
+        if size > free - MIN_FREE_BYTES:
+            raise ScratchSpaceError(
+                f"{size / 2**20:.1f} MiB more scratch space do not fit, only "
+                f"{free / 2**20:.1f} MiB are free in {cls.get_root()}"
+            )
+
+    @classmethod
+    def register(cls, path: str) -> None:
+        """Account for a file written to the scratch storage."""
+        with cls._lock:
+            cls._files[path] = os.path.getsize(path)
+            cls._peak_bytes = max(cls._peak_bytes, sum(cls._files.values()))
+
+    @classmethod
+    def remove(cls, path: str) -> None:
+        with cls._lock:
+            cls._files.pop(path, None)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @classmethod
+    def stats(cls) -> ScratchStats:
+        with cls._lock:
+            root = cls.get_root()
+            os.makedirs(root, exist_ok=True)
+            return ScratchStats(
+                root=root,
+                files=len(cls._files),
+                used_bytes=sum(cls._files.values()),
+                peak_bytes=cls._peak_bytes,
+                quota_bytes=cls._quota_bytes,
+                free_bytes=shutil.disk_usage(root).free,
+            )
+
+    @classmethod
+    def cleanup_orphans(cls) -> int:
+        """Remove the directories of runs that are no longer running, in bytes."""
+        root = cls.get_root()
+        if not os.path.isdir(root):
+            return 0
+        freed = 0
+        for entry in os.scandir(root):
+            if not entry.is_dir() or not entry.name.startswith(RUN_PREFIX):
+                continue
+            try:
+                pid = int(entry.name[len(RUN_PREFIX) :].split("-")[0])
+            except ValueError:
+                continue
+            if _is_running(pid):
+                continue
+            for dirpath, _, filenames in os.walk(entry.path):
+                for filename in filenames:
+                    try:
+                        freed += os.path.getsize(os.path.join(dirpath, filename))
+                    except OSError:
+                        pass
+            shutil.rmtree(entry.path, ignore_errors=True)
+        if freed:
+            logger.info(f"Removed {freed / 2**20:.1f} MiB of orphaned scratch files")
+        return freed
+
+    @classmethod
+    def end_run(cls) -> None:
+        with cls._lock:
+            if cls._run_dir is not None:
+                shutil.rmtree(cls._run_dir, ignore_errors=True)
+            cls._run_dir = None
+            cls._files.clear()
@@ -0,0 +1,104 @@
+import dataclasses
+import logging
+import threading
+import typing
+from multiprocessing import shared_memory
+
+import numpy
+
+logger = logging.getLogger("audiochef")
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedAudioHandle:
+    """Everything another process needs to map a `SharedAudioBuffer`."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+    sample_rate: int
+
+
+class SharedAudioBuffer:
+    """Audio samples stored in a named shared memory block.
+
+    Only the `handle` is sent between processes, so passing audio to a worker
+    costs the same regardless of its length. The process that created (or
+    adopted) a buffer owns it and unlinks the block once every `acquire` has
+    been matched by a `release`. Other processes `attach` and `close`.
+
+    Workers must be started through `multiprocessing` so they share the
+    parent's resource tracker, which then only cleans up blocks that are
+    still around when the whole app exits.
+    """
+
+    def __init__(
+        self, memory: shared_memory.SharedMemory, handle: SharedAudioHandle, owner: bool
+    ):
+        self._memory = memory
+        self.handle = handle
+        self.owner = owner
+        self.array: numpy.ndarray = numpy.ndarray(
+            handle.shape, dtype=handle.dtype, buffer=memory.buf
+        )
+        self._references = 1
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls, shape: tuple[int, ...], dtype: typing.Any, sample_rate: int
+    ) -> typing.Self:
+        dtype = numpy.dtype(dtype)
+        size = max(int(numpy.prod(shape)) * dtype.itemsize, 1)
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        handle = SharedAudioHandle(memory.name, tuple(shape), dtype.str, sample_rate)
+        return cls(memory, handle, owner=True)
+
+    @classmethod
+    def from_array(cls, array: numpy.ndarray, sample_rate: int) -> typing.Self:
+        buffer = cls.create(array.shape, array.dtype, sample_rate)
+        buffer.array[...] = array
+        return buffer
+
+    @classmethod
+    def attach(cls, handle: SharedAudioHandle) -> typing.Self:
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    @classmethod
+    def adopt(cls, handle: SharedAudioHandle) -> typing.Self:
+        """Take ownership of a buffer created and handed over by a worker."""
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=True)
+
+    def disown(self) -> SharedAudioHandle:
+        """Give up ownership without unlinking, so another process can adopt it."""
+        self.owner = False
+        self.close()
+        return self.handle
+
+    def acquire(self) -> typing.Self:
+        with self._lock:
+            self._references += 1
+        return self
+
+    def release(self) -> None:
+        with self._lock:
+            self._references -= 1
+            last_reference = self._references == 0
+        if last_reference:
+            self.close()
+            if self.owner:
+                self._memory.unlink()
+
+    def close(self) -> None:
+        # Views into the block must be dropped before it can be unmapped
+        self.array = numpy.empty(0, dtype=self.handle.dtype)
+        self._memory.close()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.owner:
+            self.release()
+        else:
+            self.close()
@@ -0,0 +1,62 @@
+import logging
+import typing
+
+logger = logging.getLogger("audiochef")
+
+Callback = typing.Callable[[], None]
+
+
+class StateStore:
+    """State whose changes reach subscribers in batches.
+
+    Fields are the annotated class attributes of a subclass. Setting one to
+    a different value marks it dirty and asks `schedule` for a flush, which
+    calls every subscriber of a dirty field once, however often its fields
+    changed since the last flush. Fields changed in place are marked with
+    `touch`. Without `schedule` the flush is immediate.
+    """
+
+    def __init__(self, schedule: typing.Callable[[Callback], None] | None = None):
+        self._schedule = schedule
+        self._dirty: set[str] = set()
+        self._flush_scheduled = False
+        self._subscribers: list[tuple[frozenset[str], Callback]] = []
+        self._fields = frozenset(typing.get_type_hints(type(self)))
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+            return
+        if name not in self._fields:
+            raise AttributeError(f"{type(self).__name__} has no field '{name}'")
+        old_value = getattr(self, name)
+        super().__setattr__(name, value)
+        if value is not old_value and value != old_value:
+            self.touch(name)
+
+    def subscribe(self, fields: typing.Iterable[str], callback: Callback) -> None:
+        fields = frozenset(fields)
+        if unknown := fields - self._fields:
+            raise AttributeError(f"{type(self).__name__} has no fields {unknown}")
+        self._subscribers.append((fields, callback))
+
+    def touch(self, *names: str) -> None:
+        self._dirty.update(names)
+        if self._schedule is None:
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._schedule(self.flush)
+
+    def is_dirty(self, name: str) -> bool:
+        return name in self._dirty
+
+    def flush(self) -> None:
+        self._flush_scheduled = False
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        logger.debug(f"Updating the UI for {sorted(dirty)}")
+        for fields, callback in self._subscribers:
+            if fields & dirty:
+                callback()
@@ -1,8 +1,13 @@
 import dataclasses
+import math
 import typing
 
 import pedalboard
 
+from audio_chef.utils import native_transforms
+from audio_chef.utils.analysis import integrated_loudness
+from audio_chef.utils.audio_formats import AudioData
+
 
 @dataclasses.dataclass()
 class Argument:
@@ -16,18 +21,104 @@ class Argument:
 
     def __post_init__(self):
         if self.type is float:
-            self.min = self.min or 0
-            self.max = self.max or 100
+            self.min = 0 if self.min is None else self.min
+            self.max = 100 if self.max is None else self.max
             self.step = self.step or 10
 
 
+# measure(name, compute) returns a cached measurement of a stage's input,
+# only calling compute when the input was not measured before
+Measure = typing.Callable[[str, typing.Callable[[], float]], float]
+
+
+class AnalysisTransform:
+    """A transformation that needs a measurement of its whole input.
+
+    Unlike a plugin it sees the full signal at once, and its measurement is
+    cached so a repeat run or a change of its own parameters skips it.
+    """
+
+    def process(
+        self, audio: AudioData, sample_rate: int, measure: Measure
+    ) -> AudioData:
+        raise NotImplementedError()
+
+
+class LoudnessNormalize(AnalysisTransform):
+    def __init__(self, target_lufs: float = -23.0):
+        self.target_lufs = target_lufs
+
+    def process(
+        self, audio: AudioData, sample_rate: int, measure: Measure
+    ) -> AudioData:
+        loudness = measure(
+            "integrated_loudness", lambda: integrated_loudness(audio, sample_rate)
+        )
+        if not math.isfinite(loudness):
+            # Silence stays silent rather than getting an infinite gain
+            return audio
+        return audio * 10 ** ((self.target_lufs - loudness) / 20)
+
+
+# How many seconds of past input a transformation's output depends on, given
+# its params. None means the output depends on the whole signal or on the
+# position in it, so the transformation cannot be run over chunks of a file.
+Memory = typing.Union[float, typing.Callable[[dict], float], None]
+
+
+def get_memory_s(
+    memory: Memory, arguments: typing.List[Argument], params: dict
+) -> float | None:
+    if not callable(memory):
+        return memory
+    defaults = {argument.name: argument.default for argument in arguments}
+    return memory({**defaults, **params})
+
+
 @dataclasses.dataclass
 class TransformationWrapper:
-    transform: typing.Type[pedalboard.Plugin]
+    transform: typing.Type[pedalboard.Plugin] | typing.Type[AnalysisTransform]
+    arguments: typing.List[Argument]
+    memory_s: Memory = None
+
+    def get_memory_s(self, params: dict) -> float | None:
+        return get_memory_s(self.memory_s, self.arguments, params)
+
+
+class NativeTransform:
+    """A numpy kernel with its parameters bound.
+
+    In place kernels write into the buffer they are given, so the chain only
+    hands them a buffer it owns.
+    """
+
+    def __init__(
+        self, kernel: typing.Callable[..., AudioData], in_place: bool, params: dict
+    ):
+        self.kernel = kernel
+        self.in_place = in_place
+        self.params = params
+
+    def process(self, audio: AudioData, sample_rate: int) -> AudioData:
+        return self.kernel(audio, sample_rate, **self.params)
+
+
+@dataclasses.dataclass
+class NativeTransformationWrapper:
+    kernel: typing.Callable[..., AudioData]
     arguments: typing.List[Argument]
+    in_place: bool = False
+    memory_s: Memory = None
+
+    def get_memory_s(self, params: dict) -> float | None:
+        return get_memory_s(self.memory_s, self.arguments, params)
 
+    def transform(self, **params) -> NativeTransform:
+        defaults = {argument.name: argument.default for argument in self.arguments}
+        return NativeTransform(self.kernel, self.in_place, {**defaults, **params})
 
-TRANSFORMATIONS = {
+
+TRANSFORMATIONS: dict[str, TransformationWrapper | NativeTransformationWrapper] = {
     "Convolution": TransformationWrapper(
         pedalboard.Convolution,
         [
@@ -43,6 +134,8 @@ TRANSFORMATIONS = {
             Argument("attack_ms", float, 1.0),
             Argument("release_ms", float, 100),
         ],
+        # Ten time constants of the envelope follower
+        memory_s=lambda p: 10 * (p["attack_ms"] + p["release_ms"]) / 1000,
     ),
     "Chorus": TransformationWrapper(
         pedalboard.Chorus,
@@ -55,11 +148,16 @@ TRANSFORMATIONS = {
         ],
     ),
     "Distortion": TransformationWrapper(
-        pedalboard.Distortion, [Argument("drive_db", float, 25)]
+        pedalboard.Distortion, [Argument("drive_db", float, 25)], memory_s=0
+    ),
+    "Gain": TransformationWrapper(
+        pedalboard.Gain, [Argument("gain_db", float, 1.0)], memory_s=0
     ),
-    "Gain": TransformationWrapper(pedalboard.Gain, [Argument("gain_db", float, 1.0)]),
     "HighpassFilter": TransformationWrapper(
-        pedalboard.HighpassFilter, [Argument("cutoff_frequency_hz", float, 50)]
+        pedalboard.HighpassFilter,
+        [Argument("cutoff_frequency_hz", float, 50)],
+        # Far more periods of the cutoff than a first order filter rings for
+        memory_s=lambda p: 20 / max(p["cutoff_frequency_hz"], 1),
     ),
     "LadderFilter": TransformationWrapper(
         pedalboard.LadderFilter,
@@ -74,13 +172,22 @@ TRANSFORMATIONS = {
             Argument("resonance", float, 0),
             Argument("drive", float, 1.0),
         ],
+        # Resonance rings longer than a plain filter
+        memory_s=lambda p: 50 / max(p["cutoff_hz"], 1),
     ),
     "Limiter": TransformationWrapper(
         pedalboard.Limiter,
         [Argument("threshold_db", float, -10.0), Argument("release_ms", float, 100.0)],
+        memory_s=lambda p: 10 * p["release_ms"] / 1000,
+    ),
+    "LoudnessNormalize": TransformationWrapper(
+        LoudnessNormalize,
+        [Argument("target_lufs", float, -23.0, min=-40, max=0, step=1)],
     ),
     "LowpassFilter": TransformationWrapper(
-        pedalboard.LowpassFilter, [Argument("cutoff_frequency_hz", float, 50)]
+        pedalboard.LowpassFilter,
+        [Argument("cutoff_frequency_hz", float, 50)],
+        memory_s=lambda p: 20 / max(p["cutoff_frequency_hz"], 1),
     ),
     "Phaser": TransformationWrapper(
         pedalboard.Phaser,
@@ -103,4 +210,41 @@ TRANSFORMATIONS = {
             Argument("freeze_mode", float, 0.0),
         ],
     ),
+    "DownmixToMono": NativeTransformationWrapper(
+        native_transforms.downmix_to_mono, [], memory_s=0
+    ),
+    "SelectChannel": NativeTransformationWrapper(
+        native_transforms.select_channel,
+        [Argument("channel", float, 0, min=0, max=7, step=1)],
+        memory_s=0,
+    ),
+    "SwapChannels": NativeTransformationWrapper(
+        native_transforms.swap_channels, [], in_place=True, memory_s=0
+    ),
+    "Fade": NativeTransformationWrapper(
+        native_transforms.fade,
+        [
+            Argument("fade_in_s", float, 0.0, max=10, step=0.1),
+            Argument("fade_out_s", float, 0.0, max=10, step=0.1),
+        ],
+        in_place=True,
+    ),
+    "RemoveDCOffset": NativeTransformationWrapper(
+        native_transforms.remove_dc_offset, [], in_place=True
+    ),
+    "Trim": NativeTransformationWrapper(
+        native_transforms.trim,
+        [
+            Argument("start_s", float, 0.0, max=600, step=1),
+            Argument("duration_s", float, 0.0, max=600, step=1),
+        ],
+    ),
+    "InvertPolarity": NativeTransformationWrapper(
+        native_transforms.invert_polarity, [], in_place=True, memory_s=0
+    ),
+    "NormalizePeak": NativeTransformationWrapper(
+        native_transforms.normalize_peak,
+        [Argument("peak_db", float, -1.0, min=-40, max=0, step=1)],
+        in_place=True,
+    ),
 }
@@ -9,7 +9,13 @@ from kivy.tests import UnitKivyApp
 
 
 def app():
-    from audio_chef.main import AudioChefApp
+    from kivy.resources import resource_add_path
+
+    from audio_chef.app import AudioChefApp
+    from audio_chef.main import project_dir
+
+    # main() adds it before building the app
+    resource_add_path(project_dir.as_posix())
 
     class TestApp(UnitKivyApp, AudioChefApp):
         pass
@@ -27,4 +33,4 @@ async def test_add_file(kivy_app):
     Window.dispatch("on_drop_file", dummy_file.encode(), 0.0, 0.0)
 
     # Assert
-    assert AppState.selected_files[0].filename == dummy_file
+    assert AppState.selected_files.filenames[0] == dummy_file
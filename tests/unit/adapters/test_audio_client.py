@@ -0,0 +1,81 @@
+import numpy
+import pytest
+import soundfile
+
+from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Preset,
+    Transformation,
+)
+from audio_chef.utils.audio_formats import (
+    AudioFile,
+    FFMPEGAudioFormatter,
+    SUPPORTED_AUDIO_FORMATS,
+)
+from audio_chef.utils.scratch import ScratchStorage
+
+SAME_NAMES = NameChangeParameters(
+    mode=NameChangeMode.WILDCARDS,
+    wildcards_input="$item",
+    replace_from_input="",
+    replace_to_input="",
+)
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    # wav needs no ffmpeg
+    wav = FFMPEGAudioFormatter(True, True, "wav", "wav")
+    SUPPORTED_AUDIO_FORMATS.append(wav)
+    monkeypatch.chdir(tmp_path)
+    initialize_db(str(tmp_path / "presets.db"))
+    path = tmp_path / "input.wav"
+    soundfile.write(path, numpy.full((4800, 2), 0.5), 48000)
+    yield str(path)
+    SUPPORTED_AUDIO_FORMATS.remove(wav)
+
+
+def gain_preset(gain_db: float) -> Preset:
+    return Preset(
+        ext="wav",
+        transformations=[Transformation(name="Gain", params={"gain_db": gain_db})],
+        name_change_parameters=SAME_NAMES,
+    )
+
+
+class TestExecutePresets:
+    def test_presets_with_the_same_name_get_their_own_outputs(self, source):
+        audio_file = AudioFile(source)
+        audio_file.update_destination_name_and_ext(source)
+
+        report = AudioClient.execute_presets(
+            {1: gain_preset(-6.02), 2: gain_preset(-12.04)},
+            [audio_file],
+            names={1: "Loud mix", 2: "Loud mix"},
+        )
+
+        assert report.success
+        first, _ = soundfile.read(source.replace(".wav", "_Loud_mix.wav"))
+        second, _ = soundfile.read(source.replace(".wav", "_Loud_mix_2.wav"))
+        assert first[0, 0] == pytest.approx(0.25, abs=1e-3)
+        assert second[0, 0] == pytest.approx(0.125, abs=1e-3)
+
+
+class TestExecuteBatch:
+    def test_decodes_do_not_outlive_the_batch(self, source):
+        audio_file = AudioFile(source)
+        audio_file.update_destination_name_and_ext(source.replace(".wav", "_out.wav"))
+        files_before = ScratchStorage.stats().files
+
+        report = AudioClient.execute_batch(
+            "wav",
+            [audio_file],
+            [Transformation(name="Gain", params={"gain_db": -6.02})],
+        )
+
+        assert report.success
+        assert audio_file.internal_file is None
+        assert ScratchStorage.stats().files == files_before
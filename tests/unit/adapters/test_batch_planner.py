@@ -0,0 +1,32 @@
+import pytest
+
+from audio_chef.adapters.batch_planner import BatchPlanner
+from audio_chef.utils.audio_formats import (
+    AudioFile,
+    FFMPEGAudioFormatter,
+    SUPPORTED_AUDIO_FORMATS,
+)
+
+
+@pytest.fixture
+def test_format():
+    test_format = FFMPEGAudioFormatter(True, True, "test", "test_formatter")
+    SUPPORTED_AUDIO_FORMATS.append(test_format)
+    yield test_format
+    SUPPORTED_AUDIO_FORMATS.remove(test_format)
+
+
+class TestBatchPlanner:
+    def test_identical_inputs_are_rendered_once(self, tmp_path, test_format):
+        content = bytes(range(256)) * 4096
+        for name in ["a", "b", "c"]:
+            (tmp_path / f"{name}.test").write_bytes(content)
+        (tmp_path / "d.test").write_bytes(content[:-1] + b"\x00")
+        files = [AudioFile(str(tmp_path / f"{name}.test")) for name in "abcd"]
+
+        plan = BatchPlanner.plan(files)
+
+        assert [group.primary for group in plan.groups] == [files[0], files[3]]
+        assert plan.groups[0].duplicates == files[1:3]
+        assert plan.saved_renders == 2
+        assert plan.saved_bytes == 2 * len(content)
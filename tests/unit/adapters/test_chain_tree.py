@@ -0,0 +1,45 @@
+from audio_chef.adapters.chain_tree import build_chain_tree, render_chain_tree
+from audio_chef.models.preset import Transformation
+
+HIGHPASS = Transformation(name="HighpassFilter", params={"cutoff_frequency_hz": 80})
+COMPRESSOR = Transformation(name="Compressor", params={"threshold_db": -12})
+REVERB = Transformation(name="Reverb", params={})
+LIMITER = Transformation(name="Limiter", params={})
+
+
+class TestChainTree:
+    def test_shared_prefix_is_processed_once(self):
+        tree = build_chain_tree(
+            {
+                "a": [HIGHPASS, COMPRESSOR, REVERB],
+                "b": [HIGHPASS, COMPRESSOR, LIMITER],
+                "c": [HIGHPASS, COMPRESSOR],
+            }
+        )
+        processed = []
+
+        def process(transformations, audio, sample_rate, upstream):
+            assert audio == [t.name for t in upstream]
+            processed.append([t.name for t in transformations])
+            return audio + [t.name for t in transformations]
+
+        results = dict(render_chain_tree(tree, [], 44100, process))
+
+        assert processed == [
+            ["HighpassFilter", "Compressor"],
+            ["Reverb"],
+            ["Limiter"],
+        ]
+        assert results == {
+            "a": ["HighpassFilter", "Compressor", "Reverb"],
+            "b": ["HighpassFilter", "Compressor", "Limiter"],
+            "c": ["HighpassFilter", "Compressor"],
+        }
+
+    def test_different_params_do_not_share_a_node(self):
+        other_highpass = Transformation(
+            name="HighpassFilter", params={"cutoff_frequency_hz": 120}
+        )
+        tree = build_chain_tree({"a": [HIGHPASS], "b": [other_highpass]})
+
+        assert len(tree.children) == 2
@@ -0,0 +1,140 @@
+import threading
+import urllib.error
+import urllib.request
+
+import numpy
+import pytest
+import soundfile
+
+from audio_chef.adapters.coordinator import Coordinator
+from audio_chef.adapters import render_worker
+from audio_chef.adapters.render_worker import RenderWorker
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Preset,
+    Transformation,
+)
+from audio_chef.models.report import BatchReport
+from audio_chef.models.task import RenderTask
+from audio_chef.utils.audio_formats import (
+    FFMPEGAudioFormatter,
+    SUPPORTED_AUDIO_FORMATS,
+)
+
+PRESET = Preset(
+    ext="wav",
+    transformations=[Transformation(name="Gain", params={"gain_db": -6})],
+    name_change_parameters=NameChangeParameters(
+        mode=NameChangeMode.WILDCARDS,
+        wildcards_input="$item_out",
+        replace_from_input="",
+        replace_to_input="",
+    ),
+)
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    # wav needs no ffmpeg
+    wav = FFMPEGAudioFormatter(True, True, "wav", "wav")
+    SUPPORTED_AUDIO_FORMATS.append(wav)
+    monkeypatch.chdir(tmp_path)
+    initialize_db(str(tmp_path / "presets.db"))
+    filenames = []
+    for index in range(3):
+        path = tmp_path / f"input{index}.wav"
+        soundfile.write(path, numpy.full((4800, 2), 0.1 * (index + 1)), 48000)
+        filenames.append(str(path))
+    yield filenames
+    SUPPORTED_AUDIO_FORMATS.remove(wav)
+
+
+def serve(inputs: list[str], **kwargs) -> Coordinator:
+    tasks = [RenderTask(str(i), [f], PRESET) for i, f in enumerate(inputs)]
+    coordinator = Coordinator(tasks, **kwargs)
+    coordinator.start()
+    return coordinator
+
+
+def run_workers(url: str, count: int) -> None:
+    workers = [
+        threading.Thread(target=RenderWorker(url, f"worker{i}").run)
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+
+class TestDistributedRendering:
+    def test_workers_render_every_task(self, inputs):
+        coordinator = serve(inputs)
+        try:
+            run_workers(coordinator.url, 2)
+            report = coordinator.wait(timeout=0)
+        finally:
+            coordinator.shutdown()
+
+        assert coordinator.finished
+        assert report.success
+        assert report.rendered_files == 3
+        for index, filename in enumerate(inputs):
+            audio, _ = soundfile.read(filename.replace(".wav", "_out.wav"))
+            assert audio[0, 0] == pytest.approx(0.1 * (index + 1) / 2, abs=1e-3)
+
+    def test_tasks_of_dead_workers_are_reassigned(self, inputs):
+        coordinator = serve(inputs[:1], heartbeat_timeout_s=0.2)
+        try:
+            # Claims the only task and never sends a heartbeat
+            urllib.request.urlopen(
+                urllib.request.Request(
+                    coordinator.url + "/claim", data=b'{"worker": "dead"}'
+                )
+            )
+            run_workers(coordinator.url, 1)
+            report = coordinator.wait(timeout=0)
+        finally:
+            coordinator.shutdown()
+
+        assert report.rendered_files == 1
+        assert not coordinator.heartbeat("0", "dead")
+
+    def test_unsuccessful_renders_are_reported_as_failed(self, inputs, monkeypatch):
+        monkeypatch.setattr(
+            RenderWorker, "render", lambda self, task: BatchReport(success=False)
+        )
+        coordinator = serve(inputs[:1], max_attempts=2)
+        try:
+            run_workers(coordinator.url, 1)
+            report = coordinator.wait(timeout=0)
+        finally:
+            coordinator.shutdown()
+
+        assert not report.success
+        assert report.failed_files == inputs[:1]
+
+    def test_results_are_reported_through_connection_errors(self, inputs, monkeypatch):
+        monkeypatch.setattr(render_worker, "POLL_INTERVAL_S", 0.01)
+        post = RenderWorker._post
+        refused = []
+
+        def flaky_post(self, path, **body):
+            if path.endswith("/complete") and len(refused) < 2:
+                refused.append(path)
+                raise urllib.error.URLError("connection refused")
+            return post(self, path, **body)
+
+        monkeypatch.setattr(RenderWorker, "_post", flaky_post)
+        coordinator = serve(inputs[:1])
+        try:
+            run_workers(coordinator.url, 1)
+            report = coordinator.wait(timeout=0)
+        finally:
+            coordinator.shutdown()
+
+        assert len(refused) == 2
+        assert report.success
+        assert report.rendered_files == 1
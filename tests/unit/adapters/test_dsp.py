@@ -0,0 +1,88 @@
+import numpy
+import pytest
+
+from audio_chef.adapters.dsp import prepare_board
+from audio_chef.models.preset import Transformation
+from audio_chef.utils import transformations
+from audio_chef.utils.analysis import integrated_loudness
+
+SAMPLE_RATE = 48000
+
+
+def sine(amplitude: float) -> numpy.ndarray:
+    t = numpy.arange(SAMPLE_RATE * 5) / SAMPLE_RATE
+    return numpy.stack([amplitude * numpy.sin(2 * numpy.pi * 997 * t)] * 2, axis=1)
+
+
+class TestLoudnessNormalize:
+    def test_reaches_target_after_plugins(self):
+        chain = prepare_board(
+            [
+                Transformation(name="Gain", params={"gain_db": -6}),
+                Transformation(name="LoudnessNormalize", params={"target_lufs": -16}),
+            ]
+        )
+
+        res = chain(sine(0.5), SAMPLE_RATE)
+
+        assert integrated_loudness(res, SAMPLE_RATE) == pytest.approx(-16, abs=0.1)
+
+    def test_measurement_is_reused_when_target_changes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        measured = []
+        monkeypatch.setattr(
+            transformations,
+            "integrated_loudness",
+            lambda audio, sample_rate: measured.append(1) or -20.0,
+        )
+        audio = sine(0.1)
+
+        for target in [-23, -14]:
+            chain = prepare_board(
+                [
+                    Transformation(
+                        name="LoudnessNormalize", params={"target_lufs": target}
+                    )
+                ]
+            )
+            res = chain(audio, SAMPLE_RATE, source_key="source")
+
+        assert len(measured) == 1
+        assert numpy.allclose(res, audio * 10 ** (6 / 20))
+
+
+class TestNativeTransforms:
+    def test_in_place_stages_leave_the_input_untouched(self):
+        audio = sine(0.5)
+        original = audio.copy()
+        chain = prepare_board(
+            [
+                Transformation(name="InvertPolarity", params={}),
+                Transformation(name="Gain", params={"gain_db": 0}),
+                Transformation(name="DownmixToMono", params={}),
+                Transformation(name="NormalizePeak", params={"peak_db": 0}),
+            ]
+        )
+
+        res = chain(audio, SAMPLE_RATE)
+
+        assert numpy.array_equal(audio, original)
+        assert res.shape == (len(audio),)
+        assert numpy.abs(res).max() == pytest.approx(1.0)
+        assert numpy.allclose(res, -original[:, 0] * 2, atol=1e-4)
+
+
+class TestTargetSampleRate:
+    @pytest.mark.parametrize("source_rate", [96000, 24000])
+    def test_output_is_at_the_target_rate(self, source_rate):
+        audio = numpy.zeros((source_rate, 2))
+        chain = prepare_board(
+            [Transformation(name="Fade", params={"fade_in_s": 0.5})],
+            target_sample_rate=SAMPLE_RATE,
+        )
+
+        res = chain(audio, source_rate)
+
+        assert chain.output_sample_rate(source_rate) == SAMPLE_RATE
+        assert res.shape[1] == 2
+        assert abs(len(res) - SAMPLE_RATE) < 100
@@ -0,0 +1,69 @@
+import numpy
+import pytest
+import soundfile
+
+from audio_chef.adapters import estimator
+from audio_chef.adapters.batch_planner import BatchPlanner
+from audio_chef.adapters.pipeline import PipelineConfig
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.models.estimate import BatchEstimate, FileEstimate
+from audio_chef.models.preset import Transformation
+from audio_chef.utils import audio_formats
+from audio_chef.utils.audio_formats import AudioFile, AudioFormatter
+
+CHAIN = [
+    Transformation(name="Gain", params={"gain_db": -6}),
+    Transformation(name="Reverb", params={"room_size": 0.5}),
+]
+
+
+@pytest.fixture
+def wav_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        audio_formats,
+        "SUPPORTED_AUDIO_FORMATS",
+        [AudioFormatter(True, True, "wav", "wav")],
+    )
+    path = tmp_path / "input.wav"
+    soundfile.write(path, numpy.zeros((48000 * 10, 2)), 48000)
+    return AudioFile(str(path))
+
+
+class TestEstimator:
+    def test_estimate_follows_recorded_throughput(self, wav_file):
+        initialize_db(":memory:")
+        plan = BatchPlanner.plan([wav_file])
+
+        def estimate():
+            rates = estimator.Rates.load(CHAIN, ["wav"])
+            return estimator.estimate_batch(
+                plan, CHAIN, [], PipelineConfig(), None, rates
+            )
+
+        before = estimate()
+        recorder = estimator.ThroughputRecorder(estimator.Rates.load(CHAIN, ["wav"]))
+        recorder.add_chain(CHAIN, 10, 5)
+        recorder.save()
+        after = estimate()
+
+        assert before.files[0].duration_s == pytest.approx(10)
+        assert before.measured_rates == 0
+        assert after.files[0].process_s == pytest.approx(5)
+        assert after.measured_rates == 2
+        assert after.scratch_bytes == 48000 * 10 * 2 * 2
+
+    def test_eta_learns_the_pace(self, monkeypatch):
+        clock = iter([0.0, 0.0, 10.0])
+        monkeypatch.setattr(estimator.time, "perf_counter", lambda: next(clock))
+        files = [FileEstimate(str(i), 60, 0, 1, 0, []) for i in range(4)]
+        progress = []
+        tracker = estimator.EtaTracker(
+            BatchEstimate(files, 4, 0, 0, 0, 0, 0), progress.append
+        )
+
+        tracker.start()
+        tracker.files_done(["0", "1"])
+
+        # Half of it took 10 s instead of the 2 s expected
+        assert progress[0].eta_s == 4
+        assert progress[1].eta_s == pytest.approx(0.5 * 10 + 0.5 * 2)
@@ -0,0 +1,201 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy
+import pytest
+import soundfile
+
+from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.job_api import JobApi
+from audio_chef.adapters.jobs import JobScheduler
+from audio_chef.adapters.repository import PresetRepository, initialize_db
+from audio_chef.adapters.worker_pool import WorkerPool
+from audio_chef.models.job import JobStatus
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Preset,
+    Transformation,
+)
+from audio_chef.models.report import BatchReport
+from audio_chef.utils.audio_formats import (
+    AudioFile,
+    FFMPEGAudioFormatter,
+    SUPPORTED_AUDIO_FORMATS,
+)
+
+PRESET = Preset(
+    ext="wav",
+    transformations=[Transformation(name="Gain", params={"gain_db": -6})],
+    name_change_parameters=NameChangeParameters(
+        mode=NameChangeMode.WILDCARDS,
+        wildcards_input="$item_out",
+        replace_from_input="",
+        replace_to_input="",
+    ),
+)
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    # wav needs no ffmpeg
+    wav = FFMPEGAudioFormatter(True, True, "wav", "wav")
+    SUPPORTED_AUDIO_FORMATS.append(wav)
+    monkeypatch.chdir(tmp_path)
+    initialize_db(str(tmp_path / "presets.db"))
+    filenames = []
+    for index in range(3):
+        path = tmp_path / f"input{index}.wav"
+        soundfile.write(path, numpy.full((4800, 2), 0.1 * (index + 1)), 48000)
+        filenames.append(str(path))
+    yield filenames
+    SUPPORTED_AUDIO_FORMATS.remove(wav)
+
+
+@pytest.fixture
+def scheduler():
+    worker_pool = WorkerPool()
+    scheduler = JobScheduler(worker_pool)
+    yield scheduler
+    scheduler.shutdown()
+    worker_pool.shutdown()
+
+
+def post(url: str, body: dict, headers: dict | None = None) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json", **(headers or {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestJobScheduler:
+    def test_jobs_with_the_same_preset_run_as_one_batch(
+        self, inputs, scheduler, monkeypatch
+    ):
+        batches = []
+        execute_batch = AudioClient.execute_batch
+
+        def record_batch(output_ext, selected_files, *args, **kwargs):
+            batches.append(len(selected_files))
+            return execute_batch(output_ext, selected_files, *args, **kwargs)
+
+        monkeypatch.setattr(AudioClient, "execute_batch", record_batch)
+        jobs = []
+        for filename in inputs:
+            audio_file = AudioFile(filename)
+            audio_file.update_destination_name_and_ext(
+                PRESET.get_output_filename(filename)
+            )
+            jobs.append(scheduler.submit(PRESET, [audio_file]))
+        done = threading.Event()
+        scheduler.add_listener(
+            lambda job: all(job.finished for job in jobs) and done.set()
+        )
+        scheduler.start()
+        done.wait(timeout=60)
+
+        assert batches == [3]
+        assert all(job.status == JobStatus.DONE for job in jobs)
+
+    def test_tasks_run_on_their_own_between_batches(
+        self, inputs, scheduler, monkeypatch
+    ):
+        runs = []
+        monkeypatch.setattr(
+            AudioClient,
+            "execute_batch",
+            lambda output_ext, selected_files, *args, **kwargs: runs.append(
+                ("batch", len(selected_files))
+            )
+            or BatchReport(),
+        )
+        audio_files = [AudioFile(filename) for filename in inputs]
+        jobs = [
+            scheduler.submit(PRESET, audio_files[:1]),
+            scheduler.submit_task(
+                "compare",
+                audio_files,
+                lambda options: runs.append(("compare", 3)) or BatchReport(),
+            ),
+            scheduler.submit(PRESET, audio_files[1:]),
+        ]
+        done = threading.Event()
+        scheduler.add_listener(
+            lambda job: all(job.finished for job in jobs) and done.set()
+        )
+        scheduler.start()
+        done.wait(timeout=60)
+
+        assert runs == [("batch", 3), ("compare", 3)]
+        assert [job.kind for job in jobs] == ["batch", "compare", "batch"]
+        assert all(job.status == JobStatus.DONE for job in jobs)
+
+
+class TestJobApi:
+    def test_submitted_job_streams_events_until_done(self, inputs, scheduler):
+        preset_id = PresetRepository.save_preset(PRESET).id
+        api = JobApi(scheduler, port=0)
+        api.start()
+        scheduler.start()
+        try:
+            status, body = post(
+                api.url + "/jobs", {"preset_id": preset_id, "files": inputs[:1]}
+            )
+            assert status == 202
+            job_id = body["job"]["id"]
+            with urllib.request.urlopen(
+                f"{api.url}/events?job={job_id}", timeout=30
+            ) as events:
+                statuses = [
+                    json.loads(line[len(b"data: ") :])["status"]
+                    for line in events
+                    if line.startswith(b"data: ")
+                ]
+        finally:
+            api.shutdown()
+
+        assert statuses[-1] == "done"
+        audio, _ = soundfile.read(inputs[0].replace(".wav", "_out.wav"))
+        assert audio[0, 0] == pytest.approx(0.05, abs=1e-3)
+
+    def test_unknown_presets_are_rejected(self, inputs, scheduler):
+        api = JobApi(scheduler, port=0)
+        api.start()
+        try:
+            status, body = post(api.url + "/jobs", {"preset_id": 42, "files": inputs})
+        finally:
+            api.shutdown()
+
+        assert status == 404
+        assert "42" in body["error"]
+
+    @pytest.mark.parametrize(
+        "headers, expected_status",
+        [
+            ({"Content-Type": "text/plain"}, 415),
+            ({"Origin": "https://example.com"}, 403),
+        ],
+    )
+    def test_requests_browsers_could_forge_are_rejected(
+        self, inputs, scheduler, headers, expected_status
+    ):
+        preset_id = PresetRepository.save_preset(PRESET).id
+        api = JobApi(scheduler, port=0)
+        api.start()
+        try:
+            status, _ = post(
+                api.url + "/jobs", {"preset_id": preset_id, "files": inputs}, headers
+            )
+        finally:
+            api.shutdown()
+
+        assert status == expected_status
+        assert scheduler.jobs() == []
@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from audio_chef.adapters.pipeline import PipelineConfig, PipelinedExecutor
+
+
+class TestPipelinedExecutor:
+    def test_all_items_flow_through_every_stage(self):
+        encoded = []
+        lock = threading.Lock()
+
+        def encode(item):
+            with lock:
+                encoded.append(item)
+
+        executor = PipelinedExecutor(
+            lambda item: item + 1,
+            lambda item: item * 2,
+            encode,
+            PipelineConfig(
+                decode_workers=2, dsp_workers=3, encode_workers=2, queue_size=1
+            ),
+        )
+        executor.run(range(20))
+
+        assert sorted(encoded) == [(i + 1) * 2 for i in range(20)]
+
+    def test_stage_error_is_raised(self):
+        def process(item):
+            if item == 3:
+                raise ValueError("bad file")
+            return item
+
+        executor = PipelinedExecutor(lambda item: item, process, lambda item: None)
+        with pytest.raises(ValueError):
+            executor.run(range(10))
@@ -0,0 +1,31 @@
+import numpy
+import pytest
+
+from audio_chef.adapters.plugin_host import PluginCrashError, PluginHost
+from audio_chef.models.preset import Transformation
+
+SAMPLE_RATE = 8000
+
+CHAIN = [Transformation(name="Gain", params={"gain_db": -6})]
+
+
+@pytest.fixture
+def host():
+    host = PluginHost(1)
+    yield host
+    host.shutdown()
+
+
+class TestPluginHost:
+    def test_crashed_host_is_replaced(self, host):
+        audio = numpy.random.default_rng(0).uniform(-0.5, 0.5, (SAMPLE_RATE, 2))
+        (process,) = list(host._idle.queue)
+        process.process.kill()
+        process.process.join()
+
+        with pytest.raises(PluginCrashError):
+            host.process_array(audio, SAMPLE_RATE, CHAIN, {})
+        res, sample_rate = host.process_array(audio, SAMPLE_RATE, CHAIN, {})
+
+        assert sample_rate == SAMPLE_RATE
+        assert numpy.allclose(res, audio * 10 ** (-6 / 20), atol=1e-6)
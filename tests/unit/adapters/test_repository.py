@@ -0,0 +1,58 @@
+import os
+
+from audio_chef.adapters import repository
+from audio_chef.adapters.repository import PluginRepository, initialize_db
+from audio_chef.models.plugin import PluginMetadata, PluginParameter
+
+
+def make_metadata(path: str) -> PluginMetadata:
+    return PluginMetadata(
+        name="Echo",
+        path=path,
+        vendor="Acme",
+        parameters=[
+            PluginParameter("delay_ms", "float", 250.0, min=0, max=1000, step=1),
+            PluginParameter("sync", "bool", False),
+            PluginParameter("mode", "str", "Tape", options=["Tape", "Digital"]),
+        ],
+        latency_samples=64,
+        layouts=[1, 2],
+        mtime=os.stat(path).st_mtime,
+    )
+
+
+class TestPluginRepository:
+    def test_metadata_round_trips_through_the_db(self, tmp_path, monkeypatch):
+        initialize_db(":memory:")
+        bundle = tmp_path / "Echo.vst3"
+        bundle.write_bytes(b"")
+        monkeypatch.setattr(
+            repository.PluginScanner, "scan", lambda path: make_metadata(path)
+        )
+
+        PluginRepository.save_plugin(str(bundle))
+
+        assert PluginRepository.get_metadata("Echo") == make_metadata(str(bundle))
+        arguments = {a.name: a for a in PluginRepository.get_arguments("Echo")}
+        assert (arguments["delay_ms"].min, arguments["delay_ms"].max) == (0, 1000)
+        assert arguments["mode"].options == ["Tape", "Digital"]
+
+    def test_only_changed_bundles_are_rescanned(self, tmp_path, monkeypatch):
+        initialize_db(":memory:")
+        bundle = tmp_path / "Echo.vst3"
+        bundle.write_bytes(b"")
+        scanned = []
+
+        def scan(path):
+            scanned.append(path)
+            return make_metadata(path)
+
+        monkeypatch.setattr(repository.PluginScanner, "scan", scan)
+        PluginRepository.save_plugin(str(bundle))
+
+        PluginRepository.rescan_changed_plugins()
+        assert len(scanned) == 1
+
+        os.utime(bundle, (0, os.stat(bundle).st_mtime + 10))
+        PluginRepository.rescan_changed_plugins()
+        assert len(scanned) == 2
@@ -0,0 +1,38 @@
+import concurrent.futures
+
+import numpy
+
+from audio_chef.adapters.chunking import get_chain_memory_s
+from audio_chef.adapters.dsp import prepare_board
+from audio_chef.adapters.silence import SilenceConfig, process_skipping_silence
+from audio_chef.models.preset import Transformation
+
+SAMPLE_RATE = 8000
+
+CHAIN = [
+    Transformation(name="LowpassFilter", params={"cutoff_frequency_hz": 1000}),
+    Transformation(name="Gain", params={"gain_db": 6}),
+]
+
+
+class TestSilenceSkipping:
+    def test_bypassed_output_matches_serial(self):
+        t = numpy.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+        tone = 0.5 * numpy.sin(2 * numpy.pi * 440 * t)
+        silence = numpy.zeros(5 * SAMPLE_RATE)
+        audio = numpy.concatenate([tone, silence, tone, silence[:1234]])
+
+        serial = prepare_board(CHAIN)(audio, SAMPLE_RATE)
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            res, bypassed = process_skipping_silence(
+                lambda span: prepare_board(CHAIN)(span, SAMPLE_RATE),
+                audio,
+                SAMPLE_RATE,
+                get_chain_memory_s(CHAIN),
+                SilenceConfig(),
+                executor,
+            )
+
+        assert res.shape == serial.shape
+        assert bypassed > 4 * SAMPLE_RATE
+        assert numpy.abs(res - serial).max() < 1e-4
@@ -0,0 +1,35 @@
+import configparser
+
+import pytest
+
+from audio_chef.adapters.sweep import SweepRange
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Preset,
+    Transformation,
+)
+
+PRESET = Preset(
+    "wav",
+    [Transformation(name="Gain", params={"gain_db": 0})],
+    NameChangeParameters(
+        mode=NameChangeMode.WILDCARDS,
+        wildcards_input="$item",
+        replace_from_input="",
+        replace_to_input="",
+    ),
+)
+
+
+class TestSweepRange:
+    def test_values_include_both_ends(self):
+        assert SweepRange(0, "gain_db", -1, 1, 0.5).values() == [-1, -0.5, 0, 0.5, 1]
+
+    @pytest.mark.parametrize("step", [0, -1])
+    def test_steps_must_move_forward(self, step):
+        config = configparser.ConfigParser()
+        config["Gain"] = {"gain_db step": str(step)}
+
+        with pytest.raises(ValueError, match="gain_db"):
+            SweepRange.for_argument(PRESET, 0, "gain_db", config)
@@ -0,0 +1,31 @@
+import pytest
+
+from audio_chef.adapters.plugin_host import PluginHost
+from audio_chef.adapters.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(idle_timeout_s=0)
+    yield pool
+    pool.shutdown()
+
+
+class TestWorkerPool:
+    def test_processes_survive_batches_until_idle(self, pool):
+        pool.prewarm(2, dsp_processes=True)
+        with pool.lease():
+            processes = pool.get_dsp_processes(2)
+            assert not pool.shrink_if_idle()
+        with pool.lease():
+            assert pool.get_dsp_processes(2) is processes
+
+        assert pool.shrink_if_idle()
+        assert pool.get_dsp_processes(2) is not processes
+
+    def test_plugin_hosts_shrink_to_the_minimum(self, pool):
+        PluginHost.shared(3)
+
+        pool.shrink_if_idle()
+
+        assert PluginHost.shared_if_started().size == pool.min_hosts
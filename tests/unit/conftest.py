@@ -0,0 +1,10 @@
+import pytest
+
+from audio_chef.utils.cache_dir import CACHE_DIR_ENV
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep peaks and measurements out of the user's cache directory."""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    return tmp_path / "cache"
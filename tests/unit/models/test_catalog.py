@@ -0,0 +1,108 @@
+import numpy
+import pytest
+import soundfile
+
+from audio_chef.adapters.audio_client import AudioClient
+from audio_chef.adapters.repository import initialize_db
+from audio_chef.models.catalog import FileCatalog, FileStatus
+from audio_chef.models.preset import (
+    NameChangeMode,
+    NameChangeParameters,
+    Transformation,
+)
+from audio_chef.utils.audio_formats import FFMPEGAudioFormatter, SUPPORTED_AUDIO_FORMATS
+
+WILDCARDS = NameChangeParameters(
+    mode=NameChangeMode.WILDCARDS,
+    wildcards_input="$item_out",
+    replace_from_input="",
+    replace_to_input="",
+)
+
+
+@pytest.fixture(autouse=True)
+def wav():
+    wav = FFMPEGAudioFormatter(True, True, "wav", "wav")
+    SUPPORTED_AUDIO_FORMATS.append(wav)
+    yield wav
+    SUPPORTED_AUDIO_FORMATS.remove(wav)
+
+
+class TestFileCatalog:
+    def test_add_skips_duplicates_and_returns_unsupported(self):
+        catalog = FileCatalog(["a/1.wav"])
+
+        unsupported = catalog.add(["a/1.wav", "a/2.wav", "a/3.xyz"])
+
+        assert unsupported == ["a/3.xyz"]
+        assert catalog.filenames == ["a/1.wav", "a/2.wav"]
+
+    def test_remove_keeps_the_index_in_step(self):
+        catalog = FileCatalog(["1.wav", "2.wav", "3.wav"])
+        catalog.rename(WILDCARDS, "mp3")
+
+        catalog.remove("1.wav")
+
+        assert "1.wav" not in catalog
+        assert catalog.get_destination("3.wav") == "3_out.mp3"
+        assert catalog.get_audio_file("2.wav").filename == "2.wav"
+
+    def test_remove_many_at_once(self):
+        catalog = FileCatalog([f"{index}.wav" for index in range(5)])
+        catalog.set_probe("4.wav", 1.5, 44100, 2)
+
+        catalog.remove("0.wav", "2.wav", "3.wav")
+
+        assert catalog.filenames == ["1.wav", "4.wav"]
+        assert catalog.get_row(1) == ("4.wav", "4.wav", FileStatus.ADDED)
+        assert catalog.get_probe("4.wav") == (1.5, 44100, 2)
+
+    def test_probes_of_a_copy_are_kept_for_remaining_files(self):
+        catalog = FileCatalog(["1.wav", "2.wav"])
+        snapshot = catalog.copy()
+        snapshot.set_probe("1.wav", 1.5, 44100, 2)
+        snapshot.set_probe("2.wav", 2.5, 48000, 1)
+
+        catalog.remove("1.wav")
+        catalog.update_probes(snapshot)
+
+        assert catalog.filenames == ["2.wav"]
+        assert catalog.get_probe("2.wav") == (2.5, 48000, 1)
+        assert snapshot.filenames == ["1.wav", "2.wav"]
+
+    def test_handles_are_made_for_the_current_names(self, wav):
+        catalog = FileCatalog(["a/1.wav"])
+
+        catalog.rename(WILDCARDS, "")
+        audio_file = catalog.get_audio_file("a/1.wav")
+
+        assert audio_file.source_audio_format is wav
+        assert audio_file.destination_filename == "a/1_out.wav"
+        assert catalog.audio_files() == [audio_file]
+
+    def test_probes_and_statuses_are_per_row(self):
+        catalog = FileCatalog(["1.wav", "2.wav"])
+        catalog.set_probe("2.wav", 1.5, 44100, 2)
+        catalog.set_statuses(["1.wav", "gone.wav"], FileStatus.FAILED)
+
+        assert catalog.get_probe("1.wav") is None
+        assert catalog.get_probe("2.wav") == (1.5, 44100, 2)
+        assert catalog.get_status("1.wav") == FileStatus.FAILED
+        assert catalog.get_status("2.wav") == FileStatus.ADDED
+
+    def test_handles_render_from_their_source_every_time(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        initialize_db(str(tmp_path / "presets.db"))
+        source = str(tmp_path / "1.wav")
+        soundfile.write(source, numpy.full((4800, 2), 0.5), 48000)
+        catalog = FileCatalog([source])
+        catalog.rename(WILDCARDS, "wav")
+        gain = [Transformation(name="Gain", params={"gain_db": -6.02})]
+
+        outputs = []
+        for _ in range(2):
+            AudioClient.execute_batch("wav", [catalog.get_audio_file(source)], gain)
+            audio, _ = soundfile.read(catalog.get_destination(source))
+            outputs.append(audio[0, 0])
+
+        assert outputs == pytest.approx([0.25, 0.25], abs=1e-3)
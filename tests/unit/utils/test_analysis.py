@@ -0,0 +1,57 @@
+import math
+
+import numpy
+import pytest
+
+from audio_chef.utils.analysis import analyze, integrated_loudness
+
+
+class TestIntegratedLoudness:
+    @pytest.mark.parametrize("sample_rate", [44100, 48000])
+    def test_full_scale_sine_reference(self, sample_rate):
+        # BS.1770: a 997 Hz sine at -6.02 dBFS on one channel reads -9.03 LUFS
+        t = numpy.arange(sample_rate * 5) / sample_rate
+        sine = 0.5 * numpy.sin(2 * numpy.pi * 997 * t)
+
+        assert integrated_loudness(sine, sample_rate) == pytest.approx(-9.03, abs=0.05)
+
+    def test_surround_layout_weights(self):
+        # 5.1: surrounds count 1.41 times, the LFE is left out
+        sample_rate = 48000
+        t = numpy.arange(sample_rate * 5) / sample_rate
+        sine = 0.5 * numpy.sin(2 * numpy.pi * 997 * t)
+        lfe_only, surround_only = numpy.zeros((2, len(sine), 6))
+        lfe_only[:, 3] = sine
+        surround_only[:, 4] = sine
+
+        assert integrated_loudness(lfe_only, sample_rate) == -math.inf
+        assert integrated_loudness(surround_only, sample_rate) == pytest.approx(
+            -9.03 + 10 * math.log10(1.41), abs=0.05
+        )
+
+    def test_silence_is_gated_out(self):
+        assert integrated_loudness(numpy.zeros((48000, 2)), 48000) == -math.inf
+
+
+class TestAnalyze:
+    def test_peak_and_rms(self):
+        audio = numpy.full((1000, 2), 0.5)
+        audio[10, 1] = -1.0
+
+        stats = analyze(audio, 48000)
+
+        assert stats.peak_db == pytest.approx(0.0)
+        assert stats.rms_db == pytest.approx(20 * math.log10(0.5), abs=0.01)
+
+    def test_true_peak_sees_inter_sample_peaks(self):
+        # Sampled at 45 degrees off its crests, this sine never hits its peak
+        sample_rate = 48000
+        t = numpy.arange(sample_rate) / sample_rate
+        audio = numpy.sin(2 * numpy.pi * sample_rate / 4 * t + numpy.pi / 4)
+
+        stats = analyze(audio, sample_rate, full=True)
+
+        assert stats.peak_db == pytest.approx(-3.01, abs=0.01)
+        assert stats.true_peak_db == pytest.approx(0.0, abs=0.2)
+        assert stats.clipped_samples == 0
+        assert analyze(audio * 2, sample_rate, full=True).clipped_samples == sample_rate
@@ -1,4 +1,8 @@
+import numpy
+import soundfile
+
 from audio_chef.utils.audio_formats import FFMPEGAudioFormatter, SUPPORTED_AUDIO_FORMATS, AudioFile
+from audio_chef.utils.scratch import ScratchStorage
 
 
 class TestFFMPEGAudioFormatter:
@@ -14,3 +18,12 @@ class TestAudioFile:
     def test_initialization_without_compatible_format(self):
         SUPPORTED_AUDIO_FORMATS.append(FFMPEGAudioFormatter(True, False, 'test', 'test_formatter'))
         AudioFile('filename.test')
+
+    def test_render_files_keep_their_channels(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        audio_file = AudioFile('a.wav', FFMPEGAudioFormatter(True, True, 'wav', 'wav'))
+
+        for audio, channels in [(numpy.zeros(100), 1), (numpy.zeros((100, 3)), 3)]:
+            render_file = audio_file.write_render_file(audio, 44100)
+            assert soundfile.info(render_file).channels == channels
+            ScratchStorage.remove(render_file)
@@ -0,0 +1,41 @@
+import numpy
+import pytest
+
+from audio_chef.utils import native_transforms
+
+SAMPLE_RATE = 100
+
+
+class TestNativeTransforms:
+    def test_swap_channels(self):
+        audio = numpy.stack([numpy.zeros(10), numpy.ones(10)], axis=1)
+
+        res = native_transforms.swap_channels(audio, SAMPLE_RATE)
+
+        assert res is audio
+        assert (audio[:, 0] == 1).all() and (audio[:, 1] == 0).all()
+
+    def test_fade_ramps_both_ends(self):
+        audio = numpy.ones((SAMPLE_RATE * 2, 2))
+
+        native_transforms.fade(audio, SAMPLE_RATE, fade_in_s=0.5, fade_out_s=1)
+
+        assert audio[0].tolist() == [0, 0]
+        assert audio[50].tolist() == [1, 1]
+        assert audio[-1].tolist() == [0, 0]
+        assert audio[150, 0] == pytest.approx(0.5, abs=0.01)
+
+    def test_remove_dc_offset(self):
+        audio = numpy.sin(numpy.linspace(0, 20 * numpy.pi, 1000)) + 0.25
+
+        native_transforms.remove_dc_offset(audio, SAMPLE_RATE)
+
+        assert audio.mean() == pytest.approx(0, abs=1e-9)
+
+    def test_trim_is_a_view(self):
+        audio = numpy.arange(1000.0)
+
+        res = native_transforms.trim(audio, SAMPLE_RATE, start_s=1, duration_s=2)
+
+        assert res.base is audio
+        assert res[0] == 100 and len(res) == 200
@@ -0,0 +1,33 @@
+import numpy
+
+from audio_chef.utils.peaks import LEVEL_BLOCK_SIZES, PeakPyramid
+
+
+class TestPeakPyramid:
+    def test_levels_keep_the_extremes(self, tmp_path):
+        audio = numpy.zeros((300_000, 2))
+        audio[123_456, 0] = 0.75
+        audio[234_567, 1] = -0.5
+
+        pyramid = PeakPyramid.build(audio, 44100)
+        pyramid.save(str(tmp_path / "peaks.npz"))
+        loaded = PeakPyramid.load(str(tmp_path / "peaks.npz"))
+
+        assert [level.block_size for level in loaded.levels] == list(LEVEL_BLOCK_SIZES)
+        for level in loaded.levels:
+            assert level.maximum.max() == 0.75
+            assert level.minimum.min() == -0.5
+        minimum, maximum = loaded.thumbnail(100)
+        assert len(minimum) == len(maximum) == 100
+        assert maximum.max() == 0.75
+        assert minimum.min() == -0.5
+
+    def test_tail_block_is_not_padded(self):
+        audio = numpy.full((256 * 3 + 10, 2), 0.5)
+
+        pyramid = PeakPyramid.build(audio, 44100)
+
+        for level in pyramid.levels:
+            assert level.minimum.min() == 0.5
+            assert level.rms.min() == 0.5
+        assert len(pyramid.levels[0].minimum) == 4
@@ -0,0 +1,16 @@
+import pytest
+
+from audio_chef.utils.resampling import parse_sample_rate
+
+
+class TestParseSampleRate:
+    def test_empty_text_keeps_the_source_rate(self):
+        assert parse_sample_rate("") is None
+
+    def test_rates_within_range_are_accepted(self):
+        assert parse_sample_rate("44100") == 44100
+
+    @pytest.mark.parametrize("text", ["-", "0", "-48000", "100", "768000"])
+    def test_invalid_rates_are_rejected(self, text):
+        with pytest.raises(ValueError):
+            parse_sample_rate(text)
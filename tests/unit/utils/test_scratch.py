@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from audio_chef.utils.scratch import ScratchSpaceError, ScratchStorage
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    monkeypatch.setattr(ScratchStorage, "_run_dir", None)
+    monkeypatch.setattr(ScratchStorage, "_files", {})
+    monkeypatch.setattr(ScratchStorage, "_peak_bytes", 0)
+    ScratchStorage.configure(str(tmp_path), quota_bytes=1000)
+    yield tmp_path
+    ScratchStorage.end_run()
+    monkeypatch.setattr(ScratchStorage, "_root", None)
+    monkeypatch.setattr(ScratchStorage, "_quota_bytes", None)
+
+
+def write(path: str, size: int) -> None:
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    ScratchStorage.register(path)
+
+
+class TestScratchStorage:
+    def test_same_names_get_separate_files(self, scratch):
+        first, second = ScratchStorage.new_path("a"), ScratchStorage.new_path("a")
+
+        assert first != second
+        assert os.path.dirname(first) == ScratchStorage.get_run_dir()
+
+    def test_quota_fails_before_writing(self, scratch):
+        path = ScratchStorage.new_path("a")
+        write(path, 600)
+        ScratchStorage.reserve(400)
+
+        with pytest.raises(ScratchSpaceError):
+            ScratchStorage.reserve(401)
+
+        ScratchStorage.remove(path)
+        stats = ScratchStorage.stats()
+        assert (stats.files, stats.used_bytes, stats.peak_bytes) == (0, 0, 600)
+
+    def test_only_orphaned_runs_are_removed(self, scratch):
+        own = ScratchStorage.get_run_dir()
+        finished = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+        )
+        orphan = scratch / f"run-{finished.stdout.strip()}-0"
+        orphan.mkdir()
+        (orphan / "left.wav").write_bytes(b"\0" * 10)
+
+        assert ScratchStorage.cleanup_orphans() == 10
+        assert not orphan.exists()
+        assert os.path.isdir(own)
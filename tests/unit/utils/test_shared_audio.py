@@ -0,0 +1,56 @@
+import concurrent.futures
+
+import numpy
+
+from audio_chef.adapters.dsp import process_shared_audio
+from audio_chef.models.preset import Transformation
+from audio_chef.utils.shared_audio import SharedAudioBuffer
+
+
+class TestSharedAudioBuffer:
+    def test_round_trip_through_worker_process(self):
+        audio = numpy.random.default_rng(0).uniform(-0.5, 0.5, (4410, 2))
+        with SharedAudioBuffer.from_array(audio, 44100) as source:
+            with concurrent.futures.ProcessPoolExecutor(1) as pool:
+                res_handle = pool.submit(
+                    process_shared_audio,
+                    source.handle,
+                    [Transformation(name="Gain", params={"gain_db": 0.0})],
+                ).result()
+
+        with SharedAudioBuffer.adopt(res_handle) as res:
+            assert res.handle.sample_rate == 44100
+            numpy.testing.assert_allclose(res.array, audio, atol=1e-6)
+
+    def test_results_viewing_the_source_outlive_it(self):
+        # Trim returns a view of the shared source, which is closed before return
+        audio = numpy.random.default_rng(0).uniform(-0.5, 0.5, (44100, 2))
+        with SharedAudioBuffer.from_array(audio, 44100) as source:
+            with concurrent.futures.ProcessPoolExecutor(1) as pool:
+                res_handle = pool.submit(
+                    process_shared_audio,
+                    source.handle,
+                    [
+                        Transformation(
+                            name="Trim", params={"start_s": 0.5, "duration_s": 0.25}
+                        )
+                    ],
+                ).result()
+
+        with SharedAudioBuffer.adopt(res_handle) as res:
+            numpy.testing.assert_allclose(res.array, audio[22050:33075])
+
+    def test_block_is_unlinked_after_last_release(self):
+        buffer = SharedAudioBuffer.create((16,), "float32", 8000)
+        buffer.acquire()
+        buffer.release()
+        attached = SharedAudioBuffer.attach(buffer.handle)
+        assert attached.array.shape == (16,)
+        attached.close()
+        buffer.release()
+        try:
+            SharedAudioBuffer.attach(buffer.handle)
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError("shared memory block was not unlinked")
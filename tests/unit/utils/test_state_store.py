@@ -0,0 +1,43 @@
+import pytest
+
+from audio_chef.utils.state_store import StateStore
+
+
+class State(StateStore):
+    ext: str = ""
+    transformations: list = []
+
+
+class TestStateStore:
+    def test_changes_are_flushed_once_per_schedule(self):
+        flushes = []
+        state = State(schedule=flushes.append)
+        calls = []
+        state.subscribe(["ext"], lambda: calls.append(state.ext))
+        state.subscribe(["transformations"], lambda: calls.append("transformations"))
+
+        state.ext = "mp3"
+        state.ext = "wav"
+        assert len(flushes) == 1 and calls == []
+
+        flushes.pop()()
+        assert calls == ["wav"]
+
+    def test_unchanged_values_are_not_dirty(self):
+        state = State()
+        calls = []
+        state.subscribe(["ext", "transformations"], lambda: calls.append(1))
+
+        state.ext = ""
+        state.transformations = []
+        state.touch("transformations")
+
+        assert calls == [1]
+
+    def test_unknown_fields_are_rejected(self):
+        state = State()
+
+        with pytest.raises(AttributeError):
+            state.extension = "mp3"
+        with pytest.raises(AttributeError):
+            state.subscribe(["extension"], lambda: None)